@@ -37,4 +37,32 @@ export const commonApi = {
 				cache_key: data.cache_key,
 			})
 			.then((response) => response.data),
+
+	uploadVideo: async (axios, videoUpload, file, concurrency = 3) => {
+		// Parts go straight to S3 through the presigned URLs
+		const parts = [...videoUpload.parts];
+		const uploadNextPart = async () => {
+			while (parts.length) {
+				const part = parts.shift();
+				const start = (part.part_number - 1) * videoUpload.part_size;
+				await axios.put(
+					part.url,
+					file.slice(start, start + videoUpload.part_size)
+				);
+			}
+		};
+		const uploadUrl = `${import.meta.env.VITE_API_GATEWAY_URL}video-uploads/${
+			videoUpload.upload_token
+		}/`;
+
+		try {
+			await Promise.all(
+				Array.from({ length: concurrency }, () => uploadNextPart())
+			);
+		} catch (error) {
+			await axios.delete(uploadUrl).catch(() => {});
+			throw error;
+		}
+		return axios.post(uploadUrl).then((response) => response.data);
+	},
 };
@@ -87,4 +87,10 @@ export const tutorApi = {
 		axiosInstance
 			.post("tutor-availabilities/", sessionData)
 			.then((response) => response.data),
+
+	// sessionData carries either `slots` or a weekly `recurrence`
+	createSessionsBulk: (axiosInstance, sessionData) =>
+		axiosInstance
+			.post("tutor-availabilities/bulk/", sessionData)
+			.then((response) => response.data),
 };
@@ -154,10 +154,11 @@ const Navbar = () => {
 	const fetchNotifications = async () => {
 		try {
 			setLoadingNotifications(true);
+			// Latest page of notifications
 			const response = await axiosInstance.get(`notifications/${userId}/`);
 
 			const notificationsWithSenders = await Promise.all(
-				response.data.map(async (notification) => {
+				response.data.results.map(async (notification) => {
 					try {
 						const senderResponse = await axiosInstance.get(
 							`users/${notification.sender_id}/`
@@ -180,10 +181,22 @@ const Navbar = () => {
 
 			setNotifications(notificationsWithSenders);
 
-			const countResponse = await axiosInstance.get(
-				`notifications/count/${userId}/`
-			);
-			setNotificationCount(countResponse.data.count);
+			// The notifications shown are read now
+			const unreadIds = response.data.results
+				.filter((notification) => !notification.is_read)
+				.map((notification) => notification.id);
+			if (unreadIds.length > 0) {
+				const readResponse = await axiosInstance.post(
+					`notifications/read/${userId}/`,
+					{ ids: unreadIds }
+				);
+				setNotificationCount(readResponse.data.count);
+			} else {
+				const countResponse = await axiosInstance.get(
+					`notifications/count/${userId}/`
+				);
+				setNotificationCount(countResponse.data.count);
+			}
 		} catch (error) {
 			setNotifications([]);
 			setNotificationCount(0);
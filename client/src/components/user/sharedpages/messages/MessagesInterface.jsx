@@ -48,6 +48,8 @@ const MessagesInterface = () => {
 	const [socket, setSocket] = useState(null);
 	const [inputMessage, setInputMessage] = useState("");
 	const [messages, setMessages] = useState([]);
+	const [hasOlderMessages, setHasOlderMessages] = useState(false);
+	const [loadingOlder, setLoadingOlder] = useState(false);
 	const [chatUsers, setChatUsers] = useState([]);
 	const [selectedUser, setSelectedUser] = useState(null);
 	const [loading, setLoading] = useState(true);
@@ -85,13 +87,66 @@ const MessagesInterface = () => {
 		}
 	};
 
+	// Scroll height before older messages were prepended, to keep the view in place
+	const prependedFromHeightRef = useRef(null);
+
 	// Add useEffect to handle scrolling when messages change
 	useEffect(() => {
+		if (prependedFromHeightRef.current !== null) {
+			const container = messagesContainerRef.current;
+			if (container) {
+				container.scrollTop =
+					container.scrollHeight - prependedFromHeightRef.current;
+			}
+			prependedFromHeightRef.current = null;
+			return;
+		}
 		if (messages.length > 0) {
 			scrollToBottom();
 		}
 	}, [messages]);
 
+	// Latest page of the chat with a user
+	const fetchLatestMessages = async (chatUserId) => {
+		const response = await axiosInstance.get(
+			`messages/history/${userId}/${chatUserId}/`
+		);
+		setMessages(response.data.results);
+		setHasOlderMessages(response.data.has_more);
+	};
+
+	// The page before the oldest loaded message, when scrolled to the top
+	const loadOlderMessages = async () => {
+		const oldest = messages[0];
+		if (!selectedUser || !hasOlderMessages || loadingOlder || !oldest?.id) {
+			return;
+		}
+		setLoadingOlder(true);
+		try {
+			const response = await axiosInstance.get(
+				`messages/history/${userId}/${selectedUser.id}/`,
+				{ params: { before: oldest.id } }
+			);
+			prependedFromHeightRef.current =
+				messagesContainerRef.current?.scrollHeight ?? null;
+			setMessages((prevMessages) => [
+				...response.data.results,
+				...prevMessages,
+			]);
+			setHasOlderMessages(response.data.has_more);
+		} catch (error) {
+			setError("Failed to load message history");
+		} finally {
+			setLoadingOlder(false);
+		}
+	};
+
+	const handleMessagesScroll = (event) => {
+		if (event.currentTarget.scrollTop === 0) {
+			loadOlderMessages();
+		}
+	};
+
 	// Also scroll when a user is selected
 	useEffect(() => {
 		if (selectedUser) {
@@ -123,7 +178,10 @@ const MessagesInterface = () => {
 				const messageResponse = await axiosInstance.get(
 					`messages/chat-users/${userId}/`
 				);
-				const chatUserIds = messageResponse.data;
+				// Conversations, most recent first
+				const chatUserIds = messageResponse.data.map(
+					(conversation) => conversation.user_id
+				);
 
 				// Fetch details for existing chat users
 				if (chatUserIds.length > 0) {
@@ -171,10 +229,11 @@ const MessagesInterface = () => {
 						// Handle new messages
 						if (data.message) {
 							const displayMessage = {
+								id: data.id,
 								content: data.message,
 								sender_id: data.sender_id,
 								recipient_id: selectedUser.id,
-								timestamp: new Date().toISOString(),
+								timestamp: data.timestamp || new Date().toISOString(),
 							};
 							setMessages((prevMessages) => [...prevMessages, displayMessage]);
 							scrollToBottom();
@@ -212,10 +271,7 @@ const MessagesInterface = () => {
 
 			const fetchMessages = async () => {
 				try {
-					const response = await axiosInstance.get(
-						`messages/history/${userId}/${selectedUser.id}/`
-					);
-					setMessages(response.data);
+					await fetchLatestMessages(selectedUser.id);
 					// Add setTimeout to ensure DOM is updated before scrolling
 					setTimeout(() => {
 						scrollToBottom();
@@ -308,10 +364,7 @@ const MessagesInterface = () => {
 
 		// Fetch messages immediately to prevent showing empty state
 		try {
-			const response = await axiosInstance.get(
-				`messages/history/${userId}/${user.id}/`
-			);
-			setMessages(response.data);
+			await fetchLatestMessages(user.id);
 			setTimeout(() => {
 				scrollToBottom();
 			}, 100);
@@ -510,8 +563,14 @@ const MessagesInterface = () => {
 
 							<div
 								ref={messagesContainerRef}
+								onScroll={handleMessagesScroll}
 								className="flex-1 overflow-y-auto p-6 space-y-4 bg-gray-50 scrollbar-thin"
 							>
+								{loadingOlder && (
+									<div className="flex justify-center">
+										<LoadingSpinner size="sm" className="text-blue-600" />
+									</div>
+								)}
 								{messages.length === 0 ? (
 									<div className="flex flex-col items-center justify-center h-full text-gray-500">
 										<p className="text-lg font-medium">Start a conversation</p>
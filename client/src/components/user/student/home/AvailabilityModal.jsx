@@ -18,21 +18,41 @@ const AvailabilityModal = ({ tutorId, onClose }) => {
 	const { userId, credits } = useSelector((state) => state.auth);
 	const dispatch = useDispatch();
 
+	// Fetch only this tutor's upcoming slots, page by page
+	const fetchTutorAvailabilities = async (startTimeAfter) => {
+		const slots = [];
+		let cursor = null;
+		do {
+			const response = await axiosInstance.get("tutor-availabilities/", {
+				params: {
+					tutor_id: tutorId,
+					start_time_after: startTimeAfter.toISOString(),
+					page_size: 100,
+					...(cursor && { cursor }),
+				},
+			});
+			slots.push(...response.data.results);
+			cursor = response.data.next
+				? new URL(response.data.next).searchParams.get("cursor")
+				: null;
+		} while (cursor);
+		return slots;
+	};
+
 	useEffect(() => {
 		const fetchData = async () => {
 			setLoading(true);
 			try {
-				const [availabilityResponse, bookingsResponse] = await Promise.all([
-					axiosInstance.get("tutor-availabilities/"),
-					axiosInstance.get("bookings/"),
-				]);
-
 				// Current time for comparison
 				const now = new Date();
 
-				// Filter availabilities for the specific tutor and apply lead time
-				const tutorAvailabilities = availabilityResponse.data
-					.filter((slot) => slot.tutor_id === tutorId)
+				const [availabilityData, bookingsResponse] = await Promise.all([
+					fetchTutorAvailabilities(now),
+					axiosInstance.get("bookings/"),
+				]);
+
+				// Apply lead time to the tutor's availabilities
+				const tutorAvailabilities = availabilityData
 					.filter((slot) => {
 						const startTime = toDate(slot.start_time);
 						const leadTimeRequired = 3 * 60 * 60 * 1000; // Example: 3 hours in milliseconds
@@ -12,6 +12,7 @@ import FileUpload from "../../common/ui/input/FileUpload";
 import SpokenLanguageInput from "./SpokenLanguageInput";
 import FormInput from "../../common/ui/input/FormInput";
 import PasswordInput from "../../common/ui/input/PasswordInput";
+import { commonApi } from "../../../../api/commonApi";
 
 const TutorApplicationForm = () => {
 	const {
@@ -193,12 +194,17 @@ const TutorApplicationForm = () => {
 		Object.keys(data).forEach((key) => {
 			if (key === "spokenLanguages") {
 				formData.append(key, JSON.stringify(data[key]));
+			} else if (key === "video") {
+				// The video is uploaded to storage separately
+				return;
 			} else {
 				formData.append(key, data[key]);
 			}
 		});
 		formData.append("email", verifiedEmail); // Use verified email
-		formData.append("video", video);
+		formData.append("videoName", video.name);
+		formData.append("videoSize", video.size);
+		formData.append("videoContentType", video.type);
 		formData.append("image", image);
 		if (profileImageFile) {
 			formData.append("profile_image", profileImageFile);
@@ -217,6 +223,7 @@ const TutorApplicationForm = () => {
 				}
 			);
 			if (response.status === 201) {
+				await commonApi.uploadVideo(axios, response.data.video_upload, video);
 				navigate("/tutor/request/application-confirmation", {
 					state: { verifiedEmail: verifiedEmail },
 				});
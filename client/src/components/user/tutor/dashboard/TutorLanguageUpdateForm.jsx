@@ -5,6 +5,8 @@ import { useNavigate } from "react-router-dom";
 import { toast } from "react-hot-toast";
 import useAxios from "../../../../hooks/useAxios";
 import { tutorApi } from "../../../../api/tutorApi";
+import { commonApi } from "../../../../api/commonApi";
+import axios from "axios";
 import FormInput from "../../common/ui/input/FormInput";
 import FileUpload from "../../common/ui/input/FileUpload";
 import PrimaryButton from "../../common/ui/buttons/PrimaryButton";
@@ -130,12 +132,18 @@ const TutorLanguageUpdateForm = () => {
 			formData.append("is_native", data.isNative);
 			formData.append("about", data.about);
 			formData.append("imageUpload", imageFile);
-			formData.append("intro_video", videoFile);
+			formData.append("intro_video_name", videoFile.name);
+			formData.append("intro_video_size", videoFile.size);
+			formData.append("intro_video_content_type", videoFile.type);
 			if (profileImageFile) {
 				formData.append("profile_image", profileImageFile);
 			}
 
-			await tutorApi.submitLanguageChangeRequest(axiosInstance, formData);
+			const changeRequest = await tutorApi.submitLanguageChangeRequest(
+				axiosInstance,
+				formData
+			);
+			await commonApi.uploadVideo(axios, changeRequest.video_upload, videoFile);
 			toast.success(
 				"Request submitted successfully, the status will be notified."
 			);
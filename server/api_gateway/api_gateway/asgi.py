@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_gateway.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, the relay uses the project's settings and apps
+from proxy.uploads import StreamingUploadMiddleware  # noqa: E402
+
+application = StreamingUploadMiddleware(django_application)
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api_gateway.supervisor import ManagedProcess, gunicorn_args, supervise
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the gateway under gunicorn with uvicorn workers, restarting "
+        "the server if it exits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=settings.SERVE_BIND)
+        parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS)
+        parser.add_argument("--keepalive", type=int, default=settings.SERVE_KEEPALIVE)
+
+    def handle(self, *args, **options):
+        # gunicorn finishes in-flight requests and relayed uploads before
+        # it exits
+        supervise(
+            [
+                ManagedProcess(
+                    "web",
+                    gunicorn_args(
+                        "api_gateway.asgi:application", options, "uvicorn_worker.UvicornWorker"
+                    ),
+                )
+            ]
+        )
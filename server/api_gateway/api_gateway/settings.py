@@ -42,6 +42,7 @@ CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
 # Application definition
 
 INSTALLED_APPS = [
+    "daphne",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -52,10 +53,8 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
     "corsheaders",
-    "user",
-    "session",
-    "payment",
-    "message",
+    # Hosts the serve management command
+    "api_gateway",
 ]
 
 MIDDLEWARE = [
@@ -88,6 +87,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "api_gateway.wsgi.application"
+ASGI_APPLICATION = "api_gateway.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -141,6 +141,42 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Upstream HTTP clients
+# Pooled keep-alive clients used by the proxy to reach downstream services
+
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", 3.05))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", 60))
+UPSTREAM_KEEPALIVE_TIMEOUT = float(os.getenv("UPSTREAM_KEEPALIVE_TIMEOUT", 30))
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", 2))
+
+UPSTREAM_SERVICES = {
+    "user": {
+        "url": os.getenv("USER_SERVICE_URL"),
+        "pool_maxsize": int(os.getenv("USER_SERVICE_POOL_MAXSIZE", 20)),
+    },
+    "session": {
+        "url": os.getenv("SESSION_SERVICE_URL"),
+        "pool_maxsize": int(os.getenv("SESSION_SERVICE_POOL_MAXSIZE", 20)),
+    },
+    "payment": {
+        "url": os.getenv("PAYMENT_SERVICE_URL"),
+        "pool_maxsize": int(os.getenv("PAYMENT_SERVICE_POOL_MAXSIZE", 10)),
+    },
+    "message": {
+        "url": os.getenv("MESSAGE_SERVICE_URL"),
+        "pool_maxsize": int(os.getenv("MESSAGE_SERVICE_POOL_MAXSIZE", 10)),
+    },
+}
+
+# Process launcher, see `manage.py serve`
+# Each worker runs an event loop, so there is no thread setting
+SERVE_BIND = os.getenv("SERVE_BIND", "0.0.0.0:8080")
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", (os.cpu_count() or 1) + 1))
+SERVE_KEEPALIVE = int(os.getenv("SERVE_KEEPALIVE", 5))
+SERVE_TIMEOUT = int(os.getenv("SERVE_TIMEOUT", 30))
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv("SERVE_GRACEFUL_TIMEOUT", 30))
+SERVE_MAX_REQUESTS = int(os.getenv("SERVE_MAX_REQUESTS", 10000))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -171,22 +207,7 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": False,
         },
-        "user": {
-            "handlers": ["console"],
-            "level": "DEBUG",
-            "propagate": False,
-        },
-        "session": {
-            "handlers": ["console"],
-            "level": "DEBUG",
-            "propagate": False,
-        },
-        "payment": {
-            "handlers": ["console"],
-            "level": "DEBUG",
-            "propagate": False,
-        },
-        "message": {
+        "proxy": {
             "handlers": ["console"],
             "level": "DEBUG",
             "propagate": False,
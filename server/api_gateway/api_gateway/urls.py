@@ -21,9 +21,6 @@ from django.http import HttpResponse
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/", include("user.urls")),
-    path("api/", include("session.urls")),
-    path("api/", include("payment.urls")),
-    path("api/", include("message.urls")),
     path("api/health/", lambda request: HttpResponse(status=200)),
+    path("api/", include("proxy.urls")),
 ]
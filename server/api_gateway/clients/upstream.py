@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import weakref
+import aiohttp
+from django.conf import settings
+
+# Get the logger for the api_gateway module
+logger = logging.getLogger("api_gateway")
+
+# Only methods that are safe to replay are retried. Their bodies are always
+# buffered, so a retry can resend them.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+RETRY_STATUS_CODES = frozenset([502, 503, 504])
+
+# aiohttp sessions are bound to the event loop that created them, so the pooled
+# clients are kept per loop and dropped together with it.
+_clients = weakref.WeakKeyDictionary()
+
+
+class UpstreamClient:
+    """
+    Pooled keep-alive client for a single downstream service.
+
+    Connections are reused across requests up to the per-upstream pool limit,
+    every call gets the configured connect/read timeouts, and idempotent calls
+    are retried on connection errors and 502/503/504 responses.
+    """
+
+    def __init__(self, name, base_url, pool_maxsize):
+        self.name = name
+        self.base_url = base_url
+        self.max_retries = settings.UPSTREAM_MAX_RETRIES
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=pool_maxsize,
+                keepalive_timeout=settings.UPSTREAM_KEEPALIVE_TIMEOUT,
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+                sock_read=settings.UPSTREAM_READ_TIMEOUT,
+            ),
+            # Bodies are passed through untouched, including their encoding
+            auto_decompress=False,
+        )
+
+    async def request(self, method, path, headers=None, data=None):
+        """
+        Send a request to the upstream and return the unread response.
+
+        The caller owns the response and must release it once the body has
+        been consumed.
+        """
+        url = self.base_url + path
+        retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+
+        while True:
+            try:
+                response = await self.session.request(
+                    method, url, headers=headers, data=data, allow_redirects=False
+                )
+                if response.status not in RETRY_STATUS_CODES or attempt >= retries:
+                    return response
+                response.release()
+                logger.warning(
+                    f"{self.name} service returned {response.status}, retrying {method} {path}"
+                )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= retries:
+                    raise
+                logger.warning(
+                    f"Connection to {self.name} service failed, retrying {method} {path}: {str(e)}"
+                )
+
+            attempt += 1
+            await asyncio.sleep(0.1 * 2 ** (attempt - 1))
+
+
+def get_upstream(name):
+    """Return the pooled client for the named downstream service."""
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+
+    client = clients.get(name)
+    if client is None:
+        config = settings.UPSTREAM_SERVICES[name]
+        client = UpstreamClient(
+            name=name,
+            base_url=config["url"],
+            pool_maxsize=config["pool_maxsize"],
+        )
+        clients[name] = client
+        logger.info(
+            f"Created upstream client for {name} service "
+            f"(pool size {config['pool_maxsize']})"
+        )
+    return client
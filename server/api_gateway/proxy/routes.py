@@ -0,0 +1,86 @@
+from collections import namedtuple
+
+# prefix:            path below /api/ handled by the route
+# service:           key in settings.UPSTREAM_SERVICES
+# upstream_prefix:   path the prefix is rewritten to on the upstream
+# auth_required:     reject requests without a bearer token at the gateway
+# forward_auth:      pass the Authorization header on to the upstream
+# stream_uploads:    relay multipart POST/PATCH bodies without buffering them
+Route = namedtuple(
+    "Route",
+    [
+        "prefix",
+        "service",
+        "upstream_prefix",
+        "auth_required",
+        "forward_auth",
+        "stream_uploads",
+    ],
+)
+
+
+def route(
+    prefix,
+    service,
+    auth_required=False,
+    forward_auth=None,
+    upstream_prefix=None,
+    stream_uploads=False,
+):
+    return Route(
+        prefix=prefix,
+        service=service,
+        upstream_prefix=prefix if upstream_prefix is None else upstream_prefix,
+        auth_required=auth_required,
+        forward_auth=auth_required if forward_auth is None else forward_auth,
+        stream_uploads=stream_uploads,
+    )
+
+
+ROUTES = [
+    # User service
+    route("sign-up/", "user"),
+    route("sign-in/", "user"),
+    route("google-sign-in/", "user"),
+    route("tutor/verify-email/", "user"),
+    route("tutor/verify-otp/", "user"),
+    route("tutor-sign-in/", "user"),
+    route("tutor-request/", "user", stream_uploads=True),
+    route("admin/sign-in/", "user", upstream_prefix="admin-sign-in/"),
+    route("verify-otp/", "user"),
+    route("resend-otp/", "user"),
+    route("forgot-password/", "user"),
+    route("forgot-password-verify-otp/", "user"),
+    route("forgot-password-resend-otp/", "user"),
+    route("set-new-password/", "user"),
+    route("change-password/", "user", forward_auth=True),
+    route("token/refresh/", "user"),
+    route("users/", "user", auth_required=True, stream_uploads=True),
+    route("tutor-details/", "user"),
+    route(
+        "teaching-language-change-requests/",
+        "user",
+        auth_required=True,
+        stream_uploads=True,
+    ),
+    route("video-uploads/", "user"),
+    route("platform-languages/", "user"),
+    route("spoken-languages/", "user"),
+    route("countries/", "user"),
+    # Session service
+    route("tutor-availabilities/", "session", auth_required=True),
+    route("open-slots/", "session", auth_required=True),
+    route("bookings/", "session", auth_required=True),
+    route("create-daily-room/", "session", auth_required=True),
+    route("reports/", "session", auth_required=True),
+    # Payment service
+    route("create-checkout-session/", "payment", auth_required=True),
+    route("webhook/", "payment"),
+    route("stripe-account/", "payment", auth_required=True),
+    route("withdraw/", "payment", auth_required=True),
+    route("transactions/", "payment", auth_required=True),
+    route("escrow/", "payment", auth_required=True),
+    # Message service
+    route("messages/", "message", auth_required=True),
+    route("notifications/", "message", auth_required=True),
+]
@@ -0,0 +1,189 @@
+import asyncio
+import io
+import logging
+import os
+import re
+import resource
+import time
+import aiohttp
+from corsheaders.middleware import CorsMiddleware
+from django.core.exceptions import RequestAborted
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from auth.authentication import JWTAuthentication
+from clients.upstream import get_upstream
+from .routes import ROUTES
+from .views import HOP_BY_HOP_HEADERS, get_upstream_headers, stream_response_body
+
+# Get logger for the proxy
+logger = logging.getLogger("proxy")
+
+API_PREFIX = "/api/"
+# A streamed body cannot be replayed, so only methods the upstream client
+# never retries are relayed this way
+STREAMING_METHODS = frozenset(["POST", "PATCH"])
+RSS_SAMPLE_INTERVAL = 1024 * 1024
+MB = 1024 * 1024
+
+UPLOAD_ROUTES = [
+    (re.compile(rf"^{re.escape(API_PREFIX + route.prefix)}(?P<subpath>.*)$"), route)
+    for route in ROUTES
+    if route.stream_uploads
+]
+
+
+def get_current_rss():
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Not on Linux, fall back to the lifetime peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class UploadMetrics:
+    """Byte count, throughput and peak resident memory of one relayed upload."""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.bytes = 0
+        self.started_at = time.monotonic()
+        self.start_rss = get_current_rss()
+        self.peak_rss = self.start_rss
+        self._next_sample = RSS_SAMPLE_INTERVAL
+
+    def add(self, size):
+        self.bytes += size
+        if self.bytes >= self._next_sample:
+            self.peak_rss = max(self.peak_rss, get_current_rss())
+            self._next_sample = self.bytes + RSS_SAMPLE_INTERVAL
+
+    def report(self, status):
+        self.peak_rss = max(self.peak_rss, get_current_rss())
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        logger.info(
+            f"Upload relayed: {self.method} {self.path} status={status} "
+            f"bytes={self.bytes} seconds={elapsed:.2f} "
+            f"throughput_mb_s={self.bytes / MB / elapsed:.2f} "
+            f"peak_rss_mb={self.peak_rss / MB:.1f} "
+            f"rss_growth_mb={(self.peak_rss - self.start_rss) / MB:.1f}"
+        )
+
+
+class StreamingUploadMiddleware:
+    """
+    ASGI middleware that relays multipart uploads straight to the upstream.
+
+    Django's ASGI handler reads the whole request body before a view runs.
+    For routes flagged with stream_uploads the body chunks are instead piped
+    from the client connection to the upstream as they arrive. The server's
+    flow control keeps only a chunk or two in memory at a time. Every other
+    request goes to the Django application unchanged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cors = CorsMiddleware(lambda request: None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] in STREAMING_METHODS:
+            match = self.match_upload(scope)
+            if match:
+                route, subpath = match
+                return await self.relay_upload(scope, receive, send, route, subpath)
+        return await self.app(scope, receive, send)
+
+    def match_upload(self, scope):
+        content_type = ""
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+                break
+        if not content_type.startswith("multipart/form-data"):
+            return None
+
+        for pattern, route in UPLOAD_ROUTES:
+            match = pattern.match(scope["path"])
+            if match:
+                return route, match.group("subpath")
+        return None
+
+    async def relay_upload(self, scope, receive, send, route, subpath):
+        # The request object only carries headers, the body stays on the wire
+        request = ASGIRequest(scope, io.BytesIO())
+        metrics = UploadMetrics(request.method, request.path)
+
+        if route.auth_required:
+            try:
+                JWTAuthentication().authenticate(request)
+            except AuthenticationFailed as e:
+                response = JsonResponse({"detail": str(e.detail)}, status=403)
+                return await self.send_response(request, response, send)
+
+        async def stream_body():
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    raise RequestAborted()
+                more_body = message.get("more_body", False)
+                chunk = message.get("body", b"")
+                if chunk:
+                    metrics.add(len(chunk))
+                    yield chunk
+
+        headers = get_upstream_headers(request, route)
+        if request.META.get("CONTENT_LENGTH"):
+            headers["Content-Length"] = request.META["CONTENT_LENGTH"]
+
+        path = route.upstream_prefix + subpath
+        if request.META.get("QUERY_STRING"):
+            path = f"{path}?{request.META['QUERY_STRING']}"
+
+        logger.info(
+            f"Streaming {request.method} {request.path} upload to {route.service} service"
+        )
+
+        try:
+            upstream_response = await get_upstream(route.service).request(
+                request.method, path, headers=headers, data=stream_body()
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # aiohttp wraps errors raised while writing the body
+            if isinstance(e.__cause__, RequestAborted):
+                logger.warning(f"Client disconnected during upload to {request.path}")
+                metrics.report(status="aborted")
+                return
+            logger.error(f"Failed to stream upload to {route.service} service: {str(e)}")
+            metrics.report(status="failed")
+            response = JsonResponse(
+                {
+                    "error": f"Failed to connect to {route.service} service.",
+                    "details": str(e),
+                },
+                status=500,
+            )
+            return await self.send_response(request, response, send)
+
+        metrics.report(status=upstream_response.status)
+        if upstream_response.status >= 400:
+            logger.error(
+                f"{route.service.capitalize()} service returned error: {upstream_response.status}"
+            )
+
+        response = StreamingHttpResponse(
+            stream_response_body(upstream_response), status=upstream_response.status
+        )
+        for key, value in upstream_response.headers.items():
+            if key.lower() not in HOP_BY_HOP_HEADERS:
+                response[key] = value
+        await self.send_response(request, response, send)
+
+    async def send_response(self, request, response, send):
+        # Browser uploads are cross-origin, so the CORS headers the Django
+        # middleware would add are needed here too
+        self.cors.add_response_headers(request, response)
+        await self.app.send_response(response, send)
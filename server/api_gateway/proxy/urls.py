@@ -0,0 +1,9 @@
+import re
+from django.urls import re_path
+from .routes import ROUTES
+from .views import proxy
+
+urlpatterns = [
+    re_path(rf"^{re.escape(route.prefix)}(?P<subpath>.*)$", proxy, {"route": route})
+    for route in ROUTES
+]
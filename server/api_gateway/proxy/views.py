@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import aiohttp
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from auth.authentication import JWTAuthentication
+from clients.upstream import IDEMPOTENT_METHODS, get_upstream
+
+# Get logger for the proxy
+logger = logging.getLogger("proxy")
+
+CHUNK_SIZE = 64 * 1024
+
+HOP_BY_HOP_HEADERS = frozenset(
+    [
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "trailers",
+        "transfer-encoding",
+        "upgrade",
+    ]
+)
+
+
+def get_upstream_headers(request, route):
+    """Copy the client headers that should reach the upstream service."""
+    headers = {}
+    for key, value in request.headers.items():
+        lowered = key.lower()
+        if lowered in HOP_BY_HOP_HEADERS or lowered in ("host", "content-length"):
+            continue
+        if lowered == "authorization" and not route.forward_auth:
+            continue
+        headers[key] = value
+
+    headers["X-Forwarded-For"] = request.META.get("REMOTE_ADDR", "")
+    return headers
+
+
+async def stream_request_body(request):
+    """Read the client body in fixed-size chunks instead of loading it at once."""
+    while True:
+        chunk = request.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def stream_response_body(upstream_response):
+    """Relay the upstream body as it arrives and return the connection to the pool."""
+    try:
+        async for chunk in upstream_response.content.iter_chunked(CHUNK_SIZE):
+            yield chunk
+    finally:
+        upstream_response.release()
+
+
+@csrf_exempt
+async def proxy(request, route, subpath=""):
+    if route.auth_required:
+        try:
+            JWTAuthentication().authenticate(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"detail": str(e.detail)}, status=403)
+
+    upstream = get_upstream(route.service)
+    path = route.upstream_prefix + subpath
+    if request.META.get("QUERY_STRING"):
+        path = f"{path}?{request.META['QUERY_STRING']}"
+
+    logger.info(f"Forwarding {request.method} {request.path} to {route.service} service")
+
+    headers = get_upstream_headers(request, route)
+    if request.method in IDEMPOTENT_METHODS:
+        # Small bodies are buffered so the request can be retried
+        data = request.body or None
+    else:
+        content_length = request.META.get("CONTENT_LENGTH")
+        if content_length:
+            headers["Content-Length"] = content_length
+        data = stream_request_body(request)
+
+    try:
+        upstream_response = await upstream.request(
+            request.method, path, headers=headers, data=data
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Failed to forward request to {route.service} service: {str(e)}")
+        return JsonResponse(
+            {
+                "error": f"Failed to connect to {route.service} service.",
+                "details": str(e),
+            },
+            status=500,
+        )
+
+    if upstream_response.status >= 400:
+        logger.error(
+            f"{route.service.capitalize()} service returned error: {upstream_response.status}"
+        )
+
+    response = StreamingHttpResponse(
+        stream_response_body(upstream_response), status=upstream_response.status
+    )
+    for key, value in upstream_response.headers.items():
+        if key.lower() not in HOP_BY_HOP_HEADERS:
+            response[key] = value
+    return response
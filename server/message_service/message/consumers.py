@@ -1,7 +1,9 @@
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import sync_to_async
-from .models import Message, Notification
+from . import presence
+from .models import conversation_key
+from .writer import get_message_writer
 import logging
 
 logger = logging.getLogger("message")
@@ -12,29 +14,30 @@ class ChatConsumer(AsyncWebsocketConsumer):
         try:
             user = self.scope["user"]
             chat_with_user = self.scope["url_route"]["kwargs"]["chat_id"]
-            user_ids = [int(user.id), int(chat_with_user)]
-            user_ids = sorted(user_ids)
-            self.private_chat_room = f"chat_{user_ids[0]}--{user_ids[1]}"
+            self.private_chat_room = f"chat_{conversation_key(user.id, chat_with_user)}"
 
             logger.info(
                 f"WebSocket connection attempt: user {user.id} connecting to chat with user {chat_with_user}"
             )
 
-            await self.channel_layer.group_send(
-                f"user_{chat_with_user}",
-                {"type": "new_conversation", "user_id": user.id},
-            )
-
-            await self.channel_layer.group_send(
-                f"user_{user.id}",
-                {"type": "new_conversation", "user_id": chat_with_user},
-            )
-
-            await self.channel_layer.group_add(
-                self.private_chat_room, self.channel_name
+            await asyncio.gather(
+                self.channel_layer.group_send(
+                    f"user_{chat_with_user}",
+                    {"type": "new_conversation", "user_id": user.id},
+                ),
+                self.channel_layer.group_send(
+                    f"user_{user.id}",
+                    {"type": "new_conversation", "user_id": chat_with_user},
+                ),
+                self.channel_layer.group_add(self.private_chat_room, self.channel_name),
             )
 
             await self.accept()
+            # Opening the chat reads it
+            await asyncio.gather(
+                self.mark_read(user.id, chat_with_user),
+                presence.enter(user.id, chat_with_user, self.channel_name),
+            )
             logger.info(
                 f"WebSocket connection established for chat room: {self.private_chat_room}"
             )
@@ -50,13 +53,50 @@ class ChatConsumer(AsyncWebsocketConsumer):
             recipient_id = int(self.scope["url_route"]["kwargs"]["chat_id"])
             sender_id = self.scope["user"].id
 
+            if not isinstance(message_content, str):
+                logger.warning(f"Ignoring message from user {sender_id} that is not text")
+                return
+            # Postgres cannot store NUL characters in text
+            message_content = message_content.replace("\x00", "")
+            if not message_content:
+                return
+
             logger.info(
                 f"Received message from user {sender_id} to user {recipient_id}"
             )
 
-            await self.save_message(sender_id, recipient_id, message_content)
+            # Buffered, it is written shortly after
+            message = await get_message_writer().submit_message(
+                sender_id, recipient_id, message_content
+            )
 
-            await self.channel_layer.group_send(
+            await asyncio.gather(
+                self.channel_layer.group_send(
+                    self.private_chat_room,
+                    {
+                        "type": "chat_message",
+                        "id": message.id,
+                        "message": message_content,
+                        "sender_id": sender_id,
+                        "timestamp": message.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    },
+                ),
+                self.notify(recipient_id, sender_id),
+            )
+            logger.debug(f"Message sent to chat room: {self.private_chat_room}")
+        except Exception as e:
+            logger.error(f"Error processing received message: {str(e)}")
+
+    async def notify(self, recipient_id, sender_id):
+        """Notify the recipient of a message, unless they have the chat open"""
+        if await presence.is_present(recipient_id, sender_id):
+            logger.debug(f"User {recipient_id} has the chat open, not notifying")
+            return
+        await asyncio.gather(
+            get_message_writer().submit_notification(
+                recipient_id, sender_id, f"You have a message from {sender_id}"
+            ),
+            self.channel_layer.group_send(
                 f"notifications_user_{recipient_id}",
                 {
                     "type": "send.notification",
@@ -64,30 +104,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
                     "sender_id": sender_id,
                     "recipient_id": recipient_id,
                 },
-            )
-
-            await self.create_notification(
-                recipient_id,
-                sender_id,
-                f"You have a message from {self.scope['user'].id}",
-            )
-
-            await self.channel_layer.group_send(
-                self.private_chat_room,
-                {
-                    "type": "chat_message",
-                    "message": message_content,
-                    "sender_id": sender_id,
-                },
-            )
-            logger.debug(f"Message sent to chat room: {self.private_chat_room}")
-        except Exception as e:
-            logger.error(f"Error processing received message: {str(e)}")
+            ),
+        )
 
     async def disconnect(self, code):
         logger.info(f"WebSocket disconnecting from chat room: {self.private_chat_room}")
-        await self.channel_layer.group_discard(
-            self.private_chat_room, self.channel_name
+        await asyncio.gather(
+            self.channel_layer.group_discard(self.private_chat_room, self.channel_name),
+            presence.leave(
+                self.scope["user"].id,
+                self.scope["url_route"]["kwargs"]["chat_id"],
+                self.channel_name,
+            ),
         )
         logger.info(f"WebSocket disconnected from chat room: {self.private_chat_room}")
 
@@ -98,8 +126,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
             f"Broadcasting message from user {sender_id} to chat room: {self.private_chat_room}"
         )
         await self.send(
-            text_data=json.dumps({"message": message, "sender_id": sender_id})
+            text_data=json.dumps(
+                {
+                    "id": event["id"],
+                    "message": message,
+                    "sender_id": sender_id,
+                    "timestamp": event["timestamp"],
+                }
+            )
         )
+        if sender_id != self.scope["user"].id:
+            # The recipient has the chat open and just got the message
+            await asyncio.gather(
+                self.mark_read(self.scope["user"].id, sender_id),
+                presence.enter(self.scope["user"].id, sender_id, self.channel_name),
+            )
 
     async def new_conversation(self, event):
         """Handle new conversation notifications"""
@@ -112,24 +153,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
             )
         )
 
-    @sync_to_async
-    def save_message(self, sender_id, recipient_id, content):
-        """Save the message to the database."""
+    async def mark_read(self, user_id, other_id):
         try:
-            Message.objects.create(
-                sender_id=sender_id, recipient_id=recipient_id, content=content
-            )
-            logger.info(
-                f"Message saved to database: from user {sender_id} to user {recipient_id}"
-            )
+            await get_message_writer().mark_read(user_id, other_id)
         except Exception as e:
-            logger.error(f"Failed to save message to database: {str(e)}")
-
-    @sync_to_async
-    def create_notification(self, recipient_id, sender_id, message):
-        Notification.objects.create(
-            recipient_id=recipient_id, sender_id=sender_id, message=message
-        )
+            logger.error(f"Failed to mark chat of user {user_id} with {other_id} read: {str(e)}")
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -156,9 +184,3 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     async def send_notification(self, event):
         await self.send(text_data=json.dumps(event))
-
-    @sync_to_async
-    def create_notification(self, recipient_id, sender_id, message):
-        Notification.objects.create(
-            recipient_id=recipient_id, sender_id=sender_id, message=message
-        )
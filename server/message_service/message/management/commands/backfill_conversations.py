@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db.models import CharField, Max, Value
+from django.db.models.functions import Cast, Concat, Greatest, Least
+from message.models import Conversation, Message
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills in what messages from before conversations were kept lack: "
+        "the conversation key of each message, and the conversation of each "
+        "chat. Backfilled conversations count as read up to their last message."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        keyed = 0
+        while True:
+            ids = list(
+                Message.objects.filter(conversation_key="").values_list("id", flat=True)[
+                    :batch_size
+                ]
+            )
+            if not ids:
+                break
+            keyed += Message.objects.filter(id__in=ids).update(
+                conversation_key=Concat(
+                    Cast(Least("sender_id", "recipient_id"), CharField()),
+                    Value("--"),
+                    Cast(Greatest("sender_id", "recipient_id"), CharField()),
+                )
+            )
+
+        last_ids = sorted(
+            Message.objects.values("conversation_key")
+            .annotate(last_id=Max("id"))
+            .order_by()
+            .values_list("last_id", flat=True)
+        )
+        for start in range(0, len(last_ids), batch_size):
+            messages = Message.objects.filter(id__in=last_ids[start : start + batch_size])
+            conversations = []
+            for message in messages:
+                low, high = Conversation.pair(message.sender_id, message.recipient_id)
+                conversations.append(
+                    Conversation(
+                        user_low_id=low,
+                        user_high_id=high,
+                        last_message=message.content[: Conversation.PREVIEW_LENGTH],
+                        last_sender_id=message.sender_id,
+                        last_message_at=message.timestamp,
+                        read_by_low_at=message.timestamp,
+                        read_by_high_at=message.timestamp,
+                    )
+                )
+            # Conversations kept since are newer, they are left as they are
+            Conversation.objects.bulk_create(conversations, ignore_conflicts=True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Keyed {keyed} messages, backfilled the conversations of {len(last_ids)} chats"
+            )
+        )
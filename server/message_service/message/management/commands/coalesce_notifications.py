@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Folds the notifications of each recipient and sender into one row, "
+        "the newest, unread if any of them was. Run it before migrating to "
+        "the one-notification-per-sender schema, it only uses the old columns."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE message_notification SET is_read = false
+                WHERE id IN (
+                    SELECT max(id) FROM message_notification
+                    GROUP BY recipient_id, sender_id
+                    HAVING bool_or(NOT is_read)
+                )
+                """
+            )
+            cursor.execute(
+                """
+                DELETE FROM message_notification
+                WHERE id NOT IN (
+                    SELECT max(id) FROM message_notification
+                    GROUP BY recipient_id, sender_id
+                )
+                """
+            )
+            deleted = cursor.rowcount
+
+        self.stdout.write(self.style.SUCCESS(f"Folded away {deleted} notifications"))
@@ -0,0 +1,45 @@
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from message.notifications import reconcile_unread_counts
+from redis.exceptions import RedisError
+import logging
+
+# Get logger for the message app
+logger = logging.getLogger("message")
+
+
+class Command(BaseCommand):
+    help = (
+        "Corrects the unread notification counters in Redis against the "
+        "database every --interval seconds until stopped. --once checks "
+        "them once and exits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=int, default=settings.NOTIFICATION_RECONCILE_INTERVAL
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.NOTIFICATION_RECONCILE_BATCH_SIZE
+        )
+        parser.add_argument("--once", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            corrected = reconcile_unread_counts(options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Corrected {corrected} notification counters")
+            )
+            return
+
+        stopping = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+        while not stopping.is_set():
+            try:
+                reconcile_unread_counts(options["batch_size"])
+            except RedisError as e:
+                logger.error(f"Failed to reconcile notification counters: {str(e)}")
+            stopping.wait(options["interval"])
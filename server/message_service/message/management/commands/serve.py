@@ -0,0 +1,44 @@
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from message_service.supervisor import ManagedProcess, gunicorn_args, supervise
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the message service's HTTP and websocket app under gunicorn with "
+        "uvicorn workers, supervised and restarted if it exits. --only "
+        "reconciler runs the notification counter reconciler instead, in a "
+        "deployment of its own as one is enough for every replica."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=settings.SERVE_BIND)
+        parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS)
+        parser.add_argument("--keepalive", type=int, default=settings.SERVE_KEEPALIVE)
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=["web", "reconciler"],
+            help="Run only the named process, may be repeated. Defaults to web.",
+        )
+
+    def handle(self, *args, **options):
+        # gunicorn finishes in-flight requests and closes the websockets
+        # before it exits
+        processes = [
+            ManagedProcess(
+                "web",
+                gunicorn_args(
+                    "message_service.asgi:application",
+                    options,
+                    "uvicorn_worker.UvicornWorker",
+                ),
+            ),
+            ManagedProcess(
+                "reconciler",
+                [sys.executable, "manage.py", "reconcile_notification_counts"],
+            ),
+        ]
+        only = options["only"] or ["web"]
+        supervise([p for p in processes if p.name in only])
@@ -1,25 +1,221 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
 # Create your models here.
 
 
+def conversation_key(user_id, other_id):
+    """The same for both users of a chat, "{lower id}--{higher id}" """
+    low, high = sorted((int(user_id), int(other_id)))
+    return f"{low}--{high}"
+
+
 class Message(models.Model):
     sender_id = models.IntegerField()
     recipient_id = models.IntegerField()
+    conversation_key = models.CharField(max_length=32, default="")
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the message is received, it is written later
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["timestamp"]
+        indexes = [
+            # A chat's history in order, read a page at a time
+            models.Index(
+                fields=["conversation_key", "timestamp", "id"],
+                name="message_conversation_idx",
+            ),
+        ]
+
+
+class Conversation(models.Model):
+    """
+    The chat between two users, keyed by their ids in ascending order like
+    the chat_{low}--{high} room of ChatConsumer. Holds what the chat list
+    shows, the last message and each side's unread count, so listing a
+    user's chats does not read their messages.
+
+    Worker processes write their messages in their own batches, so a
+    message can be written after a later one or after the read that
+    covered it. The last message only moves forward in time, and each
+    side's unread count counts the messages after that side's read mark,
+    the time it last read the chat.
+    """
+
+    PREVIEW_LENGTH = 255
+
+    user_low_id = models.IntegerField()
+    user_high_id = models.IntegerField()
+    last_message = models.CharField(max_length=PREVIEW_LENGTH)
+    last_sender_id = models.IntegerField()
+    last_message_at = models.DateTimeField()
+    unread_by_low = models.PositiveIntegerField(default=0)
+    unread_by_high = models.PositiveIntegerField(default=0)
+    read_by_low_at = models.DateTimeField(null=True, blank=True)
+    read_by_high_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_low_id", "user_high_id"], name="conversation_pair_unique"
+            ),
+        ]
+        indexes = [
+            # A user's chats, most recent first, from either side of the pair
+            models.Index(
+                fields=["user_low_id", "-last_message_at"],
+                name="conversation_low_recent_idx",
+            ),
+            models.Index(
+                fields=["user_high_id", "-last_message_at"],
+                name="conversation_high_recent_idx",
+            ),
+        ]
+
+    @staticmethod
+    def pair(user_id, other_id):
+        return tuple(sorted((int(user_id), int(other_id))))
+
+    @staticmethod
+    def unread_field(user_id, other_id):
+        """The counter of messages user_id has not read"""
+        low, high = Conversation.pair(user_id, other_id)
+        return "unread_by_low" if int(user_id) == low else "unread_by_high"
+
+    @staticmethod
+    def read_mark_field(user_id, other_id):
+        """When user_id last read the chat"""
+        low, high = Conversation.pair(user_id, other_id)
+        return "read_by_low_at" if int(user_id) == low else "read_by_high_at"
+
+    @classmethod
+    def for_user(cls, user_id):
+        return cls.objects.filter(
+            Q(user_low_id=user_id) | Q(user_high_id=user_id)
+        ).order_by("-last_message_at")
+
+    def other_user_id(self, user_id):
+        return self.user_high_id if self.user_low_id == user_id else self.user_low_id
+
+    def unread_count(self, user_id):
+        return getattr(self, Conversation.unread_field(user_id, self.other_user_id(user_id)))
+
+    @classmethod
+    def record(cls, low, high, last_message=None, received=None, read=None):
+        """
+        Apply a batch of changes to the conversation of users low and high,
+        whose messages are already saved. last_message, if any, becomes its
+        last message unless a later one already is. received maps each
+        recipient to the timestamps of their new messages, read maps a user
+        to when they read the chat.
+        """
+        received = received or {}
+        read = read or {}
+        values = {}
+        for user_id in (low, high):
+            other_id = high if user_id == low else low
+            field = cls.unread_field(user_id, other_id)
+            mark = cls.read_mark_field(user_id, other_id)
+            if user_id in read:
+                # Postgres' GREATEST skips NULL. A read written after a later
+                # one does not move the mark back.
+                values[mark] = Greatest(mark, Value(read[user_id]))
+                # Recounted, the new messages are saved and counted with the rest
+                values[field] = Coalesce(
+                    Subquery(
+                        Message.objects.filter(
+                            conversation_key=conversation_key(low, high),
+                            recipient_id=user_id,
+                            timestamp__gt=Greatest(OuterRef(mark), Value(read[user_id])),
+                        )
+                        .order_by()
+                        .values("recipient_id")
+                        .annotate(count=Count("id"))
+                        .values("count")
+                    ),
+                    0,
+                )
+            elif received.get(user_id):
+                # Only messages after the mark are unread, one sent before a
+                # read but written after it was read already
+                timestamps = sorted(received[user_id])
+                values[field] = F(field) + Case(
+                    When(**{f"{mark}__isnull": True}, then=len(timestamps)),
+                    *[
+                        When(**{f"{mark}__lt": timestamp}, then=len(timestamps) - position)
+                        for position, timestamp in enumerate(timestamps)
+                    ],
+                    default=0,
+                )
+        if last_message is not None:
+            is_last = Q(last_message_at__lte=last_message.timestamp)
+            values.update(
+                last_message=Case(
+                    When(is_last, then=Value(last_message.content[: cls.PREVIEW_LENGTH])),
+                    default=F("last_message"),
+                ),
+                last_sender_id=Case(
+                    When(is_last, then=Value(last_message.sender_id)),
+                    default=F("last_sender_id"),
+                ),
+                last_message_at=Greatest("last_message_at", Value(last_message.timestamp)),
+            )
+        if not values:
+            return
+        conversation = cls.objects.filter(user_low_id=low, user_high_id=high)
+        if conversation.update(**values) or last_message is None:
+            return
+        initial = {}
+        for user_id in (low, high):
+            other_id = high if user_id == low else low
+            timestamps = received.get(user_id, [])
+            if user_id in read:
+                initial[cls.read_mark_field(user_id, other_id)] = read[user_id]
+                timestamps = [timestamp for timestamp in timestamps if timestamp > read[user_id]]
+            initial[cls.unread_field(user_id, other_id)] = len(timestamps)
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    user_low_id=low,
+                    user_high_id=high,
+                    last_message=last_message.content[: cls.PREVIEW_LENGTH],
+                    last_sender_id=last_message.sender_id,
+                    last_message_at=last_message.timestamp,
+                    **initial,
+                )
+        except IntegrityError:
+            # Another worker created it in the meantime
+            conversation.update(**values)
 
 
 class Notification(models.Model):
+    """
+    The unread summary of the messages one sender sent one recipient, a
+    new message updates it instead of adding a row
+    """
+
     recipient_id = models.IntegerField()
     sender_id = models.IntegerField()
     message = models.CharField(max_length=255)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
     is_read = models.BooleanField(default=False)
+    unread_count = models.PositiveIntegerField(default=1)
 
     class Meta:
         db_table = "message_notification"
         ordering = ["-timestamp"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient_id", "sender_id"], name="notification_pair_unique"
+            ),
+        ]
+        indexes = [
+            # A user's notifications a page at a time, most recent first
+            models.Index(
+                fields=["recipient_id", "-timestamp", "-id"],
+                name="notification_recent_idx",
+            ),
+        ]
@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+import redis
+from django.conf import settings
+from django.db.models import Sum
+from redis.exceptions import RedisError
+from .models import Notification
+
+# Get logger for the message app
+logger = logging.getLogger("message")
+
+KEY_PREFIX = "notification_unread:"
+
+# Adjustments are sent right after their commit. A drifted counter is only
+# corrected once the adjustments of what the database already counted had
+# this long to land.
+ADJUST_SETTLE_SECONDS = 1
+
+# Adjust a counter only if it is there, a missing one is rebuilt from the
+# database on the next read. A counter never goes below zero.
+ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+if count < 0 then
+    redis.call('SET', KEYS[1], 0, 'KEEPTTL')
+    return 0
+end
+return count
+"""
+
+# Correct a counter unless it changed since it was read
+CORRECT_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'KEEPTTL')
+    return 1
+end
+return 0
+"""
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_counter_redis():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis.from_url(
+                    settings.NOTIFICATION_COUNTER_REDIS_URL,
+                    socket_timeout=settings.NOTIFICATION_COUNTER_REDIS_TIMEOUT,
+                    socket_connect_timeout=settings.NOTIFICATION_COUNTER_REDIS_TIMEOUT,
+                )
+    return _client
+
+
+def counter_key(user_id):
+    return f"{KEY_PREFIX}{int(user_id)}"
+
+
+def unread_counts_from_db(user_ids):
+    """Unread messages across each user's notifications, by user id"""
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(
+        Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+        .values("recipient_id")
+        .annotate(unread=Sum("unread_count"))
+        .order_by()
+        .values_list("recipient_id", "unread")
+    )
+    return counts
+
+
+def unread_count(user_id):
+    """A user's unread count from Redis, rebuilt from the database when missing"""
+    client = get_counter_redis()
+    key = counter_key(user_id)
+    try:
+        count = client.get(key)
+        if count is not None:
+            return int(count)
+    except RedisError as e:
+        logger.error(f"Notification counters unavailable: {str(e)}")
+        return unread_counts_from_db([user_id])[user_id]
+
+    count = unread_counts_from_db([user_id])[user_id]
+    try:
+        # Loses to a counter set meanwhile, that one is at least as recent
+        client.set(key, count, nx=True, ex=settings.NOTIFICATION_COUNTER_TTL)
+    except RedisError as e:
+        logger.error(f"Failed to store notification counter of user {user_id}: {str(e)}")
+    return count
+
+
+def adjust_unread_counts(deltas):
+    """
+    Add deltas, {user id: change}, to the users' counters. Called once the
+    change is committed. A counter missed by an adjustment is corrected by
+    reconcile_unread_counts.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    client = get_counter_redis()
+    try:
+        pipe = client.pipeline(transaction=False)
+        for user_id, delta in deltas.items():
+            pipe.eval(ADJUST_SCRIPT, 1, counter_key(user_id), delta)
+        pipe.execute()
+    except RedisError as e:
+        logger.error(f"Failed to adjust notification counters {deltas}: {str(e)}")
+
+
+def reconcile_unread_counts(batch_size):
+    """
+    Compare every counter in Redis with the database, batch_size users at a
+    time, and correct the ones that drifted. Returns how many were corrected.
+    """
+    client = get_counter_redis()
+    corrected = 0
+    keys = []
+    for key in client.scan_iter(match=f"{KEY_PREFIX}*", count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            corrected += reconcile_batch(client, keys)
+            keys = []
+    if keys:
+        corrected += reconcile_batch(client, keys)
+    return corrected
+
+
+def reconcile_batch(client, keys):
+    # Counters are read before the database. The adjustment of a change the
+    # database counts but the cached value lacks moves the counter before
+    # the correction runs, and CORRECT_SCRIPT then leaves it alone.
+    cached = client.mget(keys)
+    user_ids = [int(key.decode()[len(KEY_PREFIX) :]) for key in keys]
+    counts = unread_counts_from_db(user_ids)
+
+    pipe = client.pipeline(transaction=False)
+    drifted = []
+    for key, user_id, value in zip(keys, user_ids, cached):
+        if value is not None and int(value) != counts[user_id]:
+            pipe.eval(CORRECT_SCRIPT, 1, key, value, counts[user_id])
+            drifted.append(user_id)
+    if not drifted:
+        return 0
+    time.sleep(ADJUST_SETTLE_SECONDS)
+    corrected = sum(pipe.execute())
+    logger.warning(
+        f"Corrected {corrected} of {len(drifted)} drifted notification counters: {drifted}"
+    )
+    return corrected
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a user's notifications, most recent first, so
+    a page costs the same however far down the list it is
+    """
+
+    ordering = ("-timestamp", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
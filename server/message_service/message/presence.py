@@ -0,0 +1,64 @@
+import logging
+import time
+import redis.asyncio as redis
+from django.conf import settings
+from redis.exceptions import RedisError
+
+# Get logger for the message app
+logger = logging.getLogger("message")
+
+_client = None
+
+
+def get_presence_redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.CHAT_PRESENCE_REDIS_URL,
+            socket_timeout=settings.CHAT_PRESENCE_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.CHAT_PRESENCE_REDIS_TIMEOUT,
+        )
+    return _client
+
+
+def presence_key(user_id, other_id):
+    """Sorted set of the channels on which user_id has the chat with other_id open"""
+    return f"chat_presence:{int(user_id)}:{int(other_id)}"
+
+
+async def enter(user_id, other_id, channel_name):
+    """
+    Record that user_id has the chat with other_id open on channel_name.
+    Called on connect and whenever a message reaches the channel, a
+    channel not seen for CHAT_PRESENCE_TTL seconds counts as gone, in case
+    its worker died without disconnecting it.
+    """
+    key = presence_key(user_id, other_id)
+    try:
+        async with get_presence_redis().pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {channel_name: time.time()})
+            pipe.expire(key, settings.CHAT_PRESENCE_TTL)
+            await pipe.execute()
+    except RedisError as e:
+        logger.error(f"Failed to record presence of user {user_id}: {str(e)}")
+
+
+async def leave(user_id, other_id, channel_name):
+    try:
+        await get_presence_redis().zrem(presence_key(user_id, other_id), channel_name)
+    except RedisError as e:
+        logger.error(f"Failed to clear presence of user {user_id}: {str(e)}")
+
+
+async def is_present(user_id, other_id):
+    """Whether user_id has the chat with other_id open. False if unknown."""
+    try:
+        count = await get_presence_redis().zcount(
+            presence_key(user_id, other_id),
+            time.time() - settings.CHAT_PRESENCE_TTL,
+            "+inf",
+        )
+    except RedisError as e:
+        logger.error(f"Failed to check presence of user {user_id}: {str(e)}")
+        return False
+    return count > 0
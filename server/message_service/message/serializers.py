@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Message, Notification
+from .models import Conversation, Message, Notification
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -15,4 +15,22 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notification
-        fields = ["id", "sender_id", "message", "timestamp", "is_read"]
+        fields = ["id", "sender_id", "message", "timestamp", "is_read", "unread_count"]
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    """A conversation from the side of the user in context["user_id"]"""
+
+    user_id = serializers.SerializerMethodField()
+    last_message_at = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ")
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversation
+        fields = ["user_id", "last_message", "last_sender_id", "last_message_at", "unread_count"]
+
+    def get_user_id(self, obj):
+        return obj.other_user_id(self.context["user_id"])
+
+    def get_unread_count(self, obj):
+        return obj.unread_count(self.context["user_id"])
@@ -6,5 +6,6 @@ urlpatterns = [
     path("messages/history/<int:user_id>/<int:selected_id>/", views.get_chat_history),
     path("notifications/<int:user_id>/", views.get_notifications),
     path("notifications/count/<int:user_id>/", views.get_notification_count),
+    path("notifications/read/<int:user_id>/", views.mark_notifications_read),
     path("notifications/clear/<int:user_id>/", views.clear_all_notifications),
 ]
@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+import redis
+import requests
+from django.conf import settings
+from redis.exceptions import RedisError
+
+# Get logger for the message app
+logger = logging.getLogger("message")
+
+# Written by user_service, see UserSummaryService there
+KEY_PREFIX = "user_summary:"
+CHANNEL = "user_summary_invalidations"
+
+# Most ids user_service accepts in one summaries request
+MAX_IDS_PER_REQUEST = 100
+
+
+class UserSummaryCache:
+    """
+    Read-through cache of user summaries from user_service.
+
+    A lookup tries an in-process LRU of up to local_size users, then the
+    Redis cache user_service fills, and asks user_service for the rest in
+    one request. user_service publishes the ids of changed users on
+    CHANNEL, and a listener thread evicts them from the LRU. The LRU is
+    cleared whenever the listener (re)subscribes, as invalidations may have
+    been missed in between, and its entries expire after local_ttl seconds
+    regardless.
+    """
+
+    def __init__(self, redis_url, summaries_url, local_ttl, local_size, timeout):
+        self.redis_url = redis_url
+        self.summaries_url = summaries_url
+        self.local_ttl = local_ttl
+        self.local_size = local_size
+        self.timeout = timeout
+        self.client = redis.Redis.from_url(
+            redis_url, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every eviction, so a lookup that raced with one does
+        # not put what it read back into the LRU
+        self._generation = 0
+        self._listener_pid = None
+
+    def get(self, user_id):
+        return self.get_many([user_id]).get(int(user_id))
+
+    def get_many(self, user_ids):
+        """Summaries by user id. Users that could not be fetched are left out."""
+        self._ensure_listener()
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        now = time.monotonic()
+        summaries = {}
+        with self._lock:
+            generation = self._generation
+            for user_id in user_ids:
+                entry = self._local.get(user_id)
+                if entry is not None and entry[0] > now:
+                    self._local.move_to_end(user_id)
+                    summaries[user_id] = entry[1]
+
+        missing = [user_id for user_id in user_ids if user_id not in summaries]
+        if not missing:
+            return summaries
+        fetched = self._from_redis(missing)
+        fetched.update(
+            self._from_user_service([user_id for user_id in missing if user_id not in fetched])
+        )
+
+        with self._lock:
+            if self._generation == generation:
+                expires_at = now + self.local_ttl
+                for user_id, summary in fetched.items():
+                    self._local[user_id] = (expires_at, summary)
+                    self._local.move_to_end(user_id)
+                while len(self._local) > self.local_size:
+                    self._local.popitem(last=False)
+        summaries.update(fetched)
+        return summaries
+
+    def evict(self, user_ids=None):
+        """Drop users from the LRU, or everything without user_ids"""
+        with self._lock:
+            self._generation += 1
+            if user_ids is None:
+                self._local.clear()
+            else:
+                for user_id in user_ids:
+                    self._local.pop(int(user_id), None)
+
+    def _from_redis(self, user_ids):
+        try:
+            cached = self.client.mget([f"{KEY_PREFIX}{user_id}" for user_id in user_ids])
+        except RedisError as e:
+            logger.error(f"User summary cache unavailable: {str(e)}")
+            return {}
+        return {
+            user_id: json.loads(value)
+            for user_id, value in zip(user_ids, cached)
+            if value is not None
+        }
+
+    def _from_user_service(self, user_ids):
+        summaries = {}
+        for start in range(0, len(user_ids), MAX_IDS_PER_REQUEST):
+            chunk = user_ids[start : start + MAX_IDS_PER_REQUEST]
+            try:
+                response = requests.get(
+                    self.summaries_url,
+                    params={"ids": ",".join(str(user_id) for user_id in chunk)},
+                    timeout=5,
+                )
+                response.raise_for_status()
+                summaries.update((summary["id"], summary) for summary in response.json())
+            except (requests.RequestException, ValueError, KeyError) as e:
+                logger.error(f"Failed to fetch users {chunk}: {str(e)}")
+        return summaries
+
+    def _ensure_listener(self):
+        # Threads do not survive a fork, every worker process starts its own
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._local.clear()
+            self._generation += 1
+        threading.Thread(
+            target=self._listen, name="user-summary-invalidations", daemon=True
+        ).start()
+
+    def _listen(self):
+        while True:
+            try:
+                # No socket timeout, the subscription idles between messages
+                pubsub = redis.Redis.from_url(
+                    self.redis_url, socket_connect_timeout=self.timeout
+                ).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                self.evict()
+                for message in pubsub.listen():
+                    try:
+                        self.evict(json.loads(message["data"]))
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"Ignoring user summary invalidation: {str(e)}")
+            except RedisError as e:
+                logger.error(f"User summary invalidations unavailable: {str(e)}")
+                self.evict()
+            time.sleep(1)
+
+
+_user_summaries = None
+_user_summaries_lock = threading.Lock()
+
+
+def get_user_summaries():
+    global _user_summaries
+    if _user_summaries is None:
+        with _user_summaries_lock:
+            if _user_summaries is None:
+                _user_summaries = UserSummaryCache(
+                    settings.USER_SUMMARY_REDIS_URL,
+                    f"{os.getenv('USER_SERVICE_URL')}/users/summaries/",
+                    local_ttl=settings.USER_SUMMARY_LOCAL_TTL,
+                    local_size=settings.USER_SUMMARY_LOCAL_SIZE,
+                    timeout=settings.USER_SUMMARY_REDIS_TIMEOUT,
+                )
+    return _user_summaries
@@ -1,9 +1,16 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework.response import Response
-from .models import Message, Notification
+from .models import Conversation, Message, Notification, conversation_key
 from rest_framework import status
-from .serializers import MessageSerializer, NotificationSerializer
-from django.db.models import Q
+from .serializers import (
+    ConversationSerializer,
+    MessageSerializer,
+    NotificationSerializer,
+)
 from rest_framework.decorators import api_view, permission_classes
+from .notifications import adjust_unread_counts, unread_count
+from .pagination import NotificationCursorPagination
 from .permissions import IsOwner
 import logging
 
@@ -15,26 +22,18 @@ logger = logging.getLogger("message")
 @permission_classes([IsOwner])
 def get_chat_users(request, user_id):
     """
-    Get all users that the current user has chatted with
+    Get the conversations of the current user, most recent first
     """
     try:
         logger.info(f"Retrieving chat users for user {user_id}")
 
-        # Get all messages where user is either sender or recipient
-        messages = Message.objects.filter(
-            Q(sender_id=user_id) | Q(recipient_id=user_id)
+        conversations = Conversation.for_user(user_id)
+        serializer = ConversationSerializer(
+            conversations, many=True, context={"user_id": user_id}
         )
 
-        # Extract unique user IDs
-        chat_users = set()
-        for message in messages:
-            if message.sender_id != user_id:
-                chat_users.add(message.sender_id)
-            if message.recipient_id != user_id:
-                chat_users.add(message.recipient_id)
-
-        logger.info(f"Found {len(chat_users)} chat users for user {user_id}")
-        return Response(list(chat_users), status=status.HTTP_200_OK)
+        logger.info(f"Found {len(serializer.data)} chat users for user {user_id}")
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
     except Exception as e:
         logger.error(f"Error retrieving chat users for user {user_id}: {str(e)}")
@@ -45,23 +44,71 @@ def get_chat_users(request, user_id):
 @permission_classes([IsOwner])
 def get_chat_history(request, user_id, selected_id):
     """
-    Get chat history between two users
+    Get a page of the chat history between two users, oldest message first.
+    Without a cursor it is the latest page, ?before=<message id> gets the
+    messages before that one and ?after=<message id> the ones after it.
     """
     try:
         logger.info(
             f"Retrieving chat history between users {user_id} and {selected_id}"
         )
 
+        try:
+            limit = min(
+                int(request.query_params.get("limit", settings.CHAT_HISTORY_PAGE_SIZE)),
+                settings.CHAT_HISTORY_MAX_PAGE_SIZE,
+            )
+            before = request.query_params.get("before")
+            after = request.query_params.get("after")
+            cursor_id = int(before or after) if before or after else None
+        except ValueError:
+            return Response(
+                {"error": "limit, before and after must be integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if limit < 1 or (before and after):
+            return Response(
+                {"error": "Pass a positive limit and at most one of before and after"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Served by message_conversation_idx, a page costs the same at any depth
         messages = Message.objects.filter(
-            (Q(sender_id=user_id) & Q(recipient_id=selected_id))
-            | (Q(sender_id=selected_id) & Q(recipient_id=user_id))
-        ).order_by("timestamp")
-
-        serializer = MessageSerializer(messages, many=True)
+            conversation_key=conversation_key(user_id, selected_id)
+        )
+        if cursor_id is not None:
+            cursor = messages.filter(id=cursor_id).values("timestamp").first()
+            if cursor is None:
+                return Response(
+                    {"error": "Message not found in this chat"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if after:
+                messages = messages.filter(timestamp__gte=cursor["timestamp"]).exclude(
+                    timestamp=cursor["timestamp"], id__lte=cursor_id
+                )
+            else:
+                messages = messages.filter(timestamp__lte=cursor["timestamp"]).exclude(
+                    timestamp=cursor["timestamp"], id__gte=cursor_id
+                )
+
+        if after:
+            page = list(messages.order_by("timestamp", "id")[: limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit]
+        else:
+            page = list(messages.order_by("-timestamp", "-id")[: limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit][::-1]
+
+        serializer = MessageSerializer(page, many=True)
         logger.info(
-            f"Retrieved {len(messages)} messages between users {user_id} and {selected_id}"
+            f"Retrieved {len(page)} messages between users {user_id} and {selected_id}"
+        )
+        return Response(
+            {"results": serializer.data, "has_more": has_more},
+            status=status.HTTP_200_OK,
         )
-        return Response(serializer.data, status=status.HTTP_200_OK)
 
     except Exception as e:
         logger.error(
@@ -74,14 +121,14 @@ def get_chat_history(request, user_id, selected_id):
 @permission_classes([IsOwner])
 def get_notifications(request, user_id):
     """
-    Get all notifications for a user
+    Get a page of a user's notifications, most recent first
     """
     try:
-        notifications = Notification.objects.filter(recipient_id=user_id).order_by(
-            "-timestamp"
-        )
-        serializer = NotificationSerializer(notifications, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        notifications = Notification.objects.filter(recipient_id=user_id)
+        paginator = NotificationCursorPagination()
+        page = paginator.paginate_queryset(notifications, request)
+        serializer = NotificationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     except Exception as e:
         logger.error(f"Error retrieving notifications: {str(e)}")
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -91,18 +138,72 @@ def get_notifications(request, user_id):
 @permission_classes([IsOwner])
 def get_notification_count(request, user_id):
     try:
-        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
-        return Response({"count": count}, status=status.HTTP_200_OK)
+        return Response({"count": unread_count(user_id)}, status=status.HTTP_200_OK)
     except Exception as e:
         logger.error(f"Error retrieving notification count: {str(e)}")
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(["POST"])
+@permission_classes([IsOwner])
+def mark_notifications_read(request, user_id):
+    """
+    Mark the notifications in {"ids": [...]} read, or all of them with
+    {"all": true}. Returns how many were marked and the new unread count.
+    """
+    ids = request.data.get("ids")
+    mark_all = request.data.get("all") is True
+    if not mark_all and not (
+        isinstance(ids, list)
+        and 0 < len(ids) <= settings.NOTIFICATION_MARK_READ_MAX_IDS
+        and all(isinstance(notification_id, int) for notification_id in ids)
+    ):
+        return Response(
+            {
+                "error": "Pass all: true or a list of at most "
+                f"{settings.NOTIFICATION_MARK_READ_MAX_IDS} notification ids"
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        with transaction.atomic():
+            notifications = Notification.objects.select_for_update().filter(
+                recipient_id=user_id, is_read=False
+            )
+            if not mark_all:
+                notifications = notifications.filter(id__in=ids)
+            marked = list(notifications.values_list("id", "unread_count"))
+            if marked:
+                Notification.objects.filter(
+                    id__in=[notification_id for notification_id, count in marked]
+                ).update(is_read=True)
+                unread = sum(count for notification_id, count in marked)
+                transaction.on_commit(lambda: adjust_unread_counts({user_id: -unread}))
+
+        logger.info(f"Marked {len(marked)} notifications of user {user_id} read")
+        return Response(
+            {"marked": len(marked), "count": unread_count(user_id)},
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        logger.error(f"Error marking notifications read: {str(e)}")
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(["DELETE"])
 @permission_classes([IsOwner])
 def clear_all_notifications(request, user_id):
     try:
-        Notification.objects.filter(recipient_id=user_id).delete()
+        with transaction.atomic():
+            notifications = Notification.objects.select_for_update().filter(
+                recipient_id=user_id
+            )
+            unread = sum(
+                notifications.filter(is_read=False).values_list("unread_count", flat=True)
+            )
+            notifications.delete()
+            transaction.on_commit(lambda: adjust_unread_counts({user_id: -unread}))
         return Response(
             {"message": "All notifications cleared"}, status=status.HTTP_200_OK
         )
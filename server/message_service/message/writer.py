@@ -0,0 +1,287 @@
+import asyncio
+import logging
+from collections import defaultdict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connection, transaction
+from django.utils import timezone
+from .models import Conversation, Message, Notification, conversation_key
+from .notifications import adjust_unread_counts
+
+# Get logger for the message app
+logger = logging.getLogger("message")
+
+MAX_RETRY_DELAY = 30
+
+
+@sync_to_async
+def reserve_ids(count):
+    """count ids from the message table's sequence, so messages get theirs before they are written"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [Message._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def upsert_notifications(notifications):
+    """
+    Fold notifications into the one row per recipient and sender. A row
+    that was read starts counting again from the new messages.
+    notifications maps (recipient_id, sender_id) to (text, timestamp, count).
+    """
+    table = Notification._meta.db_table
+    rows = [
+        (recipient_id, sender_id, text, timestamp, count)
+        for (recipient_id, sender_id), (text, timestamp, count) in notifications.items()
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table}
+                (recipient_id, sender_id, message, timestamp, is_read, unread_count)
+            VALUES {", ".join(["(%s, %s, %s, %s, false, %s)"] * len(rows))}
+            ON CONFLICT (recipient_id, sender_id) DO UPDATE SET
+                message = EXCLUDED.message,
+                timestamp = EXCLUDED.timestamp,
+                is_read = false,
+                unread_count = CASE WHEN {table}.is_read THEN EXCLUDED.unread_count
+                    ELSE {table}.unread_count + EXCLUDED.unread_count END
+            """,
+            [value for row in rows for value in row],
+        )
+
+
+@sync_to_async
+def write_batch(batch):
+    """
+    Write a batch of buffered operations in one transaction: every message
+    with one INSERT, the notifications with one upsert, and one UPDATE per
+    conversation touched. Operations are ("message", Message),
+    ("notification", recipient_id, sender_id, text, timestamp) or
+    ("read", user_id, other_id, timestamp), in the order they happened.
+    """
+    # A connection a failed write left broken is reopened for the retry
+    connection.close_if_unusable_or_obsolete()
+    messages = []
+    notifications = {}
+    # (low, high): the latest message, the timestamps of the new messages
+    # by recipient, and the latest read by user
+    changes = defaultdict(lambda: {"last": None, "received": defaultdict(list), "read": {}})
+    for operation in batch:
+        if operation[0] == "message":
+            message = operation[1]
+            messages.append(message)
+            change = changes[Conversation.pair(message.sender_id, message.recipient_id)]
+            if change["last"] is None or change["last"].timestamp <= message.timestamp:
+                change["last"] = message
+            change["received"][message.recipient_id].append(message.timestamp)
+        elif operation[0] == "notification":
+            recipient_id, sender_id, text, timestamp = operation[1:]
+            count = notifications.get((recipient_id, sender_id), (None, None, 0))[2]
+            notifications[(recipient_id, sender_id)] = (text, timestamp, count + 1)
+        else:
+            user_id, other_id, timestamp = operation[1:]
+            read = changes[Conversation.pair(user_id, other_id)]["read"]
+            read[user_id] = max(read.get(user_id, timestamp), timestamp)
+
+    with transaction.atomic():
+        if messages and Message.objects.filter(id=messages[0].id).exists():
+            # A retry of a batch whose commit went through but was not confirmed
+            return
+        Message.objects.bulk_create(messages)
+        if notifications:
+            upsert_notifications(notifications)
+            # Every folded message is unread, whether its row was read or not
+            added = defaultdict(int)
+            for (recipient_id, sender_id), (text, timestamp, count) in notifications.items():
+                added[recipient_id] += count
+            transaction.on_commit(lambda: adjust_unread_counts(added))
+        for (low, high), change in changes.items():
+            Conversation.record(low, high, change["last"], change["received"], change["read"])
+
+
+def describe(operation):
+    """An operation as logged when it is dropped"""
+    if operation[0] == "message":
+        message = operation[1]
+        return (
+            f"message {message.id} from user {message.sender_id} to user "
+            f"{message.recipient_id}, {message.content!r}"
+        )
+    return repr(operation)
+
+
+class MessageWriter:
+    """
+    Write-behind buffer for one worker process's chat messages.
+
+    A message gets its id from a block reserved from the table's sequence
+    and is handed back at once, so it is broadcast without waiting for the
+    database. Buffered messages, notifications and read marks are written
+    together every MESSAGE_FLUSH_INTERVAL ms, or as soon as
+    MESSAGE_FLUSH_BATCH_SIZE are waiting.
+
+    At most MESSAGE_MAX_PENDING operations are buffered or being written;
+    past that, senders wait for a flush. A write that failed on the
+    connection is retried with backoff, keeping its operations in order. A
+    batch the database rejects is split until the operations it rejects
+    are alone, and those are logged and dropped. close() writes everything
+    buffered before it returns, the ASGI lifespan shutdown calls it.
+    """
+
+    def __init__(self, flush_interval, batch_size, max_pending, id_block_size):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.id_block_size = id_block_size
+        self.pending = []
+        self.ids = []
+        self.ids_lock = asyncio.Lock()
+        self.space = asyncio.Semaphore(max_pending)
+        self.has_pending = asyncio.Event()
+        self.batch_full = asyncio.Event()
+        self.closing = False
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def submit_message(self, sender_id, recipient_id, content):
+        """Buffer a message, returns it"""
+        await self.space.acquire()
+        try:
+            message_id = await self.next_id()
+        except Exception:
+            self.space.release()
+            raise
+        message = Message(
+            id=message_id,
+            sender_id=sender_id,
+            recipient_id=recipient_id,
+            conversation_key=conversation_key(sender_id, recipient_id),
+            content=content,
+            timestamp=timezone.now(),
+        )
+        self.add(("message", message))
+        return message
+
+    async def submit_notification(self, recipient_id, sender_id, text):
+        """Buffer a notification, folded into the recipient's one from sender_id"""
+        await self.space.acquire()
+        self.add(("notification", int(recipient_id), int(sender_id), text, timezone.now()))
+
+    async def mark_read(self, user_id, other_id):
+        """Buffer that user_id has read the chat with other_id up to now"""
+        await self.space.acquire()
+        self.add(("read", int(user_id), int(other_id), timezone.now()))
+
+    async def next_id(self):
+        async with self.ids_lock:
+            if not self.ids:
+                self.ids = await reserve_ids(self.id_block_size)
+            return self.ids.pop(0)
+
+    def add(self, operation):
+        self.pending.append(operation)
+        self.has_pending.set()
+        if len(self.pending) >= self.batch_size:
+            self.batch_full.set()
+
+    async def run(self):
+        failures = 0
+        while True:
+            await self.has_pending.wait()
+            if not self.closing and len(self.pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self.batch_full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self.pending[: self.batch_size]
+            try:
+                await self.write(batch)
+            except (OperationalError, InterfaceError) as e:
+                failures += 1
+                delay = min(2**failures, MAX_RETRY_DELAY)
+                logger.error(
+                    f"Failed to write buffered chat operations, {len(self.pending)} "
+                    f"pending, retrying in {delay}s: {str(e)}"
+                )
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+
+            if len(self.pending) < self.batch_size:
+                self.batch_full.clear()
+            if not self.pending:
+                self.has_pending.clear()
+                if self.closing:
+                    return
+
+    async def write(self, batch):
+        """
+        Write batch, the first operations pending. If the database rejects
+        it, write its halves instead, down to single operations, and drop
+        the ones it rejects. Connection errors are raised, whatever was
+        written before one is no longer pending.
+        """
+        try:
+            await write_batch(batch)
+        except (OperationalError, InterfaceError):
+            raise
+        except Exception as e:
+            if len(batch) > 1:
+                half = len(batch) // 2
+                await self.write(batch[:half])
+                await self.write(batch[half:])
+                return
+            logger.error(f"Dropping chat operation {describe(batch[0])}: {str(e)}")
+        else:
+            logger.debug(f"Wrote {len(batch)} buffered chat operations")
+        self.done(len(batch))
+
+    def done(self, count):
+        del self.pending[:count]
+        for _ in range(count):
+            self.space.release()
+
+    async def close(self):
+        self.closing = True
+        self.has_pending.set()
+        self.batch_full.set()
+        if not self.pending:
+            self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Chat message buffer written and closed")
+
+
+_writer = None
+
+
+def get_message_writer():
+    """The writer of the running worker process, started on first use"""
+    global _writer
+    if _writer is None:
+        _writer = MessageWriter(
+            flush_interval=settings.MESSAGE_FLUSH_INTERVAL / 1000,
+            batch_size=settings.MESSAGE_FLUSH_BATCH_SIZE,
+            max_pending=settings.MESSAGE_MAX_PENDING,
+            id_block_size=settings.MESSAGE_ID_BLOCK_SIZE,
+        )
+    return _writer
+
+
+async def lifespan(scope, receive, send):
+    """ASGI lifespan app, writes the buffered messages before the worker exits"""
+    global _writer
+    while True:
+        event = await receive()
+        if event["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif event["type"] == "lifespan.shutdown":
+            if _writer is not None:
+                await _writer.close()
+                _writer = None
+            await send({"type": "lifespan.shutdown.complete"})
+            return
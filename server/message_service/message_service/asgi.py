@@ -9,20 +9,25 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-from message import routing
-from message.channels_middleware import JWTWebsocketMiddleware
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "message_service.settings")
 
 application = get_asgi_application()
 
+# Imported after Django is set up, the consumers import the app's models
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from message import routing  # noqa: E402
+from message.channels_middleware import JWTWebsocketMiddleware  # noqa: E402
+from message.writer import lifespan  # noqa: E402
+
 application = ProtocolTypeRouter(
     {
         "http": application,
         "websocket": JWTWebsocketMiddleware(
             AuthMiddlewareStack(URLRouter(routing.websocket_urlpatterns))
         ),
+        # Writes the buffered chat messages when a worker shuts down
+        "lifespan": lifespan,
     }
 )
@@ -154,6 +154,48 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Process launcher, see `manage.py serve`
+# Each worker runs an event loop, so there is no thread setting
+SERVE_BIND = os.getenv('SERVE_BIND', '0.0.0.0:8003')
+SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', (os.cpu_count() or 1) + 1))
+SERVE_KEEPALIVE = int(os.getenv('SERVE_KEEPALIVE', 5))
+SERVE_TIMEOUT = int(os.getenv('SERVE_TIMEOUT', 30))
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30))
+# Recycling a worker drops its open websockets, so it is off by default
+SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', 0))
+
+# User summaries cached by user_service, see message/user_summaries.py
+USER_SUMMARY_REDIS_URL = os.getenv('USER_SUMMARY_REDIS_URL', 'redis://redis:6379/5')
+USER_SUMMARY_REDIS_TIMEOUT = float(os.getenv('USER_SUMMARY_REDIS_TIMEOUT', 0.5))
+USER_SUMMARY_LOCAL_TTL = int(os.getenv('USER_SUMMARY_LOCAL_TTL', 30))
+USER_SUMMARY_LOCAL_SIZE = int(os.getenv('USER_SUMMARY_LOCAL_SIZE', 10000))
+
+# Messages per page of chat history
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_SIZE', 50))
+CHAT_HISTORY_MAX_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_MAX_PAGE_SIZE', 200))
+
+# Write-behind buffer of chat messages, see message/writer.py
+MESSAGE_FLUSH_INTERVAL = int(os.getenv('MESSAGE_FLUSH_INTERVAL', 50))  # ms
+MESSAGE_FLUSH_BATCH_SIZE = int(os.getenv('MESSAGE_FLUSH_BATCH_SIZE', 200))
+MESSAGE_MAX_PENDING = int(os.getenv('MESSAGE_MAX_PENDING', 5000))
+MESSAGE_ID_BLOCK_SIZE = int(os.getenv('MESSAGE_ID_BLOCK_SIZE', 100))
+
+# Who has which chat open, see message/presence.py
+CHAT_PRESENCE_REDIS_URL = os.getenv('CHAT_PRESENCE_REDIS_URL', 'redis://redis:6379/6')
+CHAT_PRESENCE_REDIS_TIMEOUT = float(os.getenv('CHAT_PRESENCE_REDIS_TIMEOUT', 0.5))
+# A chat not delivered to for this long is treated as closed
+CHAT_PRESENCE_TTL = int(os.getenv('CHAT_PRESENCE_TTL', 600))
+
+# Unread notification counters, see message/notifications.py
+NOTIFICATION_COUNTER_REDIS_URL = os.getenv('NOTIFICATION_COUNTER_REDIS_URL', 'redis://redis:6379/7')
+NOTIFICATION_COUNTER_REDIS_TIMEOUT = float(os.getenv('NOTIFICATION_COUNTER_REDIS_TIMEOUT', 0.5))
+# Counters of users who stop checking expire and are rebuilt when read again
+NOTIFICATION_COUNTER_TTL = int(os.getenv('NOTIFICATION_COUNTER_TTL', 86400))
+NOTIFICATION_RECONCILE_INTERVAL = int(os.getenv('NOTIFICATION_RECONCILE_INTERVAL', 300))
+NOTIFICATION_RECONCILE_BATCH_SIZE = int(os.getenv('NOTIFICATION_RECONCILE_BATCH_SIZE', 500))
+# Most notifications one mark-read request may name
+NOTIFICATION_MARK_READ_MAX_IDS = int(os.getenv('NOTIFICATION_MARK_READ_MAX_IDS', 100))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
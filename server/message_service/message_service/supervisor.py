@@ -0,0 +1,127 @@
+import logging
+import signal
+import subprocess
+import sys
+import time
+from django.conf import settings
+
+# Kept the same in every service: each one is built from its own directory,
+# so they cannot share the module. Change them all together.
+logger = logging.getLogger(__name__)
+
+# A process that ran at least this long is considered healthy again, so its
+# next crash is restarted without delay
+STABLE_AFTER = 60
+MAX_RESTART_DELAY = 30
+
+
+class ManagedProcess:
+    """A child process that is restarted with backoff whenever it exits."""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.process = None
+        self.started_at = 0
+        self.restart_at = 0
+        self.restarts = 0
+
+    def start(self):
+        logger.info(f"Starting {self.name} process")
+        self.process = subprocess.Popen(self.args, cwd=settings.BASE_DIR)
+        self.started_at = time.monotonic()
+
+    def check(self):
+        if self.process is None:
+            if time.monotonic() >= self.restart_at:
+                self.start()
+            return
+
+        code = self.process.poll()
+        if code is None:
+            return
+        if time.monotonic() - self.started_at >= STABLE_AFTER:
+            self.restarts = 0
+        delay = min(2**self.restarts, MAX_RESTART_DELAY)
+        self.restarts += 1
+        logger.error(f"{self.name} process exited with code {code}, restarting in {delay}s")
+        self.process = None
+        self.restart_at = time.monotonic() + delay
+
+    def send_signal(self, signum):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signum)
+
+    def wait(self, deadline):
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            logger.warning(f"{self.name} process did not stop in time, killing it")
+            self.process.kill()
+            self.process.wait()
+
+
+def supervise(processes):
+    """
+    Run processes until SIGTERM or SIGINT, restarting any that exits. On
+    the way out every child gets SIGTERM and SERVE_GRACEFUL_TIMEOUT seconds
+    to drain before it is killed. SIGHUP is passed on to the web process,
+    gunicorn replaces its workers gracefully on it.
+    """
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(signum))
+    signal.signal(
+        signal.SIGHUP,
+        lambda signum, frame: [p.send_signal(signum) for p in processes if p.name == "web"],
+    )
+
+    for process in processes:
+        process.start()
+    while not stopping:
+        for process in processes:
+            process.check()
+        time.sleep(0.5)
+
+    logger.info("Stopping, waiting for processes to drain")
+    for process in processes:
+        process.send_signal(signal.SIGTERM)
+    deadline = time.monotonic() + settings.SERVE_GRACEFUL_TIMEOUT + 5
+    for process in processes:
+        process.wait(deadline)
+    logger.info("All processes stopped")
+
+
+def gunicorn_args(app, options, worker_class, threads=None):
+    """The command line of the web process serving app under gunicorn"""
+    args = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        app,
+        "--bind",
+        options["bind"],
+        "--workers",
+        str(options["workers"]),
+        "--worker-class",
+        worker_class,
+    ]
+    if threads is not None:
+        args += ["--threads", str(threads)]
+    return args + [
+        "--keep-alive",
+        str(options["keepalive"]),
+        "--timeout",
+        str(settings.SERVE_TIMEOUT),
+        "--graceful-timeout",
+        str(settings.SERVE_GRACEFUL_TIMEOUT),
+        # Recycle workers now and then so slow leaks cannot build up
+        "--max-requests",
+        str(settings.SERVE_MAX_REQUESTS),
+        "--max-requests-jitter",
+        str(settings.SERVE_MAX_REQUESTS // 10),
+        "--access-logfile",
+        "-",
+    ]
@@ -0,0 +1,45 @@
+import os
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from payment_service.supervisor import ManagedProcess, gunicorn_args, supervise
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the payment service: the web app under gunicorn's pre-forking "
+        "workers and the gRPC server, each supervised as its own process"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=settings.SERVE_BIND)
+        parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS)
+        parser.add_argument("--threads", type=int, default=settings.SERVE_THREADS)
+        parser.add_argument("--keepalive", type=int, default=settings.SERVE_KEEPALIVE)
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=["web", "grpc"],
+            help="Run only the named process, may be repeated",
+        )
+
+    def handle(self, *args, **options):
+        # Every child drains on SIGTERM: gunicorn finishes in-flight requests
+        # and the gRPC server reports NOT_SERVING and waits for its calls
+        processes = [
+            ManagedProcess(
+                "web",
+                gunicorn_args(
+                    "payment_service.wsgi:application",
+                    options,
+                    "gthread",
+                    threads=options["threads"],
+                ),
+            ),
+            ManagedProcess(
+                "grpc", [sys.executable, os.path.join("protos", "server.py")]
+            ),
+        ]
+        if options["only"]:
+            processes = [p for p in processes if p.name in options["only"]]
+        supervise(processes)
@@ -57,5 +57,16 @@ class Escrow(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     released_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            # One escrow per booking, so a retried LockCredits cannot lock
+            # the credits twice
+            models.UniqueConstraint(
+                fields=["booking_id"],
+                condition=~models.Q(status="refunded"),
+                name="escrow_booking_unique",
+            ),
+        ]
+
     def __str__(self):
         return f"Escrow Transaction for student {self.student_id}"
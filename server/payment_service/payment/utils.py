@@ -3,7 +3,7 @@ import json
 from .models import StripeAccount
 from django.db import transaction
 from .models import Transactions
-from protos.client import update_user_credits
+from protos.client import adjust_user_credits
 import stripe
 from django.conf import settings
 import logging
@@ -48,9 +48,15 @@ def handle_checkout_completed(session):
         )
         logger.info(f"Transaction created: ID {transaction.id}")
 
-        grpc_success = update_user_credits(user_id, credits)
+        # Keyed by the payment intent so a redelivered webhook is not credited twice
+        grpc_result = adjust_user_credits(
+            user_id,
+            credits,
+            idempotency_key=f"checkout-{session['payment_intent']}",
+            reason="purchase",
+        )
 
-        if not grpc_success:
+        if not (grpc_result and grpc_result["success"]):
             logger.error(
                 f"Failed to update user credits for user {user_id}, initiating refund"
             )
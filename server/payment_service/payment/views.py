@@ -11,7 +11,7 @@ from .serializers import (
     EscrowSerializer,
 )
 from .permissions import IsOwner
-from protos.client import update_user_credits
+from protos.client import adjust_user_credits
 import os
 from dotenv import load_dotenv
 from django.conf import settings
@@ -262,13 +262,14 @@ class WithdrawView(APIView):
             )
             logger.info(f"Created transaction record: {transaction.id}")
 
-            grpc_success = update_user_credits(
+            debit = adjust_user_credits(
                 user_id,
-                request.data.get("balance_credits") - credits,
-                is_deduction=True,
+                -credits,
+                idempotency_key=f"withdrawal-{transfer.id}",
+                reason="withdrawal",
             )
 
-            if not grpc_success:
+            if not (debit and debit["success"]):
                 logger.error(
                     f"Failed to update user credits, reversing transfer for user {user_id}"
                 )
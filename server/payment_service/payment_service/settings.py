@@ -86,6 +86,9 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'), 
         'PORT': os.getenv('DB_PORT'),
+        # Kept open so the gRPC database threads reuse their connections
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -135,6 +138,39 @@ STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
 
 FRONTEND_DOMAIN = os.getenv('FRONTEND_DOMAIN')
 
+# gRPC Clients
+# Channels are shared per process, see protos/channels.py
+GRPC_CALL_TIMEOUT = float(os.getenv('GRPC_CALL_TIMEOUT', 5))
+GRPC_MAX_ATTEMPTS = int(os.getenv('GRPC_MAX_ATTEMPTS', 3))
+GRPC_KEEPALIVE_TIME_MS = int(os.getenv('GRPC_KEEPALIVE_TIME_MS', 30000))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.getenv('GRPC_KEEPALIVE_TIMEOUT_MS', 10000))
+GRPC_SERVICES = {
+    'user': {
+        'target': f"{os.getenv('USER_SERVICE_GRPC_HOST')}:50051",
+        'service_name': 'user_service.UserService',
+    },
+}
+
+# gRPC Server
+# aio serves every call on one event loop and runs the ORM work on a pool of
+# GRPC_DB_POOL_SIZE threads; sync is the thread-per-call server
+GRPC_SERVER_MODE = os.getenv('GRPC_SERVER_MODE', 'aio')
+GRPC_PORT = int(os.getenv('GRPC_PORT', 50052))
+GRPC_MAX_CONCURRENT_RPCS = int(os.getenv('GRPC_MAX_CONCURRENT_RPCS', 1000))
+GRPC_SERVER_WORKERS = int(os.getenv('GRPC_SERVER_WORKERS', 10))
+GRPC_DB_POOL_SIZE = int(os.getenv('GRPC_DB_POOL_SIZE', 10))
+GRPC_SHUTDOWN_GRACE = float(os.getenv('GRPC_SHUTDOWN_GRACE', 15))
+GRPC_METRICS_LOG_INTERVAL = float(os.getenv('GRPC_METRICS_LOG_INTERVAL', 60))
+
+# Process launcher, see `manage.py serve`
+SERVE_BIND = os.getenv('SERVE_BIND', '0.0.0.0:8001')
+SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 2 * (os.cpu_count() or 1) + 1))
+SERVE_THREADS = int(os.getenv('SERVE_THREADS', 4))
+SERVE_KEEPALIVE = int(os.getenv('SERVE_KEEPALIVE', 5))
+SERVE_TIMEOUT = int(os.getenv('SERVE_TIMEOUT', 30))
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30))
+SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', 10000))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import grpc
+from django.conf import settings
+import logging
+
+# Get logger for the payment app
+logger = logging.getLogger("payment")
+
+# Channels and stubs are shared by every thread of the process. gRPC channels
+# must not be used across fork(), so a child process (Celery prefork, pre-fork
+# web workers) drops whatever it inherited and dials its own connections.
+_channels = {}
+_stubs = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def _reset_after_fork():
+    global _channels, _stubs, _lock, _pid
+    # The inherited channels belong to the parent and are left alone
+    _channels = {}
+    _stubs = {}
+    _lock = threading.Lock()
+    _pid = os.getpid()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _service_config(service_name):
+    return json.dumps(
+        {
+            # round_robin honours the health check below and skips backends
+            # that report NOT_SERVING until they recover
+            "loadBalancingConfig": [{"round_robin": {}}],
+            "healthCheckConfig": {"serviceName": service_name},
+            "methodConfig": [
+                {
+                    "name": [{"service": service_name}],
+                    "timeout": f"{settings.GRPC_CALL_TIMEOUT}s",
+                    "retryPolicy": {
+                        "maxAttempts": settings.GRPC_MAX_ATTEMPTS,
+                        "initialBackoff": "0.1s",
+                        "maxBackoff": "1s",
+                        "backoffMultiplier": 2,
+                        "retryableStatusCodes": ["UNAVAILABLE"],
+                    },
+                }
+            ],
+        }
+    )
+
+
+def _create_channel(name):
+    config = settings.GRPC_SERVICES[name]
+    options = [
+        ("grpc.service_config", _service_config(config["service_name"])),
+        ("grpc.service_config_disable_resolution", 1),
+        ("grpc.enable_retries", 1),
+        ("grpc.keepalive_time_ms", settings.GRPC_KEEPALIVE_TIME_MS),
+        ("grpc.keepalive_timeout_ms", settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.initial_reconnect_backoff_ms", 100),
+        ("grpc.max_reconnect_backoff_ms", 5000),
+    ]
+    logger.info(f"Opening gRPC channel to {name} service at {config['target']}")
+    return grpc.insecure_channel(config["target"], options=options)
+
+
+def get_channel(name):
+    """Return the shared channel for the named service, dialling it on first use."""
+    if os.getpid() != _pid:
+        _reset_after_fork()
+
+    channel = _channels.get(name)
+    if channel is None:
+        with _lock:
+            channel = _channels.get(name)
+            if channel is None:
+                channel = _channels[name] = _create_channel(name)
+    return channel
+
+
+def get_stub(name, stub_class):
+    """Return a shared stub of stub_class bound to the named service's channel."""
+    if os.getpid() != _pid:
+        _reset_after_fork()
+
+    stub = _stubs.get((name, stub_class))
+    if stub is None:
+        stub = _stubs[(name, stub_class)] = stub_class(get_channel(name))
+    return stub
+
+
+def close_channels():
+    """Close every channel opened by this process."""
+    with _lock:
+        for channel in _channels.values():
+            channel.close()
+        _channels.clear()
+        _stubs.clear()
@@ -1,31 +1,106 @@
 import grpc
-from .generated.user_service_pb2 import UpdateUserCreditsRequest
+from django.conf import settings
+from .channels import get_stub
+from .generated.user_service_pb2 import (
+    AdjustUserCreditsRequest,
+    BatchUpdateUserCreditsRequest,
+    CreditAdjustment,
+)
 from .generated.user_service_pb2_grpc import UserServiceStub
-import os
 import logging
 
 # Get logger for the payment app
 logger = logging.getLogger("payment")
 
 
-def update_user_credits(user_id, credits, is_deduction=False, refund_from_escrow=False):
+def adjust_user_credits(user_id, amount, idempotency_key, reason):
+    """
+    Add amount (negative for a debit) to a user's credits through the credit
+    ledger. Retrying with the same idempotency key never applies it twice.
+    Returns a dict with success, balance and error, or None if the call failed.
+    """
     try:
-        with grpc.insecure_channel(
-            os.getenv("USER_SERVICE_GRPC_HOST") + ":50051"
-        ) as channel:
-            logger.info(f"Initiating gRPC call to update credits for user {user_id}")
-            stub = UserServiceStub(channel)
-
-            request = UpdateUserCreditsRequest(
+        logger.info(
+            f"Initiating gRPC call to adjust credits for user {user_id} by {amount:+d}"
+        )
+        user_stub = get_stub("user", UserServiceStub)
+        response = user_stub.AdjustUserCredits(
+            AdjustUserCreditsRequest(
                 user_id=user_id,
-                credits=credits,
-                is_deduction=is_deduction,
-                refund_from_escrow=refund_from_escrow,
+                amount=amount,
+                idempotency_key=idempotency_key,
+                reason=reason,
+            ),
+            timeout=settings.GRPC_CALL_TIMEOUT,
+        )
+        if response.success:
+            logger.info(
+                f"Successfully adjusted credits for user {user_id}, balance {response.balance}"
+            )
+        else:
+            logger.warning(
+                f"Credit adjustment for user {user_id} rejected: {response.error}"
+            )
+        return {
+            "success": response.success,
+            "balance": response.balance,
+            "error": response.error,
+        }
+    except grpc.RpcError as e:
+        logger.error(
+            f"Failed to adjust credits for user {user_id}: {e.details()} (Code: {e.code()})"
+        )
+        return None
+
+
+def batch_update_user_credits(adjustments, stream=False):
+    """
+    Apply many credit adjustments with one call. Each adjustment is a dict
+    with user_id, credits and optionally is_deduction, idempotency_key and
+    reason. Returns the per-adjustment results in order, or None if the call
+    failed.
+    """
+    try:
+        logger.info(
+            f"Initiating gRPC call to apply {len(adjustments)} credit adjustments"
+        )
+        user_stub = get_stub("user", UserServiceStub)
+        messages = [
+            CreditAdjustment(
+                user_id=adjustment["user_id"],
+                credits=adjustment["credits"],
+                is_deduction=adjustment.get("is_deduction", False),
+                idempotency_key=adjustment.get("idempotency_key", ""),
+                reason=adjustment.get("reason", ""),
+            )
+            for adjustment in adjustments
+        ]
+        if stream:
+            response = user_stub.StreamUpdateUserCredits(
+                iter(messages), timeout=settings.GRPC_CALL_TIMEOUT
             )
-            response = stub.UpdateUserCredits(request)
-            if response.success:
-                logger.info(f"Successfully updated credits for user {user_id}")
-            return response.success
+        else:
+            response = user_stub.BatchUpdateUserCredits(
+                BatchUpdateUserCreditsRequest(adjustments=messages),
+                timeout=settings.GRPC_CALL_TIMEOUT,
+            )
+
+        results = [
+            {
+                "user_id": result.user_id,
+                "success": result.success,
+                "error": result.error,
+                "balance": result.balance,
+                "duplicate": result.duplicate,
+            }
+            for result in response.results
+        ]
+        failed = [result for result in results if not result["success"]]
+        if failed:
+            logger.warning(f"{len(failed)} credit adjustments were rejected: {failed}")
+        return results
     except grpc.RpcError as e:
-        logger.error(f"gRPC error: {str(e)}")
-        return False
+        logger.error(
+            f"Failed to apply credit adjustments: {e.details()} (Code: {e.code()})"
+        )
+        return None
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15payment_service.proto\"v\n\x12LockCreditsRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\x12\x10\n\x08tutor_id\x18\x02 \x01(\x05\x12\x12\n\nbooking_id\x18\x03 \x01(\x05\x12\x16\n\x0e\x63redits_locked\x18\x04 \x01(\x05\x12\x0e\n\x06status\x18\x05 \x01(\t\"&\n\x13LockCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"0\n\x1aRefundLockedCreditsRequest\x12\x12\n\nbooking_id\x18\x02 \x01(\x05\".\n\x1bRefundLockedCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"G\n\x1bReleaseLockedCreditsRequest\x12\x14\n\x0csession_type\x18\x01 \x01(\t\x12\x12\n\nbooking_id\x18\x02 \x01(\x05\"/\n\x1cReleaseLockedCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32\xf1\x01\n\x0ePaymentService\x12\x38\n\x0bLockCredits\x12\x13.LockCreditsRequest\x1a\x14.LockCreditsResponse\x12P\n\x13RefundLockedCredits\x12\x1b.RefundLockedCreditsRequest\x1a\x1c.RefundLockedCreditsResponse\x12S\n\x14ReleaseLockedCredits\x12\x1c.ReleaseLockedCreditsRequest\x1a\x1d.ReleaseLockedCreditsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15payment_service.proto\"v\n\x12LockCreditsRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\x12\x10\n\x08tutor_id\x18\x02 \x01(\x05\x12\x12\n\nbooking_id\x18\x03 \x01(\x05\x12\x16\n\x0e\x63redits_locked\x18\x04 \x01(\x05\x12\x0e\n\x06status\x18\x05 \x01(\t\"&\n\x13LockCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"0\n\x1aRefundLockedCreditsRequest\x12\x12\n\nbooking_id\x18\x02 \x01(\x05\".\n\x1bRefundLockedCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"G\n\x1bReleaseLockedCreditsRequest\x12\x14\n\x0csession_type\x18\x01 \x01(\t\x12\x12\n\nbooking_id\x18\x02 \x01(\x05\"/\n\x1cReleaseLockedCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"L\n\x10\x45scrowSettlement\x12\x12\n\nbooking_id\x18\x01 \x01(\x05\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\t\x12\x14\n\x0csession_type\x18\x03 \x01(\t\">\n\x14SettleEscrowsRequest\x12&\n\x0bsettlements\x18\x01 \x03(\x0b\x32\x11.EscrowSettlement\"L\n\x16\x45scrowSettlementResult\x12\x12\n\nbooking_id\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"A\n\x15SettleEscrowsResponse\x12(\n\x07results\x18\x01 \x03(\x0b\x32\x17.EscrowSettlementResult2\xb1\x02\n\x0ePaymentService\x12\x38\n\x0bLockCredits\x12\x13.LockCreditsRequest\x1a\x14.LockCreditsResponse\x12P\n\x13RefundLockedCredits\x12\x1b.RefundLockedCreditsRequest\x1a\x1c.RefundLockedCreditsResponse\x12S\n\x14ReleaseLockedCredits\x12\x1c.ReleaseLockedCreditsRequest\x1a\x1d.ReleaseLockedCreditsResponse\x12>\n\rSettleEscrows\x12\x15.SettleEscrowsRequest\x1a\x16.SettleEscrowsResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -43,6 +43,14 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_RELEASELOCKEDCREDITSREQUEST']._serialized_end=354
   _globals['_RELEASELOCKEDCREDITSRESPONSE']._serialized_start=356
   _globals['_RELEASELOCKEDCREDITSRESPONSE']._serialized_end=403
-  _globals['_PAYMENTSERVICE']._serialized_start=406
-  _globals['_PAYMENTSERVICE']._serialized_end=647
+  _globals['_ESCROWSETTLEMENT']._serialized_start=405
+  _globals['_ESCROWSETTLEMENT']._serialized_end=481
+  _globals['_SETTLEESCROWSREQUEST']._serialized_start=483
+  _globals['_SETTLEESCROWSREQUEST']._serialized_end=545
+  _globals['_ESCROWSETTLEMENTRESULT']._serialized_start=547
+  _globals['_ESCROWSETTLEMENTRESULT']._serialized_end=623
+  _globals['_SETTLEESCROWSRESPONSE']._serialized_start=625
+  _globals['_SETTLEESCROWSRESPONSE']._serialized_end=690
+  _globals['_PAYMENTSERVICE']._serialized_start=693
+  _globals['_PAYMENTSERVICE']._serialized_end=998
 # @@protoc_insertion_point(module_scope)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n grpc_services/user_service.proto\x12\x0cuser_service\"n\n\x18UpdateUserCreditsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x63redits\x18\x02 \x01(\x05\x12\x14\n\x0cis_deduction\x18\x03 \x01(\x08\x12\x1a\n\x12refund_from_escrow\x18\x04 \x01(\x08\",\n\x19UpdateUserCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32s\n\x0bUserService\x12\x64\n\x11UpdateUserCredits\x12&.user_service.UpdateUserCreditsRequest\x1a\'.user_service.UpdateUserCreditsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n grpc_services/user_service.proto\x12\x0cuser_service\"n\n\x18UpdateUserCreditsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x63redits\x18\x02 \x01(\x05\x12\x14\n\x0cis_deduction\x18\x03 \x01(\x08\x12\x1a\n\x12refund_from_escrow\x18\x04 \x01(\x08\",\n\x19UpdateUserCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"d\n\x18\x41\x64justUserCreditsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x05\x12\x17\n\x0fidempotency_key\x18\x03 \x01(\t\x12\x0e\n\x06reason\x18\x04 \x01(\t\"_\n\x19\x41\x64justUserCreditsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07\x62\x61lance\x18\x02 \x01(\x05\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\x11\n\tduplicate\x18\x04 \x01(\x08\"s\n\x10\x43reditAdjustment\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x63redits\x18\x02 \x01(\x05\x12\x14\n\x0cis_deduction\x18\x03 \x01(\x08\x12\x17\n\x0fidempotency_key\x18\x04 \x01(\t\x12\x0e\n\x06reason\x18\x05 \x01(\t\"T\n\x1d\x42\x61tchUpdateUserCreditsRequest\x12\x33\n\x0b\x61\x64justments\x18\x01 \x03(\x0b\x32\x1e.user_service.CreditAdjustment\"m\n\x16\x43reditAdjustmentResult\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\x0f\n\x07\x62\x61lance\x18\x04 \x01(\x05\x12\x11\n\tduplicate\x18\x05 \x01(\x08\"W\n\x1e\x42\x61tchUpdateUserCreditsResponse\x12\x35\n\x07results\x18\x01 \x03(\x0b\x32$.user_service.CreditAdjustmentResult2\xb9\x03\n\x0bUserService\x12\x64\n\x11UpdateUserCredits\x12&.user_service.UpdateUserCreditsRequest\x1a\'.user_service.UpdateUserCreditsResponse\x12\x64\n\x11\x41\x64justUserCredits\x12&.user_service.AdjustUserCreditsRequest\x1a\'.user_service.AdjustUserCreditsResponse\x12s\n\x16\x42\x61tchUpdateUserCredits\x12+.user_service.BatchUpdateUserCreditsRequest\x1a,.user_service.BatchUpdateUserCreditsResponse\x12i\n\x17StreamUpdateUserCredits\x12\x1e.user_service.CreditAdjustment\x1a,.user_service.BatchUpdateUserCreditsResponse(\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,6 +35,18 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_UPDATEUSERCREDITSREQUEST']._serialized_end=160
   _globals['_UPDATEUSERCREDITSRESPONSE']._serialized_start=162
   _globals['_UPDATEUSERCREDITSRESPONSE']._serialized_end=206
-  _globals['_USERSERVICE']._serialized_start=208
-  _globals['_USERSERVICE']._serialized_end=323
+  _globals['_ADJUSTUSERCREDITSREQUEST']._serialized_start=208
+  _globals['_ADJUSTUSERCREDITSREQUEST']._serialized_end=308
+  _globals['_ADJUSTUSERCREDITSRESPONSE']._serialized_start=310
+  _globals['_ADJUSTUSERCREDITSRESPONSE']._serialized_end=405
+  _globals['_CREDITADJUSTMENT']._serialized_start=407
+  _globals['_CREDITADJUSTMENT']._serialized_end=522
+  _globals['_BATCHUPDATEUSERCREDITSREQUEST']._serialized_start=524
+  _globals['_BATCHUPDATEUSERCREDITSREQUEST']._serialized_end=608
+  _globals['_CREDITADJUSTMENTRESULT']._serialized_start=610
+  _globals['_CREDITADJUSTMENTRESULT']._serialized_end=719
+  _globals['_BATCHUPDATEUSERCREDITSRESPONSE']._serialized_start=721
+  _globals['_BATCHUPDATEUSERCREDITSRESPONSE']._serialized_end=808
+  _globals['_USERSERVICE']._serialized_start=811
+  _globals['_USERSERVICE']._serialized_end=1252
 # @@protoc_insertion_point(module_scope)
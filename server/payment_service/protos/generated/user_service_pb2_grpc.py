@@ -39,6 +39,21 @@ class UserServiceStub(object):
                 request_serializer=grpc__services_dot_user__service__pb2.UpdateUserCreditsRequest.SerializeToString,
                 response_deserializer=grpc__services_dot_user__service__pb2.UpdateUserCreditsResponse.FromString,
                 _registered_method=True)
+        self.AdjustUserCredits = channel.unary_unary(
+                '/user_service.UserService/AdjustUserCredits',
+                request_serializer=grpc__services_dot_user__service__pb2.AdjustUserCreditsRequest.SerializeToString,
+                response_deserializer=grpc__services_dot_user__service__pb2.AdjustUserCreditsResponse.FromString,
+                _registered_method=True)
+        self.BatchUpdateUserCredits = channel.unary_unary(
+                '/user_service.UserService/BatchUpdateUserCredits',
+                request_serializer=grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsRequest.SerializeToString,
+                response_deserializer=grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsResponse.FromString,
+                _registered_method=True)
+        self.StreamUpdateUserCredits = channel.stream_unary(
+                '/user_service.UserService/StreamUpdateUserCredits',
+                request_serializer=grpc__services_dot_user__service__pb2.CreditAdjustment.SerializeToString,
+                response_deserializer=grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsResponse.FromString,
+                _registered_method=True)
 
 
 class UserServiceServicer(object):
@@ -50,6 +65,27 @@ class UserServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def AdjustUserCredits(self, request, context):
+        """Relative, idempotent change recorded in the credit ledger
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchUpdateUserCredits(self, request, context):
+        """Apply many credit adjustments in one transaction
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamUpdateUserCredits(self, request_iterator, context):
+        """Same as BatchUpdateUserCredits, with the adjustments streamed by the client
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_UserServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +94,21 @@ def add_UserServiceServicer_to_server(servicer, server):
                     request_deserializer=grpc__services_dot_user__service__pb2.UpdateUserCreditsRequest.FromString,
                     response_serializer=grpc__services_dot_user__service__pb2.UpdateUserCreditsResponse.SerializeToString,
             ),
+            'AdjustUserCredits': grpc.unary_unary_rpc_method_handler(
+                    servicer.AdjustUserCredits,
+                    request_deserializer=grpc__services_dot_user__service__pb2.AdjustUserCreditsRequest.FromString,
+                    response_serializer=grpc__services_dot_user__service__pb2.AdjustUserCreditsResponse.SerializeToString,
+            ),
+            'BatchUpdateUserCredits': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchUpdateUserCredits,
+                    request_deserializer=grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsRequest.FromString,
+                    response_serializer=grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsResponse.SerializeToString,
+            ),
+            'StreamUpdateUserCredits': grpc.stream_unary_rpc_method_handler(
+                    servicer.StreamUpdateUserCredits,
+                    request_deserializer=grpc__services_dot_user__service__pb2.CreditAdjustment.FromString,
+                    response_serializer=grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'user_service.UserService', rpc_method_handlers)
@@ -95,3 +146,84 @@ class UserService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def AdjustUserCredits(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/user_service.UserService/AdjustUserCredits',
+            grpc__services_dot_user__service__pb2.AdjustUserCreditsRequest.SerializeToString,
+            grpc__services_dot_user__service__pb2.AdjustUserCreditsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchUpdateUserCredits(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/user_service.UserService/BatchUpdateUserCredits',
+            grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsRequest.SerializeToString,
+            grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamUpdateUserCredits(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/user_service.UserService/StreamUpdateUserCredits',
+            grpc__services_dot_user__service__pb2.CreditAdjustment.SerializeToString,
+            grpc__services_dot_user__service__pb2.BatchUpdateUserCreditsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,7 +1,6 @@
 from django.utils import timezone
 import django
 import grpc
-from concurrent import futures
 import logging
 
 # Get logger for the payment app
@@ -12,139 +11,278 @@ django.setup()
 from payment.models import Escrow
 import protos.generated.payment_service_pb2_grpc as payment_service_pb2_grpc
 import protos.generated.payment_service_pb2 as payment_service_pb2
-from protos.client import update_user_credits
+from protos.client import adjust_user_credits, batch_update_user_credits
+from protos.runtime import serve_aio, serve_sync
 
-from django.db import connection
+from django.conf import settings
+from django.db import transaction
+
+
+def tutor_share(session_type, credits_locked):
+    """Credits a tutor is paid out of a released escrow, None for no payout"""
+    if session_type == "standard":
+        return (credits_locked * 80) // 100
+    if session_type == "trial":
+        return credits_locked
+    return None
 
 
 class PaymentService(payment_service_pb2_grpc.PaymentServiceServicer):
     def LockCredits(self, request, context):
-        with connection.cursor():
-            try:
+        try:
+            logger.info(
+                f"Locking credits for booking {request.booking_id}: student {request.student_id}, tutor {request.tutor_id}"
+            )
+            # A retried call whose first attempt went through finds its escrow
+            escrow_transaction, created = Escrow.objects.exclude(
+                status="refunded"
+            ).get_or_create(
+                booking_id=request.booking_id,
+                defaults={
+                    "student_id": request.student_id,
+                    "tutor_id": request.tutor_id,
+                    "credits_locked": request.credits_locked,
+                    "status": request.status,  # 'locked'
+                },
+            )
+            if created:
+                logger.info(f"Credits locked successfully: {escrow_transaction.status}")
+            else:
                 logger.info(
-                    f"Locking credits for booking {request.booking_id}: student {request.student_id}, tutor {request.tutor_id}"
-                )
-                escrow_transaction = Escrow.objects.create(
-                    student_id=request.student_id,
-                    tutor_id=request.tutor_id,
-                    booking_id=request.booking_id,
-                    credits_locked=request.credits_locked,
-                    status=request.status,  # 'locked'
+                    f"Credits of booking {request.booking_id} already {escrow_transaction.status}"
                 )
-                escrow_transaction.save()
-                logger.info(f"Credits locked successfully: {escrow_transaction.status}")
-                return payment_service_pb2.LockCreditsResponse(success=True)
+            return payment_service_pb2.LockCreditsResponse(success=True)
 
-            except Exception as e:
-                logger.error(f"Error locking credits: {str(e)}")
-                context.set_details(f"Error locking credits: {e}")
-                context.set_code(grpc.StatusCode.INTERNAL)
-                return payment_service_pb2.LockCreditsResponse(success=False)
+        except Exception as e:
+            logger.error(f"Error locking credits: {str(e)}")
+            context.set_details(f"Error locking credits: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return payment_service_pb2.LockCreditsResponse(success=False)
 
     def RefundLockedCredits(self, request, context):
-        with connection.cursor():
-            try:
-                logger.info(f"Processing refund for booking {request.booking_id}")
-                escrow_transaction = Escrow.objects.get(
-                    booking_id=request.booking_id, status="locked"
-                )
+        try:
+            logger.info(f"Processing refund for booking {request.booking_id}")
+            escrow_transaction = Escrow.objects.get(
+                booking_id=request.booking_id, status="locked"
+            )
 
-                escrow_transaction.status = "refunded"
-                escrow_transaction.released_at = timezone.now()
-                escrow_transaction.save()
+            escrow_transaction.status = "refunded"
+            escrow_transaction.released_at = timezone.now()
+            escrow_transaction.save()
 
+            logger.info(
+                f"Credits refunded successfully for booking {request.booking_id}"
+            )
+            return payment_service_pb2.RefundLockedCreditsResponse(success=True)
+        except Escrow.DoesNotExist:
+            logger.warning(
+                f"Escrow transaction not found for booking {request.booking_id}"
+            )
+            context.set_details("Escrow transaction not found")
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            return payment_service_pb2.RefundLockedCreditsResponse(success=False)
+        except Exception as e:
+            logger.error(
+                f"Error processing refund for booking {request.booking_id}: {str(e)}"
+            )
+            context.set_details(f"Error processing refund: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return payment_service_pb2.RefundLockedCreditsResponse(success=False)
+
+    def ReleaseLockedCredits(self, request, context):
+        try:
+            logger.info(
+                f"Processing credit release for booking {request.booking_id}"
+            )
+            escrow_transaction = Escrow.objects.get(
+                booking_id=request.booking_id,
+                status__in=[
+                    "locked",
+                    "released",
+                ],  # Only fetch if status is 'locked' or 'released'
+            )
+
+            if escrow_transaction.status == "released":
                 logger.info(
-                    f"Credits refunded successfully for booking {request.booking_id}"
-                )
-                return payment_service_pb2.RefundLockedCreditsResponse(success=True)
-            except Escrow.DoesNotExist:
-                logger.warning(
-                    f"Escrow transaction not found for booking {request.booking_id}"
+                    f"Credits already released for booking {request.booking_id}"
                 )
-                context.set_details("Escrow transaction not found")
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                return payment_service_pb2.RefundLockedCreditsResponse(success=False)
-            except Exception as e:
-                logger.error(
-                    f"Error processing refund for booking {request.booking_id}: {str(e)}"
+                return payment_service_pb2.ReleaseLockedCreditsResponse(
+                    success=True
                 )
-                context.set_details(f"Error processing refund: {e}")
-                context.set_code(grpc.StatusCode.INTERNAL)
-                return payment_service_pb2.RefundLockedCreditsResponse(success=False)
 
-    def ReleaseLockedCredits(self, request, context):
-        with connection.cursor():
-            try:
+            session_type = request.session_type
+            escrow_transaction.status = "released"
+            escrow_transaction.released_at = timezone.now()
+            escrow_transaction.save()
+
+            user_id = escrow_transaction.tutor_id
+            credits_locked = escrow_transaction.credits_locked
+
+            credits = tutor_share(session_type, credits_locked)
+            if credits is not None:
                 logger.info(
-                    f"Processing credit release for booking {request.booking_id}"
+                    f"Releasing {session_type} session credits ({credits}) to tutor {user_id}"
                 )
-                escrow_transaction = Escrow.objects.get(
-                    booking_id=request.booking_id,
-                    status__in=[
-                        "locked",
-                        "released",
-                    ],  # Only fetch if status is 'locked' or 'released'
+                adjust_user_credits(
+                    user_id,
+                    credits,
+                    idempotency_key=f"escrow-{request.booking_id}-release",
+                    reason="escrow_release",
                 )
 
-                if escrow_transaction.status == "released":
-                    logger.info(
-                        f"Credits already released for booking {request.booking_id}"
+            logger.info(
+                f"Credits released successfully for booking {request.booking_id}"
+            )
+            return payment_service_pb2.RefundLockedCreditsResponse(success=True)
+
+        except Escrow.DoesNotExist:
+            logger.warning(
+                f"Escrow transaction not found for booking {request.booking_id}"
+            )
+            context.set_details("Escrow transaction not found")
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            return payment_service_pb2.RefundLockedCreditsResponse(success=False)
+        except Exception as e:
+            logger.error(
+                f"Error releasing credits for booking {request.booking_id}: {str(e)}"
+            )
+            context.set_details(f"Error processing release: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return payment_service_pb2.RefundLockedCreditsResponse(success=False)
+
+    def SettleEscrows(self, request, context):
+        """
+        Release or refund many escrows at once. The escrows are locked and
+        updated in one transaction, and the tutors of released escrows are
+        paid with one batched credit call afterwards. Settling an escrow
+        again with the same action succeeds; a release also resends the
+        payout, which user_service applies only once per idempotency key.
+        One result per settlement, in request order.
+        """
+        settlements = list(request.settlements)
+        logger.info(f"Settling {len(settlements)} escrows")
+        errors = {}
+        payouts = {}
+        try:
+            with transaction.atomic():
+                escrows = {
+                    escrow.booking_id: escrow
+                    for escrow in Escrow.objects.select_for_update().filter(
+                        booking_id__in=[s.booking_id for s in settlements]
                     )
-                    return payment_service_pb2.ReleaseLockedCreditsResponse(
-                        success=True
+                }
+                settled = []
+                now = timezone.now()
+                for settlement in settlements:
+                    escrow = escrows.get(settlement.booking_id)
+                    target = {"release": "released", "refund": "refunded"}.get(
+                        settlement.action
                     )
+                    if target is None:
+                        errors[settlement.booking_id] = f"Unknown action {settlement.action}"
+                        continue
+                    if escrow is None:
+                        errors[settlement.booking_id] = "Escrow transaction not found"
+                        continue
+                    if escrow.status not in ("locked", target):
+                        errors[settlement.booking_id] = f"Escrow is already {escrow.status}"
+                        continue
+                    if escrow.status == "locked":
+                        escrow.status = target
+                        escrow.released_at = now
+                        settled.append(escrow)
+                    credits = tutor_share(settlement.session_type, escrow.credits_locked)
+                    if target == "released" and credits is not None:
+                        payouts[settlement.booking_id] = {
+                            "user_id": escrow.tutor_id,
+                            "credits": credits,
+                            "idempotency_key": f"escrow-{escrow.booking_id}-release",
+                            "reason": "escrow_release",
+                        }
+                Escrow.objects.bulk_update(settled, ["status", "released_at"])
+        except Exception as e:
+            logger.error(f"Error settling escrows: {str(e)}")
+            context.set_details(f"Error settling escrows: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return payment_service_pb2.SettleEscrowsResponse()
 
-                session_type = request.session_type
-                escrow_transaction.status = "released"
-                escrow_transaction.released_at = timezone.now()
-                escrow_transaction.save()
+        if payouts:
+            results = batch_update_user_credits(list(payouts.values()))
+            for booking_id, result in zip(payouts, results or [None] * len(payouts)):
+                if result is None:
+                    errors[booking_id] = "Tutor payout failed"
+                elif not result["success"]:
+                    errors[booking_id] = f"Tutor payout rejected: {result['error']}"
 
-                user_id = escrow_transaction.tutor_id
-                credits_locked = escrow_transaction.credits_locked
+        logger.info(f"Settled {len(settlements) - len(errors)} escrows, {len(errors)} failed")
+        return payment_service_pb2.SettleEscrowsResponse(
+            results=[
+                payment_service_pb2.EscrowSettlementResult(
+                    booking_id=settlement.booking_id,
+                    success=settlement.booking_id not in errors,
+                    error=errors.get(settlement.booking_id, ""),
+                )
+                for settlement in settlements
+            ]
+        )
 
-                if session_type == "standard":
-                    credits = (credits_locked * 80) // 100
-                    logger.info(
-                        f"Releasing standard session credits ({credits}) to tutor {user_id}"
-                    )
-                    update_user_credits(user_id, credits)
 
-                elif session_type == "trial":
-                    logger.info(
-                        f"Releasing trial session credits ({credits_locked}) to tutor {user_id}"
-                    )
-                    update_user_credits(user_id, credits_locked)
+# Clients keep idle connections open with keepalive pings, accept them
+# instead of answering with GOAWAY
+SERVER_OPTIONS = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_recv_ping_interval_without_data_ms", 10000),
+    ("grpc.http2.max_ping_strikes", 0),
+]
 
-                logger.info(
-                    f"Credits released successfully for booking {request.booking_id}"
-                )
-                return payment_service_pb2.RefundLockedCreditsResponse(success=True)
 
-            except Escrow.DoesNotExist:
-                logger.warning(
-                    f"Escrow transaction not found for booking {request.booking_id}"
-                )
-                context.set_details("Escrow transaction not found")
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                return payment_service_pb2.RefundLockedCreditsResponse(success=False)
-            except Exception as e:
-                logger.error(
-                    f"Error releasing credits for booking {request.booking_id}: {str(e)}"
-                )
-                context.set_details(f"Error processing release: {e}")
-                context.set_code(grpc.StatusCode.INTERNAL)
-                return payment_service_pb2.RefundLockedCreditsResponse(success=False)
+class AsyncPaymentService(payment_service_pb2_grpc.PaymentServiceServicer):
+    """Runs the PaymentService handlers on the aio server's database executor."""
+
+    def __init__(self, database):
+        self.service = PaymentService()
+        self.database = database
+
+    async def LockCredits(self, request, context):
+        return await self.database.run(self.service.LockCredits, request, context)
+
+    async def RefundLockedCredits(self, request, context):
+        return await self.database.run(
+            self.service.RefundLockedCredits, request, context
+        )
+
+    async def ReleaseLockedCredits(self, request, context):
+        return await self.database.run(
+            self.service.ReleaseLockedCredits, request, context
+        )
+
+    async def SettleEscrows(self, request, context):
+        return await self.database.run(self.service.SettleEscrows, request, context)
+
+
+# Clients only route calls to servers reporting SERVING
+HEALTH_SERVICES = ["PaymentService"]
 
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    payment_service_pb2_grpc.add_PaymentServiceServicer_to_server(
-        PaymentService(), server
-    )
-    server.add_insecure_port("[::]:50052")
-    logger.info("Payment gRPC server starting on port 50052")
-    server.start()
-    server.wait_for_termination()
+    if settings.GRPC_SERVER_MODE == "sync":
+        serve_sync(
+            lambda server: payment_service_pb2_grpc.add_PaymentServiceServicer_to_server(
+                PaymentService(), server
+            ),
+            HEALTH_SERVICES,
+            settings.GRPC_PORT,
+            SERVER_OPTIONS,
+        )
+    else:
+        serve_aio(
+            lambda server, database: payment_service_pb2_grpc.add_PaymentServiceServicer_to_server(
+                AsyncPaymentService(database), server
+            ),
+            HEALTH_SERVICES,
+            settings.GRPC_PORT,
+            SERVER_OPTIONS,
+        )
 
 
 if __name__ == "__main__":
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import pre_migrate
+
+
+def create_btree_gist_extension(using, **kwargs):
+    # The tutor_availability_no_overlap constraint compares tutor_id inside a
+    # GiST index, which plain Postgres only supports through btree_gist
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
 
 
 class BookingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookings'
+
+    def ready(self):
+        pre_migrate.connect(create_btree_gist_extension, sender=self)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+from bookings.models import Bookings, TutorAvailability
+
+
+class Command(BaseCommand):
+    help = "Fills in Bookings.tutor_id for bookings created before the column existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        bounds = Bookings.objects.filter(tutor_id__isnull=True).aggregate(
+            first=Min("id"), last=Max("id")
+        )
+        if bounds["first"] is None:
+            self.stdout.write("Every booking already has a tutor_id")
+            return
+
+        tutor_id = TutorAvailability.objects.filter(id=OuterRef("availability_id"))
+        updated = 0
+        # Walk the primary key in ranges so every batch is a short transaction
+        for start in range(bounds["first"], bounds["last"] + 1, options["batch_size"]):
+            with transaction.atomic():
+                updated += Bookings.objects.filter(
+                    id__gte=start,
+                    id__lt=start + options["batch_size"],
+                    tutor_id__isnull=True,
+                ).update(tutor_id=Subquery(tutor_id.values("tutor_id")[:1]))
+            self.stdout.write(f"Updated {updated} bookings")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled tutor_id on {updated} bookings"))
@@ -0,0 +1,322 @@
+import base64
+import json
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+from unittest import mock
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from bookings.models import Bookings, Report, TutorAvailability
+from bookings.permissions import ValidateRoomNamePermission
+from bookings.serializers import BookingsSerializer, TutorAvailabilitySerializer
+from bookings.settlement import ended_sessions
+
+TABLES = [
+    TutorAvailability._meta.db_table,
+    Bookings._meta.db_table,
+    Report._meta.db_table,
+]
+
+# Number of SQL queries each check runs, pinned by bookings.tests. A change
+# that adds a query to one of these paths has to update the number here.
+EXPECTED_QUERIES = {
+    "GET tutor-availabilities/?tutor_id=<id>": 2,
+    "GET tutor-availabilities/?start_time_after=<now>": 2,
+    "GET tutor-availabilities/<id>/": 2,
+    "GET bookings/<id>/": 1,
+    "GET bookings/tutor-credits-history/<tutor_id>/": 1,
+    "GET reports/<booking_id>/": 3,
+    "validate new tutor availability": 1,
+    "validate new trial booking": 3,
+    "room access permission": 1,
+    "session sweeper batch": 1,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the session endpoints and validators against the current "
+        "database, and fails when a query plan scans a large table "
+        "sequentially or one of them runs more SQL queries than pinned in "
+        "EXPECTED_QUERIES. The query counts alone are covered by the bookings "
+        "tests, this is for checking plans at scale. --seed-bookings fills the "
+        "database with synthetic bookings first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-bookings",
+            type=int,
+            default=0,
+            help="Insert this many synthetic bookings before checking, e.g. 1000000",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--seq-scan-rows",
+            type=int,
+            default=100000,
+            help="Sequential scans are only reported on tables with at least this many rows",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Query plans can only be checked on PostgreSQL")
+
+        if options["seed_bookings"]:
+            self.seed(options["seed_bookings"], options["batch_size"])
+
+        with connection.cursor() as cursor:
+            for table in TABLES:
+                cursor.execute(f'ANALYZE "{table}"')
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)",
+                [TABLES],
+            )
+            large_tables = [
+                table
+                for table, rows in cursor.fetchall()
+                if rows >= options["seq_scan_rows"]
+            ]
+
+        failures = []
+        self.stdout.write(f"{'':<50}{'queries':>8}{'ms':>9}  plan")
+        for name, check in self.checks():
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                check()
+                elapsed = (time.perf_counter() - started) * 1000
+
+            scanned = set()
+            for query in queries.captured_queries:
+                if query["sql"].startswith("SELECT"):
+                    for table in self.sequential_scans(query["sql"]):
+                        if table in large_tables:
+                            scanned.add(table)
+
+            problems = []
+            if len(queries) > EXPECTED_QUERIES[name]:
+                problems.append(f"expected {EXPECTED_QUERIES[name]} queries")
+            problems += [f"seq scan on {table}" for table in sorted(scanned)]
+            self.stdout.write(
+                f"{name:<50}{len(queries):>8}{elapsed:>9.1f}  "
+                + (", ".join(problems) or "ok")
+            )
+            if problems:
+                failures.append(name)
+                for query in queries.captured_queries:
+                    self.stdout.write(f"    {query['sql']}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} checks failed: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All query checks passed"))
+
+    def sequential_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        def walk(node):
+            if node.get("Node Type") == "Seq Scan":
+                yield node["Relation Name"]
+            for child in node.get("Plans", []):
+                yield from walk(child)
+
+        return list(walk(plan[0]["Plan"]))
+
+    def checks(self):
+        booking = Bookings.objects.filter(booking_status="confirmed").first()
+        report = Report.objects.first()
+        open_slot = TutorAvailability.objects.filter(
+            is_booked=False, session_type="trial", start_time__gt=timezone.now()
+        ).first()
+        if booking is None or report is None or open_slot is None:
+            raise CommandError(
+                "The database needs a confirmed booking, a report and an open "
+                "trial slot, run with --seed-bookings"
+            )
+        latest_end = TutorAvailability.objects.filter(
+            tutor_id=open_slot.tutor_id
+        ).aggregate(latest=Max("end_time"))["latest"]
+        new_student = (Bookings.objects.aggregate(last=Max("student_id"))["last"] or 0) + 1
+        client = Client()
+
+        def get(path):
+            def request():
+                # Reports embed user details from user_service, which is not
+                # under test here
+                with mock.patch("bookings.serializers.requests.get") as user_service:
+                    user_service.return_value.status_code = 404
+                    with override_settings(ALLOWED_HOSTS=["localhost"]):
+                        response = client.get(path, HTTP_HOST="localhost")
+                if response.status_code != 200:
+                    raise CommandError(f"GET {path} returned {response.status_code}")
+
+            return request
+
+        def validate_availability():
+            serializer = TutorAvailabilitySerializer(
+                data={
+                    "tutor_id": open_slot.tutor_id,
+                    "session_type": "standard",
+                    "language_to_teach": open_slot.language_to_teach,
+                    "start_time": latest_end + timedelta(hours=1),
+                    "end_time": latest_end + timedelta(hours=2),
+                    "credits_required": open_slot.credits_required,
+                }
+            )
+            if not serializer.is_valid():
+                raise CommandError(f"Availability rejected: {serializer.errors}")
+
+        def validate_booking():
+            serializer = BookingsSerializer(
+                data={
+                    "availability": open_slot.id,
+                    "student_id": new_student,
+                    "booking_status": "confirmed",
+                }
+            )
+            if not serializer.is_valid():
+                raise CommandError(f"Booking rejected: {serializer.errors}")
+
+        def room_access():
+            payload = base64.urlsafe_b64encode(
+                json.dumps({"user_id": booking.student_id}).encode()
+            ).decode()
+            request = APIRequestFactory().post(
+                "/create-daily-room/",
+                {"room_name": booking.video_call_link},
+                format="json",
+                HTTP_AUTHORIZATION=f"Bearer header.{payload}.signature",
+            )
+            ValidateRoomNamePermission().has_permission(
+                Request(request, parsers=[JSONParser()]), None
+            )
+
+        def sweep_batch():
+            list(ended_sessions(timezone.now())[:200])
+
+        upcoming = urlencode({"start_time_after": timezone.now().isoformat()})
+        return [
+            (
+                "GET tutor-availabilities/?tutor_id=<id>",
+                get(f"/tutor-availabilities/?tutor_id={open_slot.tutor_id}&page_size=50"),
+            ),
+            (
+                "GET tutor-availabilities/?start_time_after=<now>",
+                get(f"/tutor-availabilities/?{upcoming}&page_size=50"),
+            ),
+            (
+                "GET tutor-availabilities/<id>/",
+                get(f"/tutor-availabilities/{booking.availability_id}/"),
+            ),
+            ("GET bookings/<id>/", get(f"/bookings/{booking.id}/")),
+            (
+                "GET bookings/tutor-credits-history/<tutor_id>/",
+                get(f"/bookings/tutor-credits-history/{booking.tutor_id}/"),
+            ),
+            ("GET reports/<booking_id>/", get(f"/reports/{report.booking_id}/")),
+            ("validate new tutor availability", validate_availability),
+            ("validate new trial booking", validate_booking),
+            ("room access permission", room_access),
+            ("session sweeper batch", sweep_batch),
+        ]
+
+    def seed(self, count, batch_size):
+        """
+        Insert count bookings spread over tutors with 500 back-to-back hourly
+        slots each. Most are completed or canceled, the last ones of every
+        tutor are confirmed, and every tutor also gets a few open future
+        slots. One in a hundred completed bookings has a report.
+        """
+        tutors = max(count // 500, 1)
+        students = max(count // 20, 1)
+        first_tutor = (
+            TutorAvailability.objects.aggregate(last=Max("tutor_id"))["last"] or 0
+        ) + 1
+        slots_per_tutor = -(-count // tutors)
+        # The last 5 slots of every tutor are in the future
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(
+            hours=slots_per_tutor - 5
+        )
+        self.stdout.write(f"Seeding {count} bookings for {tutors} tutors")
+
+        def slot(tutor, hour, is_booked, is_released=False, session_type=None):
+            return TutorAvailability(
+                tutor_id=first_tutor + tutor,
+                session_type=session_type or ("trial" if hour % 10 == 0 else "standard"),
+                language_to_teach="English",
+                start_time=start + timedelta(hours=hour),
+                end_time=start + timedelta(hours=hour, minutes=50),
+                credits_required=10,
+                is_booked=is_booked,
+                is_released=is_released,
+            )
+
+        def status(hour):
+            if hour >= slots_per_tutor - 5:
+                return "confirmed"
+            if hour % 10 == 9:
+                return "canceled_by_student"
+            return "completed"
+
+        seeded = 0
+        while seeded < count:
+            numbers = range(seeded, min(seeded + batch_size, count))
+            slots = TutorAvailability.objects.bulk_create(
+                [
+                    slot(
+                        number % tutors,
+                        number // tutors,
+                        is_booked=True,
+                        is_released=status(number // tutors) != "confirmed",
+                    )
+                    for number in numbers
+                ]
+            )
+            bookings = Bookings.objects.bulk_create(
+                [
+                    Bookings(
+                        availability=availability,
+                        tutor_id=availability.tutor_id,
+                        student_id=number * 7919 % students + 1,
+                        booking_status=status(number // tutors),
+                        video_call_link=f"https://speakin.daily.co/room_{first_tutor}_{number}",
+                    )
+                    for number, availability in zip(numbers, slots)
+                ]
+            )
+            Report.objects.bulk_create(
+                [
+                    Report(
+                        booking=booking,
+                        reporter_id=booking.student_id,
+                        description="Seeded report",
+                    )
+                    for booking in bookings
+                    if booking.booking_status == "completed" and booking.id % 100 == 0
+                ]
+            )
+            seeded += len(numbers)
+            self.stdout.write(f"Seeded {seeded} bookings")
+
+        TutorAvailability.objects.bulk_create(
+            [
+                slot(
+                    tutor,
+                    slots_per_tutor + offset,
+                    is_booked=False,
+                    session_type="trial" if offset == 0 else "standard",
+                )
+                for tutor in range(tutors)
+                for offset in range(5)
+            ]
+        )
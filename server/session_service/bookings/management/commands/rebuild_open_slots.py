@@ -0,0 +1,55 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from bookings.models import TutorAvailability
+from services.open_slots import KEY_PREFIX, get_open_slots, language_key, tutor_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the Redis read model of open slots from the database, for "
+        "a cold start or after Redis writes were lost"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        open_slots = get_open_slots()
+        client = open_slots.client
+        slots = TutorAvailability.objects.filter(
+            is_booked=False, start_time__gt=timezone.now()
+        ).order_by("id")
+
+        members = defaultdict(set)
+        batch = []
+        added = 0
+        for slot in slots.iterator(chunk_size=options["batch_size"]):
+            members[tutor_key(slot.tutor_id)].add(str(slot.id))
+            members[language_key(slot.language_to_teach)].add(str(slot.id))
+            batch.append(slot)
+            if len(batch) == options["batch_size"]:
+                open_slots.add(batch)
+                added += len(batch)
+                batch = []
+        if batch:
+            open_slots.add(batch)
+            added += len(batch)
+
+        # Drop whatever the database no longer has as open
+        removed = 0
+        for pattern in (f"{KEY_PREFIX}:tutor:*", f"{KEY_PREFIX}:language:*"):
+            for key in client.scan_iter(match=pattern, count=1000):
+                key = key.decode()
+                stale = {
+                    member.decode() for member in client.zrange(key, 0, -1)
+                } - members.get(key, set())
+                if stale:
+                    removed += client.zrem(key, *stale)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {added} open slots in {len(members)} sets, "
+                f"removed {removed} stale entries"
+            )
+        )
@@ -0,0 +1,34 @@
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from bookings.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    help = (
+        "Publishes notification events from the outbox table to RabbitMQ "
+        "until stopped. --once publishes what is ready and exits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.OUTBOX_RELAY_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.OUTBOX_RELAY_POLL_INTERVAL,
+            help="Longest wait for a NOTIFY before checking the table anyway",
+        )
+        parser.add_argument("--once", action="store_true")
+
+    def handle(self, *args, **options):
+        relay = OutboxRelay(options["batch_size"], options["poll_interval"])
+        if options["once"]:
+            relayed = relay.drain()
+            self.stdout.write(self.style.SUCCESS(f"Relayed {relayed} outbox events"))
+            return
+
+        signal.signal(signal.SIGTERM, relay.stop)
+        signal.signal(signal.SIGINT, relay.stop)
+        relay.run()
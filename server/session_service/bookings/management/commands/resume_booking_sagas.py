@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from bookings.saga import resume_sagas
+
+
+class Command(BaseCommand):
+    help = (
+        "Compensates booking sagas left running by a crashed process and "
+        "retries the ones whose compensation failed. Celery beat runs the "
+        "same every BOOKING_SAGA_RESUME_INTERVAL seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.BOOKING_SAGA_RECOVERY_AFTER,
+            help="Only resume sagas not updated for this many seconds",
+        )
+        parser.add_argument("--limit", type=int, default=100)
+
+    def handle(self, *args, **options):
+        compensated, failed = resume_sagas(options["older_than"], options["limit"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compensated {compensated} booking sagas, {failed} still failing"
+            )
+        )
@@ -0,0 +1,43 @@
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from session_service.supervisor import ManagedProcess, gunicorn_args, supervise
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the session service's web app under gunicorn's pre-forking "
+        "workers, supervised and restarted if it exits. --only outbox runs "
+        "the notification outbox relay instead, in a deployment of its own "
+        "as one relay is enough for every replica."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=settings.SERVE_BIND)
+        parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS)
+        parser.add_argument("--threads", type=int, default=settings.SERVE_THREADS)
+        parser.add_argument("--keepalive", type=int, default=settings.SERVE_KEEPALIVE)
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=["web", "outbox"],
+            help="Run only the named process, may be repeated. Defaults to web.",
+        )
+
+    def handle(self, *args, **options):
+        # gunicorn finishes in-flight requests and the relay its current
+        # batch before they exit
+        processes = [
+            ManagedProcess(
+                "web",
+                gunicorn_args(
+                    "session_service.wsgi:application",
+                    options,
+                    "gthread",
+                    threads=options["threads"],
+                ),
+            ),
+            ManagedProcess("outbox", [sys.executable, "manage.py", "relay_outbox"]),
+        ]
+        only = options["only"] or ["web"]
+        supervise([p for p in processes if p.name in only])
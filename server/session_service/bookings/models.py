@@ -1,9 +1,17 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary, RangeOperators
 from django.db import models
-from django.db.models import Count
+from django.db.models import Count, Func, Q
+from django.utils import timezone
 
 # Create your models here.
 
 
+class TsTzRange(Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
 class TutorAvailability(models.Model):
     SESSION_TYPE_CHOICES = (
         ("trial", "Trial"),
@@ -16,14 +24,52 @@ class TutorAvailability(models.Model):
     end_time = models.DateTimeField()
     credits_required = models.IntegerField()
     is_booked = models.BooleanField(default=False)
+    # Set once the booking of a booked slot was canceled or finished without
+    # the slot being reopened. Such a slot no longer blocks the tutor's time.
+    is_released = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    time_range = models.GeneratedField(
+        expression=TsTzRange("start_time", "end_time", RangeBoundary()),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Calendar pages of one tutor, all tutors or one language, read
+            # in start time order by the list endpoint
+            models.Index(fields=["tutor_id", "start_time"], name="availability_tutor_start_idx"),
+            models.Index(
+                fields=["language_to_teach", "start_time"],
+                name="availability_language_idx",
+            ),
+            models.Index(fields=["start_time"], name="availability_start_idx"),
+            # Booked slots whose booking is not settled yet, for the session sweeper
+            models.Index(
+                fields=["end_time", "id"],
+                condition=Q(is_booked=True, is_released=False),
+                name="availability_unsettled_end_idx",
+            ),
+        ]
+        constraints = [
+            # Needs the btree_gist extension for tutor_id, which
+            # BookingsConfig creates before migrating. The GiST index behind
+            # the constraint also serves the overlap checks in the serializers.
+            ExclusionConstraint(
+                name="tutor_availability_no_overlap",
+                expressions=[
+                    ("tutor_id", RangeOperators.EQUAL),
+                    ("time_range", RangeOperators.OVERLAPS),
+                ],
+                condition=Q(is_released=False),
+            ),
+        ]
 
 
 class Bookings(models.Model):
     BOOKING_STATUS_CHOICES = (
+        ("pending", "Pending"),
         ("confirmed", "Confirmed"),
         ("ongoing", "Ongoing"),
         ("completed", "Completed"),
@@ -31,11 +77,18 @@ class Bookings(models.Model):
         ("canceled_by_student", "Canceled by Student"),
         ("no_show_by_tutor", "No-show by Tutor"),
         ("no_show_by_student", "No-show by Student"),
+        ("no_show_by_both", "No-show by Both"),
     )
+    # A pending booking holds its slot while the booking saga runs
+    ACTIVE_STATUSES = ("pending", "confirmed", "ongoing")
     availability = models.ForeignKey(
         TutorAvailability, related_name="bookings", on_delete=models.CASCADE
     )
     student_id = models.IntegerField()
+    # Copy of availability.tutor_id so tutor lookups need no join, filled in
+    # on save. Rows from before the column existed are filled in by the
+    # backfill_booking_tutor_ids command.
+    tutor_id = models.IntegerField(null=True)
     booking_status = models.CharField(choices=BOOKING_STATUS_CHOICES, max_length=25)
     canceled_at = models.DateTimeField(null=True, blank=True)
     refund_status = models.BooleanField(default=False)
@@ -48,6 +101,77 @@ class Bookings(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Credit history and trial checks of a tutor, newest first
+            models.Index(
+                fields=["tutor_id", "booking_status", "-created_at"],
+                name="bookings_tutor_status_idx",
+            ),
+            # A student's bookings by status, used by the overlap and trial
+            # checks when booking
+            models.Index(
+                fields=["student_id", "booking_status"],
+                name="bookings_student_status_idx",
+            ),
+            # Room lookups when a video call is started
+            models.Index(fields=["video_call_link"], name="bookings_video_call_link_idx"),
+            # Active bookings are a small slice of the table
+            models.Index(
+                fields=["availability"],
+                condition=models.Q(booking_status__in=["pending", "confirmed", "ongoing"]),
+                name="bookings_active_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.tutor_id is None:
+            self.tutor_id = self.availability.tutor_id
+        super().save(*args, **kwargs)
+        # A booked slot is released once it has no active booking left
+        released = not Bookings.objects.filter(
+            availability_id=self.availability_id,
+            booking_status__in=self.ACTIVE_STATUSES,
+        ).exists()
+        TutorAvailability.objects.filter(
+            id=self.availability_id, is_booked=True
+        ).update(is_released=released)
+
+
+class BookingSaga(models.Model):
+    """
+    Progress of the booking saga for one booking, see bookings/saga.py.
+    steps maps each step name to its outcome: done, failed, unknown (the
+    call timed out or the connection broke) or compensated.
+    """
+
+    STATUS_CHOICES = (
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("compensating", "Compensating"),
+        ("compensated", "Compensated"),
+    )
+    # Not a foreign key, the booking is deleted when the saga is compensated
+    booking_id = models.BigIntegerField(unique=True)
+    availability_id = models.BigIntegerField()
+    student_id = models.IntegerField()
+    tutor_id = models.IntegerField()
+    credits_required = models.IntegerField()
+    status = models.CharField(choices=STATUS_CHOICES, max_length=12, default="running")
+    steps = models.JSONField(default=dict)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # Unfinished sagas for the recovery command
+            models.Index(
+                fields=["updated_at"],
+                condition=Q(status__in=["running", "compensating"]),
+                name="booking_saga_unfinished_idx",
+            ),
+        ]
 
 
 class Report(models.Model):
@@ -72,7 +196,7 @@ class Report(models.Model):
 
     @classmethod
     def get_tutor_report_stats(cls, tutor_id):
-        return cls.objects.filter(booking__availability__tutor_id=tutor_id).aggregate(
+        return cls.objects.filter(booking__tutor_id=tutor_id).aggregate(
             total_reports=Count("id"),
             pending_reports=Count("id", filter=models.Q(status="pending")),
             responded_reports=Count("id", filter=models.Q(status="responded")),
@@ -80,6 +204,39 @@ class Report(models.Model):
 
     @classmethod
     def get_tutor_report_history(cls, tutor_id):
-        return cls.objects.filter(booking__availability__tutor_id=tutor_id).order_by(
+        return cls.objects.filter(booking__tutor_id=tutor_id).order_by(
             "-created_at"
         )
+
+
+class OutboxEvent(models.Model):
+    """
+    A notification to publish, written in the same transaction as the
+    booking change it announces. The outbox relay (bookings/outbox.py)
+    publishes unpublished events to RabbitMQ and sets published_at.
+    """
+
+    EVENT_TYPE_CHOICES = (
+        ("booking", "Booking"),
+        ("cancellation", "Cancellation"),
+    )
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # Failed events are retried with backoff from this time on
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # The relay only ever reads the unpublished head of the table
+            models.Index(
+                fields=["id"],
+                condition=Q(published_at__isnull=True),
+                name="outbox_unpublished_idx",
+            ),
+            models.Index(fields=["published_at"], name="outbox_published_at_idx"),
+        ]
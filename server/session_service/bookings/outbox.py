@@ -0,0 +1,218 @@
+import select
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from services.publisher import NotificationType, get_publisher
+from services.user_summaries import get_user_summaries
+from .models import Bookings, OutboxEvent
+import logging
+
+# Get logger for the session app
+logger = logging.getLogger("bookings")
+
+# Postgres channel the relay listens on for new events
+CHANNEL = "session_outbox"
+
+
+def enqueue_notification(notification_type, **payload):
+    """
+    Record a notification in the current transaction. It is published by
+    the outbox relay once the transaction commits, and never if it rolls
+    back.
+    """
+    event = OutboxEvent.objects.create(
+        event_type=notification_type.value, payload=payload
+    )
+    if connection.vendor == "postgresql":
+        # Postgres delivers the notification on commit and drops it on rollback
+        with connection.cursor() as cursor:
+            cursor.execute(f"NOTIFY {CHANNEL}")
+    return event
+
+
+def fetch_users(user_ids):
+    """User summaries from user_service by id. Users that could not be fetched are left out."""
+    return get_user_summaries().get_many(user_ids)
+
+
+def booking_notification_data(booking, users):
+    student_data = users[booking.student_id]
+    tutor_data = users[booking.availability.tutor_id]
+    return {
+        "booking_data": {
+            "session_type": booking.availability.session_type,
+            "start_time": booking.availability.start_time.isoformat(),
+            "end_time": booking.availability.end_time.isoformat(),
+            "language": booking.availability.language_to_teach,
+            "student_name": student_data["name"],
+            "student_email": student_data["email"],
+        },
+        "tutor_data": {
+            "name": tutor_data["tutor_details"]["speakin_name"],
+            "email": tutor_data["email"],
+        },
+    }
+
+
+def cancellation_notification_data(booking, new_status, users):
+    student_data = users[booking.student_id]
+    tutor_data = users[booking.availability.tutor_id]
+    return {
+        "cancelled_by": ("student" if new_status == "canceled_by_student" else "tutor"),
+        "student_name": student_data["name"],
+        "student_email": student_data["email"],
+        "tutor_name": tutor_data["tutor_details"]["speakin_name"],
+        "tutor_email": tutor_data["email"],
+        "session_type": booking.availability.session_type,
+        "start_time": booking.availability.start_time.isoformat(),
+        "language": booking.availability.language_to_teach,
+        "credits_required": booking.availability.credits_required,
+    }
+
+
+class OutboxRelay:
+    """
+    Publishes outbox events to RabbitMQ in batches.
+
+    A batch of unpublished events is claimed with SELECT ... FOR UPDATE
+    SKIP LOCKED, so several relays can run side by side, published in one
+    RabbitMQ transaction and marked published in the same database
+    transaction. Every message carries the event id as its message id: an
+    event published again after a crash between the two commits is
+    dropped by the consumer. Between batches the relay waits for a NOTIFY
+    from enqueue_notification, or poll_interval seconds at most.
+
+    Events that fail are retried with backoff, up to OUTBOX_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, batch_size, poll_interval):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stopping = False
+        self.listening_on = None
+
+    def stop(self, *args):
+        logger.info("Stopping outbox relay")
+        self.stopping = True
+
+    def run(self):
+        while not self.stopping:
+            try:
+                if self.relay_batch() < self.batch_size:
+                    self.purge()
+                    self.wait()
+            except DatabaseError as e:
+                logger.error(f"Outbox relay lost its database connection: {str(e)}")
+                connection.close()
+                self.listening_on = None
+                time.sleep(self.poll_interval)
+        get_publisher().close()
+
+    def drain(self):
+        """Relay until no event is ready, returns how many were relayed"""
+        relayed = 0
+        while True:
+            count = self.relay_batch()
+            relayed += count
+            if count < self.batch_size:
+                return relayed
+
+    def relay_batch(self):
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(
+                    published_at__isnull=True,
+                    available_at__lte=timezone.now(),
+                    attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+                )
+                .order_by("id")[: self.batch_size]
+            )
+            if not events:
+                return 0
+
+            notifications, failed = self.build(events)
+            if notifications and not get_publisher().publish_batch(
+                [notification for event, notification in notifications],
+                message_ids=[f"session-outbox-{event.id}" for event, notification in notifications],
+            ):
+                failed += [(event, "Publishing failed") for event, notification in notifications]
+                notifications = []
+
+            now = timezone.now()
+            published = [event for event, notification in notifications]
+            for event in published:
+                event.published_at = now
+            for event, error in failed:
+                event.attempts += 1
+                event.last_error = error
+                event.available_at = now + timedelta(seconds=min(2**event.attempts, 300))
+                if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    logger.error(f"Giving up on outbox event {event.id}: {error}")
+            OutboxEvent.objects.bulk_update(
+                events, ["published_at", "attempts", "last_error", "available_at"]
+            )
+
+        logger.info(f"Relayed {len(published)} outbox events, {len(failed)} failed")
+        return len(events)
+
+    def build(self, events):
+        """((event, (notification_data, notification_type)) pairs, (event, error) pairs)"""
+        bookings = Bookings.objects.select_related("availability").in_bulk(
+            [event.payload["booking_id"] for event in events]
+        )
+        users = fetch_users(
+            user_id
+            for booking in bookings.values()
+            for user_id in (booking.student_id, booking.availability.tutor_id)
+        )
+
+        notifications = []
+        failed = []
+        for event in events:
+            booking = bookings.get(event.payload["booking_id"])
+            if booking is None:
+                # Nothing left to announce, the event is dropped as published
+                logger.warning(f"Booking of outbox event {event.id} no longer exists")
+                event.published_at = timezone.now()
+                event.last_error = "Booking no longer exists"
+                continue
+            try:
+                if event.event_type == NotificationType.BOOKING.value:
+                    data = booking_notification_data(booking, users)
+                else:
+                    data = cancellation_notification_data(
+                        booking, event.payload["new_status"], users
+                    )
+            except KeyError as e:
+                failed.append((event, f"User details unavailable: {str(e)}"))
+                continue
+            notifications.append((event, (data, NotificationType(event.event_type))))
+        return notifications, failed
+
+    def purge(self):
+        """Delete a batch of events published more than OUTBOX_RETENTION_DAYS ago"""
+        cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+        ids = list(
+            OutboxEvent.objects.filter(published_at__lt=cutoff).values_list("id", flat=True)[
+                :1000
+            ]
+        )
+        if ids:
+            OutboxEvent.objects.filter(id__in=ids).delete()
+
+    def wait(self):
+        connection.ensure_connection()
+        pg_connection = connection.connection
+        if self.listening_on is not pg_connection:
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            self.listening_on = pg_connection
+
+        # Notifications that arrived while the last batch was relayed
+        if not pg_connection.notifies:
+            select.select([pg_connection], [], [], self.poll_interval)
+            pg_connection.poll()
+        pg_connection.notifies.clear()
@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TutorAvailabilityCursorPagination(CursorPagination):
+    """
+    Keyset pagination over slots in start time order, so a page costs the
+    same however deep into the calendar it is. Only requests that ask for
+    a page with ?cursor= or ?page_size= are paginated, everything else
+    still gets the plain list.
+    """
+
+    ordering = ("start_time", "id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -129,7 +129,7 @@ class ValidateRoomNamePermission(BasePermission):
             BASE_VIDEO_CALL_URL = "https://speakin.daily.co/"
 
             booking = Bookings.objects.get(
-                Q(student_id=user_id) | Q(availability__tutor_id=user_id),
+                Q(student_id=user_id) | Q(tutor_id=user_id),
                 Q(video_call_link=room_name)
                 | Q(video_call_link=BASE_VIDEO_CALL_URL + room_name),
                 Q(booking_status="confirmed") | Q(booking_status="ongoing"),
@@ -0,0 +1,278 @@
+import os
+import threading
+from concurrent import futures
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from protos.client import (
+    adjust_user_credits,
+    lock_credits_in_escrow,
+    refund_credits_from_escrow,
+)
+from services.open_slots import sync_open_slots
+from services.publisher import NotificationType
+from .models import BookingSaga, Bookings, TutorAvailability
+from .outbox import enqueue_notification
+from .utils import get_room_name
+import logging
+
+# Get logger for the session app
+logger = logging.getLogger("bookings")
+
+
+def debit_key(saga):
+    return f"booking-{saga.booking_id}-debit"
+
+
+def debit_student(saga):
+    result = adjust_user_credits(
+        saga.student_id,
+        -saga.credits_required,
+        idempotency_key=debit_key(saga),
+        reason="booking",
+    )
+    if result is None:
+        return "unknown", "Failed to update user balance"
+    if not result["success"]:
+        return "failed", {"error": "Insufficient credits"}
+    return "done", None
+
+
+def refund_debit(saga):
+    if saga.steps.get("debit", "unknown") == "unknown":
+        # Replaying the debit tells whether it went through, the ledger
+        # applies an idempotency key at most once
+        replay = adjust_user_credits(
+            saga.student_id,
+            -saga.credits_required,
+            idempotency_key=debit_key(saga),
+            reason="booking",
+        )
+        if replay is None:
+            return False
+        if not replay["success"]:
+            return True
+    refund = adjust_user_credits(
+        saga.student_id,
+        saga.credits_required,
+        idempotency_key=f"booking-{saga.booking_id}-debit-reversal",
+        reason="booking_reversal",
+    )
+    return refund is not None and refund["success"]
+
+
+def lock_escrow(saga):
+    if lock_credits_in_escrow(
+        student_id=saga.student_id,
+        tutor_id=saga.tutor_id,
+        booking_id=saga.booking_id,
+        credits_required=saga.credits_required,
+    ):
+        return "done", None
+    # A failed call may still have created the escrow
+    return "unknown", "Failed to lock credits in escrow"
+
+
+def refund_escrow(saga):
+    return refund_credits_from_escrow(saga.booking_id, missing_ok=True)
+
+
+# Step name: (action, compensation). The steps are independent of each other
+# and run concurrently. An action returns its outcome and, unless done, the
+# error to report. A compensation returns whether it succeeded and is safe
+# to run again.
+STEPS = {
+    "debit": (debit_student, refund_debit),
+    "escrow": (lock_escrow, refund_escrow),
+}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Threads for the saga's network calls, one pool per worker process"""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = futures.ThreadPoolExecutor(
+                    max_workers=settings.BOOKING_SAGA_WORKERS,
+                    thread_name_prefix="booking-saga",
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+class BookingSagaOrchestrator:
+    """
+    Creates a booking as a saga instead of one transaction held open
+    across every network call.
+
+    1. A short transaction locks the slot, creates the booking as pending,
+       marks the slot booked and records the saga.
+    2. The steps (debit the student, lock the credits in escrow) run
+       concurrently outside any transaction, and their outcomes are saved.
+    3. If all steps succeeded, a short transaction confirms the booking.
+       Otherwise the steps that did or may have happened are compensated
+       concurrently, the booking is deleted and the slot reopened.
+
+    A saga whose compensation fails stays compensating and is retried by
+    resume_sagas, which also picks up sagas left running by a crashed
+    process.
+    """
+
+    def start(self, serializer):
+        booking, saga = self.reserve(serializer)
+        errors = self.run_steps(saga)
+        if not errors and self.confirm(booking, saga):
+            return booking
+
+        self.compensate(saga)
+        for name in STEPS:
+            if name in errors:
+                raise ValidationError(errors[name])
+        raise ValidationError("The booking could not be completed")
+
+    def reserve(self, serializer):
+        availability = serializer.validated_data["availability"]
+        with transaction.atomic():
+            slot = TutorAvailability.objects.select_for_update().get(id=availability.id)
+            if slot.is_booked:
+                raise ValidationError("This time slot has already been booked.")
+            booking = serializer.save(booking_status="pending")
+            slot.is_booked = True
+            slot.save(update_fields=["is_booked"])
+            saga = BookingSaga.objects.create(
+                booking_id=booking.id,
+                availability_id=slot.id,
+                student_id=booking.student_id,
+                tutor_id=slot.tutor_id,
+                credits_required=slot.credits_required,
+            )
+            transaction.on_commit(lambda: sync_open_slots([slot]))
+        logger.info(f"Created pending booking {booking.id}, starting its saga")
+        return booking, saga
+
+    def run_steps(self, saga):
+        running = {
+            name: get_executor().submit(action, saga)
+            for name, (action, compensation) in STEPS.items()
+        }
+        errors = {}
+        for name, future in running.items():
+            try:
+                outcome, error = future.result()
+            except Exception as e:
+                logger.error(f"Saga step {name} of booking {saga.booking_id} raised: {str(e)}")
+                outcome, error = "unknown", str(e)
+            saga.steps[name] = outcome
+            if outcome != "done":
+                errors[name] = error
+        saga.save(update_fields=["steps", "updated_at"])
+        logger.info(f"Saga steps of booking {saga.booking_id}: {saga.steps}")
+        return errors
+
+    def confirm(self, booking, saga):
+        booking.video_call_link = get_room_name(
+            booking.id, saga.tutor_id, saga.student_id
+        )
+        booking.booking_status = "confirmed"
+        with transaction.atomic():
+            # resume_sagas may have given up on this saga meanwhile
+            if not BookingSaga.objects.filter(id=saga.id, status="running").update(
+                status="completed", updated_at=timezone.now()
+            ):
+                logger.error(f"Saga of booking {booking.id} was taken over, not confirming")
+                return False
+            booking.save()
+            enqueue_notification(NotificationType.BOOKING, booking_id=booking.id)
+        logger.info(f"Booking {booking.id} confirmed")
+        return True
+
+    def compensate(self, saga, error=""):
+        """Undo the saga's steps. Returns whether everything was undone."""
+        saga.status = "compensating"
+        saga.error = error or saga.error
+        saga.save(update_fields=["status", "error", "updated_at"])
+
+        running = {
+            name: get_executor().submit(compensation, saga)
+            for name, (action, compensation) in STEPS.items()
+            # A step without a recorded outcome may have run before a crash
+            if saga.steps.get(name, "unknown") in ("done", "unknown")
+        }
+        failed = []
+        for name, future in running.items():
+            try:
+                compensated = future.result()
+            except Exception as e:
+                logger.error(
+                    f"Compensating {name} of booking {saga.booking_id} raised: {str(e)}"
+                )
+                compensated = False
+            if compensated:
+                saga.steps[name] = "compensated"
+            else:
+                failed.append(name)
+
+        if failed:
+            saga.save(update_fields=["steps", "updated_at"])
+            logger.error(
+                f"Could not compensate {', '.join(failed)} of booking {saga.booking_id}, "
+                "resume_sagas will retry"
+            )
+            return False
+
+        with transaction.atomic():
+            slot = (
+                TutorAvailability.objects.select_for_update()
+                .filter(id=saga.availability_id)
+                .first()
+            )
+            Bookings.objects.filter(id=saga.booking_id).delete()
+            if slot is not None:
+                slot.is_booked = False
+                slot.save(update_fields=["is_booked"])
+                transaction.on_commit(lambda: sync_open_slots([slot]))
+            saga.status = "compensated"
+            saga.save(update_fields=["status", "steps", "updated_at"])
+        logger.info(f"Saga of booking {saga.booking_id} compensated, slot reopened")
+        return True
+
+
+def resume_sagas(older_than=None, limit=100):
+    """
+    Compensate up to limit sagas left running by a crashed process, and
+    retry the ones whose compensation failed, if they were not updated for
+    older_than seconds (BOOKING_SAGA_RECOVERY_AFTER by default). Run by
+    celery beat every BOOKING_SAGA_RESUME_INTERVAL seconds. Returns how many
+    were compensated and how many still failed.
+    """
+    if older_than is None:
+        older_than = settings.BOOKING_SAGA_RECOVERY_AFTER
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    sagas = BookingSaga.objects.filter(
+        status__in=["running", "compensating"], updated_at__lt=cutoff
+    ).order_by("updated_at")[:limit]
+
+    orchestrator = BookingSagaOrchestrator()
+    compensated = failed = 0
+    for saga in sagas:
+        # Claim the saga, a concurrent run or the orchestrator itself may
+        # have moved it on since it was read
+        claimed = BookingSaga.objects.filter(
+            id=saga.id, status=saga.status, updated_at=saga.updated_at
+        ).update(status="compensating", updated_at=timezone.now())
+        if not claimed:
+            continue
+        if orchestrator.compensate(saga, error=saga.error or f"Resumed from {saga.status}"):
+            compensated += 1
+        else:
+            failed += 1
+    if compensated or failed:
+        logger.info(f"Compensated {compensated} booking sagas, {failed} still failing")
+    return compensated, failed
@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from .models import TutorAvailability, Bookings, Report
 from django.utils import timezone
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 import requests
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from django.conf import settings
 
 
@@ -36,7 +40,7 @@ class BookingsSerializer(serializers.ModelSerializer):
             if session_type == "trial":
                 # Check for any trial session (completed, confirmed, or ongoing)
                 existing_trial = Bookings.objects.filter(
-                    availability__tutor_id=tutor_id,
+                    tutor_id=tutor_id,
                     student_id=student_id,
                     availability__session_type="trial",
                     booking_status__in=["completed", "confirmed", "ongoing"],
@@ -58,7 +62,7 @@ class BookingsSerializer(serializers.ModelSerializer):
 
             if session_type == "standard":
                 completed_trials = Bookings.objects.filter(
-                    availability__tutor_id=tutor_id,
+                    tutor_id=tutor_id,
                     student_id=student_id,
                     availability__session_type="trial",
                     booking_status="completed",
@@ -71,9 +75,8 @@ class BookingsSerializer(serializers.ModelSerializer):
             # Check for time conflicts with other confirmed bookings
             overlapping_bookings = Bookings.objects.filter(
                 student_id=student_id,
-                booking_status__in=["confirmed", "ongoing"],
-                availability__start_time__lt=end_time,
-                availability__end_time__gt=start_time,
+                booking_status__in=Bookings.ACTIVE_STATUSES,
+                availability__time_range__overlap=DateTimeTZRange(start_time, end_time),
             )
             if overlapping_bookings.exists():
                 raise serializers.ValidationError(
@@ -106,24 +109,24 @@ class TutorAvailabilitySerializer(serializers.ModelSerializer):
         end_time = data["end_time"]
         tutor_id = data["tutor_id"]
 
+        # Released slots do not block, the same rule the
+        # tutor_availability_no_overlap constraint enforces, so this is a
+        # probe of the constraint's GiST index
         conflicting_slots = TutorAvailability.objects.filter(
-            tutor_id=tutor_id, start_time__lt=end_time, end_time__gt=start_time
+            tutor_id=tutor_id,
+            time_range__overlap=DateTimeTZRange(start_time, end_time),
+            is_released=False,
         )
+        if self.instance is not None:
+            conflicting_slots = conflicting_slots.exclude(id=self.instance.id)
 
-        # Filter out slots that are already booked and check if any are confirmed or ongoing
-        conflicting_bookings = Bookings.objects.filter(
-            availability__in=conflicting_slots,
-            booking_status__in=["confirmed", "ongoing"],
-        )
-
-        # If any conflicting bookings exist, raise a validation error
-        if conflicting_bookings.exists():
+        # A booked slot here still has a confirmed or ongoing booking
+        conflicting_slot = conflicting_slots.order_by("-is_booked").first()
+        if conflicting_slot is not None and conflicting_slot.is_booked:
             raise serializers.ValidationError(
                 "This time slot overlaps with an existing confirmed or ongoing booking."
             )
-
-        # If no bookings are found, check for available (unbooked) slots
-        if conflicting_slots.filter(is_booked=False).exists():
+        if conflicting_slot is not None:
             raise serializers.ValidationError(
                 "This time slot overlaps with an existing available slot."
             )
@@ -131,6 +134,176 @@ class TutorAvailabilitySerializer(serializers.ModelSerializer):
         return data
 
 
+class AvailabilitySlotSerializer(serializers.Serializer):
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+
+    def validate(self, data):
+        if data["end_time"] <= data["start_time"]:
+            raise serializers.ValidationError("end_time must be after start_time.")
+        return data
+
+
+class RecurrenceTimeSerializer(serializers.Serializer):
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+
+    def validate(self, data):
+        if data["end"] <= data["start"]:
+            raise serializers.ValidationError("end must be after start.")
+        return data
+
+
+class RecurrenceSerializer(serializers.Serializer):
+    # Monday is 0 and Sunday is 6
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), allow_empty=False
+    )
+    times = RecurrenceTimeSerializer(many=True, allow_empty=False)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    # The weekdays and times are wall clock times in this timezone
+    timezone = serializers.CharField(default="UTC")
+
+    def validate_timezone(self, value):
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError(f"Unknown timezone: {value}")
+        return value
+
+    def validate(self, data):
+        if data["end_date"] < data["start_date"]:
+            raise serializers.ValidationError("end_date must not be before start_date.")
+        return data
+
+    @staticmethod
+    def expand(recurrence):
+        """Every (start_time, end_time) the recurrence describes"""
+        zone = ZoneInfo(recurrence["timezone"])
+        slots = []
+        day = recurrence["start_date"]
+        while day <= recurrence["end_date"]:
+            if day.weekday() in recurrence["weekdays"]:
+                for time_range in recurrence["times"]:
+                    slots.append(
+                        {
+                            "start_time": datetime.combine(
+                                day, time_range["start"], tzinfo=zone
+                            ),
+                            "end_time": datetime.combine(
+                                day, time_range["end"], tzinfo=zone
+                            ),
+                        }
+                    )
+            day += timedelta(days=1)
+        return slots
+
+
+class TutorAvailabilityBulkSerializer(serializers.Serializer):
+    """
+    Creates many slots of one tutor from either an explicit list of slots
+    or a weekly recurrence. Overlaps with the tutor's existing slots are
+    found with one range query for the whole request.
+    """
+
+    tutor_id = serializers.IntegerField()
+    session_type = serializers.ChoiceField(
+        choices=TutorAvailability.SESSION_TYPE_CHOICES
+    )
+    language_to_teach = serializers.CharField(max_length=100)
+    credits_required = serializers.IntegerField()
+    slots = AvailabilitySlotSerializer(many=True, required=False, allow_empty=False)
+    recurrence = RecurrenceSerializer(required=False)
+    # Create the slots that do not conflict instead of rejecting the request
+    skip_conflicts = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if ("slots" in data) == ("recurrence" in data):
+            raise serializers.ValidationError("Provide either slots or recurrence.")
+
+        if "recurrence" in data:
+            slots = RecurrenceSerializer.expand(data.pop("recurrence"))
+            if not slots:
+                raise serializers.ValidationError(
+                    "The recurrence does not produce any slots."
+                )
+        else:
+            slots = data["slots"]
+
+        max_slots = settings.TUTOR_AVAILABILITY_BULK_MAX_SLOTS
+        if len(slots) > max_slots:
+            raise serializers.ValidationError(
+                f"At most {max_slots} slots can be created at once, got {len(slots)}."
+            )
+
+        slots = sorted(slots, key=lambda slot: slot["start_time"])
+        for previous, slot in zip(slots, slots[1:]):
+            if slot["start_time"] < previous["end_time"]:
+                raise serializers.ValidationError(
+                    f"The slots starting at {previous['start_time'].isoformat()} "
+                    f"and {slot['start_time'].isoformat()} overlap each other."
+                )
+        data["slots"] = slots
+        return data
+
+    def find_conflicts(self):
+        """Requested slots that overlap an existing slot, with the reason"""
+        slots = self.validated_data["slots"]
+        # Unreleased slots of a tutor never overlap, so sorted by start they
+        # are sorted by end as well
+        existing = list(
+            TutorAvailability.objects.filter(
+                tutor_id=self.validated_data["tutor_id"],
+                time_range__overlap=DateTimeTZRange(
+                    slots[0]["start_time"], max(slot["end_time"] for slot in slots)
+                ),
+                is_released=False,
+            )
+            .order_by("start_time")
+            .only("id", "start_time", "end_time", "is_booked")
+        )
+
+        conflicts = []
+        for index, slot in enumerate(slots):
+            position = bisect_right(
+                existing, slot["start_time"], key=lambda other: other.end_time
+            )
+            if position < len(existing) and existing[position].start_time < slot["end_time"]:
+                conflicting_slot = existing[position]
+                conflicts.append(
+                    {
+                        "index": index,
+                        "start_time": slot["start_time"],
+                        "end_time": slot["end_time"],
+                        "conflicting_slot": conflicting_slot.id,
+                        "detail": (
+                            "This time slot overlaps with an existing confirmed or ongoing booking."
+                            if conflicting_slot.is_booked
+                            else "This time slot overlaps with an existing available slot."
+                        ),
+                    }
+                )
+        return conflicts
+
+    def create(self, validated_data):
+        skipped = {conflict["index"] for conflict in validated_data.get("conflicts", [])}
+        return TutorAvailability.objects.bulk_create(
+            [
+                TutorAvailability(
+                    tutor_id=validated_data["tutor_id"],
+                    session_type=validated_data["session_type"],
+                    language_to_teach=validated_data["language_to_teach"],
+                    credits_required=validated_data["credits_required"],
+                    start_time=slot["start_time"],
+                    end_time=slot["end_time"],
+                )
+                for index, slot in enumerate(validated_data["slots"])
+                if index not in skipped
+            ]
+        )
+
+
 class ReportSerializer(serializers.ModelSerializer):
     reporter_details = serializers.SerializerMethodField()
     tutor_details = serializers.SerializerMethodField()
@@ -168,7 +341,7 @@ class ReportSerializer(serializers.ModelSerializer):
 
     def get_tutor_details(self, obj):
         try:
-            tutor_id = obj.booking.availability.tutor_id
+            tutor_id = obj.booking.tutor_id
             response = requests.get(
                 f"{settings.USER_SERVICE_URL}/users/{tutor_id}/",
                 headers=self.context["request"].headers,
@@ -180,14 +353,14 @@ class ReportSerializer(serializers.ModelSerializer):
             return None
 
     def get_tutor_report_stats(self, obj):
-        tutor_id = obj.booking.availability.tutor_id
+        tutor_id = obj.booking.tutor_id
         return Report.get_tutor_report_stats(tutor_id)
 
     def get_tutor_report_history(self, obj):
-        tutor_id = obj.booking.availability.tutor_id
+        tutor_id = obj.booking.tutor_id
         # Get only reports created before the current report
         history = Report.objects.filter(
-            booking__availability__tutor_id=tutor_id,
+            booking__tutor_id=tutor_id,
             created_at__lt=obj.created_at,  # Only get reports created before this one
         ).order_by("-created_at")
         return ReportHistorySerializer(history, many=True).data
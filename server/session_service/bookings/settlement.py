@@ -0,0 +1,179 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from protos.client import batch_update_user_credits, settle_escrows
+from .models import Bookings, TutorAvailability
+import logging
+
+# Get logger for the session app
+logger = logging.getLogger("bookings")
+
+# Bookings whose session still has to be settled
+SETTLEABLE_STATUSES = ("confirmed", "ongoing")
+
+# Key of the Postgres advisory lock that keeps sweeps from overlapping
+SWEEP_LOCK_ID = 719_001
+
+
+def classify(booking):
+    """
+    Outcome of a session from who joined within five minutes of its start:
+    (booking status, escrow action, credits refunded to the student).
+    """
+    credits = booking.availability.credits_required
+    student_joined = booking.student_joined_within_5_min
+    tutor_joined = booking.tutor_joined_within_5_min
+    if student_joined and tutor_joined:
+        return "completed", "release", 0
+    if tutor_joined:
+        return "no_show_by_student", "release", 0
+    if student_joined:
+        # The student gets 10% on top of the refund for the tutor's no-show
+        return "no_show_by_tutor", "refund", credits + (credits * 10 // 100)
+    return "no_show_by_both", "refund", credits
+
+
+def settle_bookings(bookings):
+    """
+    Settle sessions in bulk: one payment call settles every escrow, one
+    credit call refunds the students, and one UPDATE per outcome records
+    the new statuses. Every step is idempotent. A booking that fails
+    anywhere keeps its status, and the next sweep settles it again.
+    Returns the settled bookings, with their new status set.
+    """
+    bookings = list(bookings)
+    if not bookings:
+        return []
+    plans = {booking.id: classify(booking) for booking in bookings}
+
+    results = settle_escrows(
+        [
+            {
+                "booking_id": booking.id,
+                "action": plans[booking.id][1],
+                "session_type": booking.availability.session_type,
+            }
+            for booking in bookings
+        ]
+    )
+    if results is None:
+        return []
+    settled = [booking for booking, result in zip(bookings, results) if result["success"]]
+
+    refunds = [booking for booking in settled if plans[booking.id][2]]
+    if refunds:
+        results = batch_update_user_credits(
+            [
+                {
+                    "user_id": booking.student_id,
+                    "credits": plans[booking.id][2],
+                    "idempotency_key": f"booking-{booking.id}-no-show-refund",
+                    "reason": "no_show_refund",
+                }
+                for booking in refunds
+            ]
+        )
+        refunded = {
+            booking.id
+            for booking, result in zip(refunds, results or [])
+            if result["success"]
+        }
+        settled = [
+            booking
+            for booking in settled
+            if not plans[booking.id][2] or booking.id in refunded
+        ]
+
+    outcomes = defaultdict(list)
+    for booking in settled:
+        outcomes[plans[booking.id][0]].append(booking.id)
+    with transaction.atomic():
+        for booking_status, booking_ids in outcomes.items():
+            Bookings.objects.filter(
+                id__in=booking_ids, booking_status__in=SETTLEABLE_STATUSES
+            ).update(
+                booking_status=booking_status,
+                refund_status=plans[booking_ids[0]][1] == "refund",
+            )
+        # A settled slot no longer blocks overlapping availability
+        TutorAvailability.objects.filter(
+            id__in=[booking.availability_id for booking in settled], is_booked=True
+        ).exclude(bookings__booking_status__in=Bookings.ACTIVE_STATUSES).update(
+            is_released=True
+        )
+
+    for booking in settled:
+        booking.booking_status = plans[booking.id][0]
+        booking.refund_status = plans[booking.id][1] == "refund"
+    logger.info(f"Settled {len(settled)} of {len(bookings)} sessions")
+    return settled
+
+
+def ended_sessions(cutoff):
+    """Unsettled bookings whose session ended before cutoff, oldest first"""
+    return (
+        Bookings.objects.select_related("availability")
+        .filter(
+            booking_status__in=SETTLEABLE_STATUSES,
+            # Matches availability_unsettled_end_idx
+            availability__is_booked=True,
+            availability__is_released=False,
+            availability__end_time__lt=cutoff,
+        )
+        .order_by("availability__end_time", "id")
+    )
+
+
+@contextmanager
+def sweep_lock():
+    if connection.vendor != "postgresql":
+        yield True
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [SWEEP_LOCK_ID])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [SWEEP_LOCK_ID])
+
+
+def sweep_ended_sessions(batch_size=None):
+    """
+    Settle every session that ended more than SESSION_SWEEP_GRACE_MINUTES
+    ago and is still confirmed or ongoing, batch_size bookings at a time.
+    The sweep walks the sessions by end time, so bookings that keep failing
+    do not hold back the ones after them. Returns how many were settled.
+    """
+    batch_size = batch_size or settings.SESSION_SWEEP_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(minutes=settings.SESSION_SWEEP_GRACE_MINUTES)
+    settled = 0
+    with sweep_lock() as acquired:
+        if not acquired:
+            logger.info("Another session sweep is running, skipping")
+            return 0
+
+        after = None
+        while True:
+            queryset = ended_sessions(cutoff)
+            if after is not None:
+                queryset = queryset.filter(
+                    Q(availability__end_time__gt=after[0])
+                    | Q(availability__end_time=after[0], id__gt=after[1])
+                )
+            batch = list(queryset[:batch_size])
+            if not batch:
+                break
+            settled += len(settle_bookings(batch))
+            after = (batch[-1].availability.end_time, batch[-1].id)
+            if len(batch) < batch_size:
+                break
+
+    logger.info(f"Session sweep settled {settled} sessions")
+    return settled
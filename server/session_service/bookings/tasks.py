@@ -1,10 +1,19 @@
 from celery import shared_task
-import requests
 from django.conf import settings
-from services.publisher import RabbitMQPublisher, NotificationType
+from services.publisher import get_publisher, NotificationType
 from .models import Bookings
+from .outbox import (
+    booking_notification_data,
+    cancellation_notification_data,
+    fetch_users,
+)
+from .saga import resume_sagas
+from .settlement import sweep_ended_sessions
 from rest_framework.exceptions import ValidationError
 
+# New notifications go through the outbox (bookings/outbox.py). The
+# notification tasks only run what was queued before it.
+
 
 @shared_task(
     bind=True,
@@ -14,34 +23,12 @@ from rest_framework.exceptions import ValidationError
 )
 def send_cancellation_notification(self, booking_id, new_status):
     try:
-        booking = Bookings.objects.get(id=booking_id)
-
-        # Fetch user data
-        student_data = requests.get(
-            f"{settings.USER_SERVICE_URL}users/{booking.student_id}/"
-        ).json()
-
-        tutor_data = requests.get(
-            f"{settings.USER_SERVICE_URL}users/{booking.availability.tutor_id}/"
-        ).json()
-
-        cancellation_data = {
-            "cancelled_by": (
-                "student" if new_status == "canceled_by_student" else "tutor"
-            ),
-            "student_name": student_data["name"],
-            "student_email": student_data["email"],
-            "tutor_name": tutor_data["tutor_details"]["speakin_name"],
-            "tutor_email": tutor_data["email"],
-            "session_type": booking.availability.session_type,
-            "start_time": booking.availability.start_time.isoformat(),
-            "language": booking.availability.language_to_teach,
-            "credits_required": booking.availability.credits_required,
-        }
+        booking = Bookings.objects.select_related("availability").get(id=booking_id)
+        users = fetch_users([booking.student_id, booking.availability.tutor_id])
+        cancellation_data = cancellation_notification_data(booking, new_status, users)
 
         # Send notification via RabbitMQ
-        rabbitmq_publisher = RabbitMQPublisher()
-        if not rabbitmq_publisher.publish_notification(
+        if not get_publisher().publish_notification(
             cancellation_data, NotificationType.CANCELLATION
         ):
             raise Exception("Failed to send cancellation notification")
@@ -58,33 +45,13 @@ def send_cancellation_notification(self, booking_id, new_status):
     retry_kwargs={"max_retries": 3},
     retry_backoff=True,
 )
-def send_booking_notification(self, booking_id, student_data):
+def send_booking_notification(self, booking_id):
     try:
-        booking = Bookings.objects.get(id=booking_id)
-
-        # Fetch tutor data for notification
-        tutor_data = requests.get(
-            f"{settings.USER_SERVICE_URL}users/{booking.availability.tutor_id}/"
-        ).json()
+        booking = Bookings.objects.select_related("availability").get(id=booking_id)
+        users = fetch_users([booking.student_id, booking.availability.tutor_id])
+        notification_data = booking_notification_data(booking, users)
 
-        # Send booking notification
-        notification_data = {
-            "booking_data": {
-                "session_type": booking.availability.session_type,
-                "start_time": booking.availability.start_time.isoformat(),
-                "end_time": booking.availability.end_time.isoformat(),
-                "language": booking.availability.language_to_teach,
-                "student_name": student_data["name"],
-                "student_email": student_data["email"],
-            },
-            "tutor_data": {
-                "name": tutor_data["tutor_details"]["speakin_name"],
-                "email": tutor_data["email"],
-            },
-        }
-
-        rabbitmq_publisher = RabbitMQPublisher()
-        if not rabbitmq_publisher.publish_notification(
+        if not get_publisher().publish_notification(
             notification_data, NotificationType.BOOKING
         ):
             raise ValidationError("Failed to send booking notification")
@@ -93,3 +60,15 @@ def send_booking_notification(self, booking_id, student_data):
 
     except Exception as exc:
         self.retry(exc=exc)
+
+
+@shared_task
+def settle_ended_sessions():
+    """Run by celery beat every SESSION_SWEEP_INTERVAL seconds"""
+    return sweep_ended_sessions()
+
+
+@shared_task
+def resume_booking_sagas():
+    """Run by celery beat every BOOKING_SAGA_RESUME_INTERVAL seconds"""
+    return resume_sagas(limit=settings.BOOKING_SAGA_RESUME_BATCH_SIZE)
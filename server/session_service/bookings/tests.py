@@ -1,3 +1,86 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
+from bookings.management.commands.check_query_plans import Command, EXPECTED_QUERIES
+from bookings.models import Bookings, Report, TutorAvailability
 
-# Create your tests here.
+
+class QueryCountTests(TestCase):
+    """
+    Pins the number of SQL queries of the session endpoints and validators
+    to EXPECTED_QUERIES. A change that adds a query to one of these paths
+    fails here until the number is updated. check_query_plans runs the same
+    checks against a large seeded database and also looks at their plans.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+        def slot(hours, session_type="standard", is_booked=True):
+            return TutorAvailability.objects.create(
+                tutor_id=1,
+                session_type=session_type,
+                language_to_teach="English",
+                start_time=now + timedelta(hours=hours),
+                end_time=now + timedelta(hours=hours, minutes=50),
+                credits_required=10,
+                is_booked=is_booked,
+            )
+
+        completed = Bookings.objects.create(
+            availability=slot(-48),
+            student_id=2,
+            booking_status="completed",
+            video_call_link="https://speakin.daily.co/room_completed",
+        )
+        Report.objects.create(
+            booking=completed, reporter_id=2, description="Tutor did not show up"
+        )
+        Bookings.objects.create(
+            availability=slot(24),
+            student_id=3,
+            booking_status="confirmed",
+            video_call_link="https://speakin.daily.co/room_confirmed",
+        )
+        slot(48, session_type="trial", is_booked=False)
+
+    def assertQueryCount(self, name):
+        checks = dict(Command().checks())
+        with self.assertNumQueries(EXPECTED_QUERIES[name]):
+            checks[name]()
+
+    def test_tutor_availabilities_by_tutor(self):
+        self.assertQueryCount("GET tutor-availabilities/?tutor_id=<id>")
+
+    def test_upcoming_tutor_availabilities(self):
+        self.assertQueryCount("GET tutor-availabilities/?start_time_after=<now>")
+
+    def test_tutor_availability(self):
+        self.assertQueryCount("GET tutor-availabilities/<id>/")
+
+    def test_booking(self):
+        self.assertQueryCount("GET bookings/<id>/")
+
+    def test_tutor_credits_history(self):
+        self.assertQueryCount("GET bookings/tutor-credits-history/<tutor_id>/")
+
+    def test_booking_reports(self):
+        self.assertQueryCount("GET reports/<booking_id>/")
+
+    def test_validate_availability(self):
+        self.assertQueryCount("validate new tutor availability")
+
+    def test_validate_trial_booking(self):
+        self.assertQueryCount("validate new trial booking")
+
+    def test_room_access_permission(self):
+        self.assertQueryCount("room access permission")
+
+    def test_session_sweeper_batch(self):
+        self.assertQueryCount("session sweeper batch")
+
+    def test_every_check_is_pinned(self):
+        self.assertEqual(
+            [name for name, check in Command().checks()], list(EXPECTED_QUERIES)
+        )
@@ -3,7 +3,9 @@ from .views import *
 
 urlpatterns = [
     path("tutor-availabilities/", TutorAvailabilityList.as_view()),
+    path("tutor-availabilities/bulk/", TutorAvailabilityBulkCreate.as_view()),
     path("tutor-availabilities/<int:pk>/", TutorAvailabilityDetail.as_view()),
+    path("open-slots/", OpenSlotList.as_view()),
     path("bookings/", BookingsList.as_view()),
     path("bookings/<int:pk>/", BookingsDetail.as_view()),
     path("create-daily-room/", DailyRoomCreateView.as_view()),
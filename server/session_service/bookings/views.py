@@ -3,6 +3,7 @@ from rest_framework import generics
 from .models import TutorAvailability, Bookings, Report
 from .serializers import (
     TutorAvailabilitySerializer,
+    TutorAvailabilityBulkSerializer,
     BookingsSerializer,
     ReportSerializer,
     ReportUpdateSerializer,
@@ -10,24 +11,33 @@ from .serializers import (
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.conf import settings
 import requests
 from protos.client import (
-    update_user_credits,
-    lock_credits_in_escrow,
+    adjust_user_credits,
     refund_credits_from_escrow,
-    release_credits_from_escrow,
 )
+from .pagination import TutorAvailabilityCursorPagination
 from .permissions import IsAdminOrOwnerPermission, ValidateRoomNamePermission
 from django.utils import timezone
 from datetime import timedelta
 from django.conf import settings
 from rest_framework.views import APIView
 from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 from django.utils.timezone import now
-from .tasks import send_cancellation_notification, send_booking_notification
-from .utils import get_room_name
+from .outbox import enqueue_notification
+from .saga import BookingSagaOrchestrator
+from .settlement import settle_bookings
+from services.open_slots import (
+    get_open_slots,
+    remove_open_slots,
+    slot_payload,
+    sync_open_slots,
+)
+from redis.exceptions import RedisError
+from services.publisher import NotificationType
 import os
 from dotenv import load_dotenv
 import logging
@@ -41,6 +51,34 @@ load_dotenv()
 class TutorAvailabilityList(generics.ListCreateAPIView):
     queryset = TutorAvailability.objects.all()
     serializer_class = TutorAvailabilitySerializer
+    pagination_class = TutorAvailabilityCursorPagination
+
+    def get_queryset(self):
+        # Bookings are nested in every slot, fetch them in one query
+        queryset = TutorAvailability.objects.prefetch_related("bookings")
+        params = self.request.query_params
+
+        if "tutor_id" in params:
+            try:
+                queryset = queryset.filter(tutor_id=int(params["tutor_id"]))
+            except ValueError:
+                raise ValidationError({"tutor_id": "Must be an integer."})
+        if "language" in params:
+            queryset = queryset.filter(language_to_teach=params["language"])
+        if "is_booked" in params:
+            if params["is_booked"] not in ("true", "false"):
+                raise ValidationError({"is_booked": "Must be true or false."})
+            queryset = queryset.filter(is_booked=params["is_booked"] == "true")
+        for param, lookup in (
+            ("start_time_after", "start_time__gte"),
+            ("start_time_before", "start_time__lt"),
+        ):
+            if param in params:
+                value = parse_datetime(params[param])
+                if value is None:
+                    raise ValidationError({param: "Must be an ISO 8601 datetime."})
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
 
     def create(self, request, *args, **kwargs):
         logger.info("Creating new tutor availability")
@@ -58,7 +96,18 @@ class TutorAvailabilityList(generics.ListCreateAPIView):
                 logger.error(f"Validation error: {str(e)}")
                 return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        self.perform_create(serializer)
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError as e:
+            # Another request created an overlapping slot after validation
+            if "tutor_availability_no_overlap" not in str(e):
+                raise
+            logger.warning(f"Overlapping time slot rejected by constraint: {str(e)}")
+            return Response(
+                {"detail": "This time slot overlaps with an existing slot."},
+                status=status.HTTP_409_CONFLICT,
+            )
         logger.info(
             f"Tutor availability created successfully: ID {serializer.instance.id}"
         )
@@ -67,6 +116,111 @@ class TutorAvailabilityList(generics.ListCreateAPIView):
             serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
 
+    def perform_create(self, serializer):
+        slot = serializer.save()
+        transaction.on_commit(lambda: sync_open_slots([slot]))
+
+
+class TutorAvailabilityBulkCreate(generics.GenericAPIView):
+    serializer_class = TutorAvailabilityBulkSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tutor_id = serializer.validated_data["tutor_id"]
+        requested = len(serializer.validated_data["slots"])
+        logger.info(f"Creating {requested} availabilities for tutor {tutor_id}")
+
+        conflicts = serializer.find_conflicts()
+        if conflicts and (
+            not serializer.validated_data["skip_conflicts"]
+            or len(conflicts) == requested
+        ):
+            logger.warning(
+                f"{len(conflicts)} of {requested} availabilities for tutor {tutor_id} overlap existing slots"
+            )
+            return Response(
+                {
+                    "detail": "Some time slots overlap with existing slots.",
+                    "conflicts": conflicts,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            with transaction.atomic():
+                created = serializer.save(conflicts=conflicts)
+                transaction.on_commit(lambda: sync_open_slots(created))
+        except IntegrityError as e:
+            # Another request created an overlapping slot after the check
+            if "tutor_availability_no_overlap" not in str(e):
+                raise
+            logger.warning(f"Overlapping time slot rejected by constraint: {str(e)}")
+            return Response(
+                {"detail": "This time slot overlaps with an existing slot."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        logger.info(f"Created {len(created)} availabilities for tutor {tutor_id}")
+
+        slots = (
+            TutorAvailability.objects.filter(id__in=[slot.id for slot in created])
+            .prefetch_related("bookings")
+            .order_by("start_time")
+        )
+        return Response(
+            {
+                "created": TutorAvailabilitySerializer(slots, many=True).data,
+                "conflicts": conflicts,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class OpenSlotList(APIView):
+    """The next open slots of a tutor or of a language, oldest first"""
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        tutor_id = None
+        language = params.get("language")
+        if "tutor_id" in params:
+            try:
+                tutor_id = int(params["tutor_id"])
+            except ValueError:
+                raise ValidationError({"tutor_id": "Must be an integer."})
+        elif not language:
+            raise ValidationError({"detail": "Provide a tutor_id or a language."})
+
+        after = now()
+        if "after" in params:
+            after = parse_datetime(params["after"])
+            if after is None:
+                raise ValidationError({"after": "Must be an ISO 8601 datetime."})
+        try:
+            limit = int(params.get("limit", 20))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        if not 1 <= limit <= 100:
+            raise ValidationError({"limit": "Must be between 1 and 100."})
+
+        try:
+            slots = get_open_slots().next_slots(
+                after, limit, tutor_id=tutor_id, language=language
+            )
+        except RedisError as e:
+            logger.error(f"Open slot index unavailable, reading the database: {str(e)}")
+            queryset = TutorAvailability.objects.filter(
+                is_booked=False, start_time__gte=max(after, now())
+            )
+            if tutor_id is not None:
+                queryset = queryset.filter(tutor_id=tutor_id)
+            else:
+                queryset = queryset.filter(language_to_teach=language)
+            slots = [
+                slot_payload(slot) for slot in queryset.order_by("start_time")[:limit]
+            ]
+        return Response(slots)
+
 
 class TutorAvailabilityDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = TutorAvailability.objects.all()
@@ -113,32 +267,40 @@ class TutorAvailabilityDetail(generics.RetrieveUpdateDestroyAPIView):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
 
-            refund_success = update_user_credits(
-                booking.student_id, session.credits_required, refund_from_escrow=True
+            refund = adjust_user_credits(
+                booking.student_id,
+                session.credits_required,
+                idempotency_key=f"booking-{booking.id}-refund",
+                reason="booking_refund",
             )
-            if not refund_success:
+            if not (refund and refund["success"]):
                 logger.error(f"Failed to refund credits to user {booking.student_id}")
                 return Response(
                     {"error": "Failed to refund credits to user."},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
 
-            send_cancellation_notification.delay(booking.id, new_status)
-            logger.info(f"Cancellation notification sent for booking {booking.id}")
-
-            if (
-                session.start_time
-                and session.start_time - timezone.now() >= timedelta(hours=3)
-                and new_status == "canceled_by_student"
-            ):
-                session.is_booked = False
-                session.save()
-                logger.info(f"Session {session.id} marked as available")
-
-            booking.booking_status = new_status
-            booking.canceled_at = timezone.now()
-            booking.refund_status = True
-            booking.save()
+            # The notification is published only if the cancellation commits
+            with transaction.atomic():
+                if (
+                    session.start_time
+                    and session.start_time - timezone.now() >= timedelta(hours=3)
+                    and new_status == "canceled_by_student"
+                ):
+                    session.is_booked = False
+                    session.save()
+                    transaction.on_commit(lambda: sync_open_slots([session]))
+                    logger.info(f"Session {session.id} marked as available")
+
+                booking.booking_status = new_status
+                booking.canceled_at = timezone.now()
+                booking.refund_status = True
+                booking.save()
+                enqueue_notification(
+                    NotificationType.CANCELLATION,
+                    booking_id=booking.id,
+                    new_status=new_status,
+                )
             logger.info(f"Booking {booking.id} updated with cancellation status")
 
             return Response(
@@ -169,71 +331,43 @@ class TutorAvailabilityDetail(generics.RetrieveUpdateDestroyAPIView):
         logger.info(f"Deleting session {session.id}")
         return super().delete(request, *args, **kwargs)
 
+    def perform_update(self, serializer):
+        # The slot may move to another tutor or language set
+        previous = TutorAvailability(
+            id=serializer.instance.id,
+            tutor_id=serializer.instance.tutor_id,
+            language_to_teach=serializer.instance.language_to_teach,
+        )
+        slot = serializer.save()
+        transaction.on_commit(lambda: remove_open_slots([previous]))
+        transaction.on_commit(lambda: sync_open_slots([slot]))
+
+    def perform_destroy(self, instance):
+        # The id is gone after delete()
+        removed = TutorAvailability(
+            id=instance.id,
+            tutor_id=instance.tutor_id,
+            language_to_teach=instance.language_to_teach,
+        )
+        super().perform_destroy(instance)
+        transaction.on_commit(lambda: remove_open_slots([removed]))
+
 
 class BookingsList(generics.ListCreateAPIView):
     queryset = Bookings.objects.all()
     serializer_class = BookingsSerializer
 
-    @transaction.atomic
     def perform_create(self, serializer):
-        booking = serializer.save()
+        # Debits the student and locks the credits in escrow, or undoes
+        # whatever of that happened before raising
+        booking = BookingSagaOrchestrator().start(serializer)
         logger.info(f"Created new booking: {booking.id}")
 
-        availability_id = booking.availability.id
-        booking_id = booking.id
-        student_id = booking.student_id
-        tutor_id = booking.availability.tutor_id
-
-        tutor_availability = get_object_or_404(TutorAvailability, id=availability_id)
-        credits_required = tutor_availability.credits_required
-
-        student_data = requests.get(
-            f"{settings.USER_SERVICE_URL}users/{student_id}/"
-        ).json()
-
-        if student_data["balance_credits"] < credits_required:
-            logger.warning(f"Insufficient credits for user {student_id}")
-            raise ValidationError(
-                {"error": "Insufficient credits"}, code=status.HTTP_400_BAD_REQUEST
-            )
-
-        if not update_user_credits(
-            student_id, student_data["balance_credits"] - credits_required
-        ):
-            logger.error(f"Failed to update credits for user {student_id}")
-            raise ValidationError("Failed to update user balance")
-
-        logger.info(f"Locking credits in escrow for booking {booking_id}")
-        if not lock_credits_in_escrow(
-            student_id=student_id,
-            tutor_id=tutor_availability.tutor_id,
-            booking_id=booking_id,
-            credits_required=credits_required,
-        ):
-            update_user_credits(student_id, student_data["balance_credits"])
-            logger.error(f"Failed to lock credits in escrow for booking {booking_id}")
-            raise ValidationError("Failed to lock credits in escrow")
-
-        room_name = get_room_name(booking_id, tutor_id, student_id)
-        logger.info(f"Generated room name for booking {booking_id}")
-
-        booking.video_call_link = room_name
-        booking.save()
-
-        tutor_availability.is_booked = True
-        tutor_availability.save()
-
-        send_booking_notification.delay(booking.id, student_data)
-        logger.info(f"Booking notification sent for booking {booking_id}")
-
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
-
 
 class BookingsDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = Bookings.objects.all()
     serializer_class = BookingsSerializer
 
-    @transaction.atomic
     def update(self, request, *args, **kwargs):
         booking = self.get_object()
         current_time = now()
@@ -260,86 +394,31 @@ class BookingsDetail(generics.RetrieveUpdateDestroyAPIView):
                     f"Tutor joined within 5-minute window for booking {booking.id}"
                 )
 
-        response = super().update(request, *args, **kwargs)
+        # Completing a session settles it, and the settlement decides the
+        # final status from who joined
+        settle = request.data.get("booking_status") == "completed"
+        if settle:
+            request.data.pop("booking_status")
+
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
         booking.refresh_from_db()
 
-        # After update, check conditions and perform actions
-        if (
-            "booking_status" in request.data
-            and request.data["booking_status"] == "completed"
-        ):
-            session_type = booking.availability.session_type
+        # Settled after the update is committed, no transaction is held open
+        # across the payment and credit calls
+        if settle:
             logger.info(f"Processing completion for booking {booking.id}")
+            if not settle_bookings([booking]):
+                logger.error(
+                    f"Failed to settle booking {booking.id}, the session sweeper will retry"
+                )
+                return Response(
+                    {"error": "Failed to settle the session credits"},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            logger.info(f"Booking {booking.id} settled as {booking.booking_status}")
+            response.data = self.get_serializer(booking).data
 
-            if (
-                booking.student_joined_within_5_min
-                and booking.tutor_joined_within_5_min
-            ):
-                if release_credits_from_escrow(session_type, booking_id=booking.id):
-                    booking.booking_status = "completed"
-                    logger.info(
-                        f"Session completed successfully for booking {booking.id}"
-                    )
-                else:
-                    logger.error(
-                        f"Failed to release credits from escrow for booking {booking.id}"
-                    )
-                    return Response(
-                        {"error": "Failed to refund credits from escrow"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-
-            elif (
-                booking.tutor_joined_within_5_min
-                and not booking.student_joined_within_5_min
-            ):
-                if release_credits_from_escrow(session_type, booking_id=booking.id):
-                    booking.booking_status = "no_show_by_student"
-                    logger.info(f"No-show by student recorded for booking {booking.id}")
-                else:
-                    logger.error(
-                        f"Failed to release credits from escrow for booking {booking.id}"
-                    )
-                    return Response(
-                        {"error": "Failed to refund credits from escrow"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-
-            elif (
-                not booking.tutor_joined_within_5_min
-                and booking.student_joined_within_5_min
-            ):
-                logger.info(f"Processing no-show by tutor for booking {booking.id}")
-                if refund_credits_from_escrow(booking_id=booking.id):
-                    if update_user_credits(
-                        user_id=booking.student_id,
-                        new_balance=booking.availability.credits_required
-                        + (booking.availability.credits_required * 10 // 100),
-                        refund_from_escrow=True,
-                    ):
-                        booking.booking_status = "no_show_by_tutor"
-                        booking.refund_status = True
-                        logger.info(
-                            f"No-show by tutor processed successfully for booking {booking.id}"
-                        )
-                    else:
-                        logger.error(
-                            f"Failed to update user credits for booking {booking.id}"
-                        )
-                        return Response(
-                            {"error": "Failed to deduct balance credits"},
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        )
-                else:
-                    logger.error(
-                        f"Failed to refund credits from escrow for booking {booking.id}"
-                    )
-                    return Response(
-                        {"error": "Failed to refund credits from escrow"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-
-        booking.save()
         return response
 
 
@@ -466,8 +545,8 @@ class ReportList(generics.ListCreateAPIView):
             else "Fetching all reports"
         )
         if booking_id:
-            return Report.objects.filter(booking_id=booking_id)
-        return Report.objects.all().select_related("booking", "booking__availability")
+            return Report.objects.filter(booking_id=booking_id).select_related("booking")
+        return Report.objects.all().select_related("booking")
 
 
 class ReportDetail(generics.RetrieveUpdateDestroyAPIView):
@@ -482,7 +561,7 @@ class TutorCreditsHistoryView(generics.ListAPIView):
         tutor_id = self.kwargs.get("tutor_id")
         logger.info(f"Fetching credit history for tutor: {tutor_id}")
         return Bookings.objects.filter(
-            availability__tutor_id=tutor_id, booking_status="completed"
+            tutor_id=tutor_id, booking_status="completed"
         ).select_related("availability")
 
     def list(self, request, *args, **kwargs):
@@ -0,0 +1,112 @@
+"""
+Per-call latency of a channel per call versus the shared channel registry.
+
+Starts an in-process UserService that answers immediately, so the numbers
+are dominated by connection setup and transport overhead.
+
+Usage: python -m protos.benchmark [--calls 500] [--threads 1]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent import futures
+import grpc
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
+from django.conf import settings
+
+SERVICE_NAME = "user_service.UserService"
+
+
+def start_server():
+    from .generated import user_service_pb2, user_service_pb2_grpc
+
+    class UserService(user_service_pb2_grpc.UserServiceServicer):
+        def UpdateUserCredits(self, request, context):
+            return user_service_pb2.UpdateUserCreditsResponse(success=True)
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    user_service_pb2_grpc.add_UserServiceServicer_to_server(UserService(), server)
+    health_servicer = health.HealthServicer()
+    health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+    health_servicer.set(SERVICE_NAME, health_pb2.HealthCheckResponse.SERVING)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+def call_with_new_channel(target, request):
+    from .generated.user_service_pb2_grpc import UserServiceStub
+
+    with grpc.insecure_channel(target) as channel:
+        UserServiceStub(channel).UpdateUserCredits(request, timeout=5)
+
+
+def call_with_registry(target, request):
+    from .channels import get_stub
+    from .generated.user_service_pb2_grpc import UserServiceStub
+
+    get_stub("user", UserServiceStub).UpdateUserCredits(request, timeout=5)
+
+
+def measure(call, target, calls, threads):
+    from .generated.user_service_pb2 import UpdateUserCreditsRequest
+
+    request = UpdateUserCreditsRequest(user_id=1, credits=10)
+    call(target, request)  # warm up
+
+    def timed(_):
+        started = time.perf_counter()
+        call(target, request)
+        return (time.perf_counter() - started) * 1000
+
+    with futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        started = time.perf_counter()
+        latencies = sorted(pool.map(timed, range(calls)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "mean": statistics.fmean(latencies),
+        "rps": calls / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    server, target = start_server()
+    if not settings.configured:
+        settings.configure(
+            GRPC_CALL_TIMEOUT=5,
+            GRPC_MAX_ATTEMPTS=3,
+            GRPC_KEEPALIVE_TIME_MS=30000,
+            GRPC_KEEPALIVE_TIMEOUT_MS=10000,
+            GRPC_SERVICES={"user": {"target": target, "service_name": SERVICE_NAME}},
+        )
+    else:
+        settings.GRPC_SERVICES["user"]["target"] = target
+
+    try:
+        print(f"{args.calls} calls, {args.threads} thread(s)")
+        print(f"{'':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'calls/s':>10}")
+        for label, call in [
+            ("channel per call", call_with_new_channel),
+            ("shared channel", call_with_registry),
+        ]:
+            result = measure(call, target, args.calls, args.threads)
+            print(
+                f"{label:<20}{result['p50']:>10.2f}{result['p95']:>10.2f}"
+                f"{result['p99']:>10.2f}{result['mean']:>10.2f}{result['rps']:>10.0f}"
+            )
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
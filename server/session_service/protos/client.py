@@ -1,11 +1,18 @@
 import grpc
-import os
-from .generated.user_service_pb2 import UpdateUserCreditsRequest
+from django.conf import settings
+from .channels import get_stub
+from .generated.user_service_pb2 import (
+    AdjustUserCreditsRequest,
+    BatchUpdateUserCreditsRequest,
+    CreditAdjustment,
+)
 from .generated.user_service_pb2_grpc import UserServiceStub
 from .generated.payment_service_pb2 import (
+    EscrowSettlement,
     LockCreditsRequest,
     RefundLockedCreditsRequest,
     ReleaseLockedCreditsRequest,
+    SettleEscrowsRequest,
 )
 from .generated.payment_service_pb2_grpc import PaymentServiceStub
 import logging
@@ -14,27 +21,97 @@ import logging
 logger = logging.getLogger("bookings")
 
 
-def update_user_credits(user_id, new_balance, refund_from_escrow=None):
+def adjust_user_credits(user_id, amount, idempotency_key, reason):
+    """
+    Add amount (negative for a debit) to a user's credits through the credit
+    ledger. Retrying with the same idempotency key never applies it twice.
+    Returns a dict with success, balance and error, or None if the call failed.
+    """
     try:
-        logger.info(f"Initiating gRPC call to update credits for user {user_id}")
-        with grpc.insecure_channel(
-            os.getenv("USER_SERVICE_GRPC_HOST") + ":50051"
-        ) as channel:
-            user_stub = UserServiceStub(channel)
-            response = user_stub.UpdateUserCredits(
-                UpdateUserCreditsRequest(
-                    user_id=user_id,
-                    credits=new_balance,
-                    is_deduction=not refund_from_escrow,  # If refunding, this is not a deduction
-                    refund_from_escrow=refund_from_escrow or False,
-                )
+        logger.info(
+            f"Initiating gRPC call to adjust credits for user {user_id} by {amount:+d}"
+        )
+        user_stub = get_stub("user", UserServiceStub)
+        response = user_stub.AdjustUserCredits(
+            AdjustUserCreditsRequest(
+                user_id=user_id,
+                amount=amount,
+                idempotency_key=idempotency_key,
+                reason=reason,
+            ),
+            timeout=settings.GRPC_CALL_TIMEOUT,
+        )
+        if response.success:
+            logger.info(
+                f"Successfully adjusted credits for user {user_id}, balance {response.balance}"
             )
-            if response.success:
-                logger.info(f"Successfully updated credits for user {user_id}")
-            return response.success
+        else:
+            logger.warning(
+                f"Credit adjustment for user {user_id} rejected: {response.error}"
+            )
+        return {
+            "success": response.success,
+            "balance": response.balance,
+            "error": response.error,
+        }
     except grpc.RpcError as e:
-        logger.error(f"Failed to connect to user service: {e.details()}")
-        return False
+        logger.error(
+            f"Failed to adjust credits for user {user_id}: {e.details()} (Code: {e.code()})"
+        )
+        return None
+
+
+def batch_update_user_credits(adjustments, stream=False):
+    """
+    Apply many credit adjustments with one call. Each adjustment is a dict
+    with user_id, credits and optionally is_deduction, idempotency_key and
+    reason. Returns the per-adjustment results in order, or None if the call
+    failed.
+    """
+    try:
+        logger.info(
+            f"Initiating gRPC call to apply {len(adjustments)} credit adjustments"
+        )
+        user_stub = get_stub("user", UserServiceStub)
+        messages = [
+            CreditAdjustment(
+                user_id=adjustment["user_id"],
+                credits=adjustment["credits"],
+                is_deduction=adjustment.get("is_deduction", False),
+                idempotency_key=adjustment.get("idempotency_key", ""),
+                reason=adjustment.get("reason", ""),
+            )
+            for adjustment in adjustments
+        ]
+        if stream:
+            response = user_stub.StreamUpdateUserCredits(
+                iter(messages), timeout=settings.GRPC_CALL_TIMEOUT
+            )
+        else:
+            response = user_stub.BatchUpdateUserCredits(
+                BatchUpdateUserCreditsRequest(adjustments=messages),
+                timeout=settings.GRPC_CALL_TIMEOUT,
+            )
+
+        results = [
+            {
+                "user_id": result.user_id,
+                "success": result.success,
+                "error": result.error,
+                "balance": result.balance,
+                "duplicate": result.duplicate,
+            }
+            for result in response.results
+        ]
+        failed = [result for result in results if not result["success"]]
+        if failed:
+            logger.warning(f"{len(failed)} credit adjustments were rejected: {failed}")
+        return results
+    except grpc.RpcError as e:
+        logger.error(
+            f"Failed to apply credit adjustments: {e.details()} (Code: {e.code()})"
+        )
+        return None
 
 
 def lock_credits_in_escrow(student_id, tutor_id, booking_id, credits_required):
@@ -42,24 +119,22 @@ def lock_credits_in_escrow(student_id, tutor_id, booking_id, credits_required):
         logger.info(
             f"Initiating credit lock for booking {booking_id}: student {student_id}, tutor {tutor_id}"
         )
-        with grpc.insecure_channel(
-            os.getenv("PAYMENT_SERVICE_GRPC_HOST") + ":50052"
-        ) as channel:
-            payment_stub = PaymentServiceStub(channel)
-            response = payment_stub.LockCredits(
-                LockCreditsRequest(
-                    student_id=student_id,
-                    tutor_id=tutor_id,
-                    booking_id=booking_id,
-                    credits_locked=credits_required,
-                    status="locked",
-                )
+        payment_stub = get_stub("payment", PaymentServiceStub)
+        response = payment_stub.LockCredits(
+            LockCreditsRequest(
+                student_id=student_id,
+                tutor_id=tutor_id,
+                booking_id=booking_id,
+                credits_locked=credits_required,
+                status="locked",
+            ),
+            timeout=settings.GRPC_CALL_TIMEOUT,
+        )
+        if response.success:
+            logger.info(
+                f"Successfully locked {credits_required} credits for booking {booking_id}"
             )
-            if response.success:
-                logger.info(
-                    f"Successfully locked {credits_required} credits for booking {booking_id}"
-                )
-            return response.success
+        return response.success
     except grpc.RpcError as e:
         logger.error(
             f"Failed to lock credits in escrow: {e.details()} (Code: {e.code()})"
@@ -67,22 +142,28 @@ def lock_credits_in_escrow(student_id, tutor_id, booking_id, credits_required):
         return False
 
 
-def refund_credits_from_escrow(booking_id):
+def refund_credits_from_escrow(booking_id, missing_ok=False):
+    """
+    Mark the escrow of a booking as refunded. With missing_ok a booking
+    without locked credits counts as refunded, for compensations that do
+    not know whether the lock went through.
+    """
     try:
         logger.info(f"Initiating credit refund for booking {booking_id}")
-        with grpc.insecure_channel(
-            os.getenv("PAYMENT_SERVICE_GRPC_HOST") + ":50052"
-        ) as channel:
-            payment_stub = PaymentServiceStub(channel)
-            response = payment_stub.RefundLockedCredits(
-                RefundLockedCreditsRequest(
-                    booking_id=booking_id,
-                )
-            )
-            if response.success:
-                logger.info(f"Successfully refunded credits for booking {booking_id}")
-            return response.success
+        payment_stub = get_stub("payment", PaymentServiceStub)
+        response = payment_stub.RefundLockedCredits(
+            RefundLockedCreditsRequest(
+                booking_id=booking_id,
+            ),
+            timeout=settings.GRPC_CALL_TIMEOUT,
+        )
+        if response.success:
+            logger.info(f"Successfully refunded credits for booking {booking_id}")
+        return response.success
     except grpc.RpcError as e:
+        if missing_ok and e.code() == grpc.StatusCode.NOT_FOUND:
+            logger.info(f"No locked credits to refund for booking {booking_id}")
+            return True
         logger.error(
             f"Failed to refund credits from escrow: {e.details()} (Code: {e.code()})"
         )
@@ -92,21 +173,58 @@ def refund_credits_from_escrow(booking_id):
 def release_credits_from_escrow(session_type, booking_id):
     try:
         logger.info(f"Initiating credit release for booking {booking_id}")
-        with grpc.insecure_channel(
-            os.getenv("PAYMENT_SERVICE_GRPC_HOST") + ":50052"
-        ) as channel:
-            payment_stub = PaymentServiceStub(channel)
-            response = payment_stub.ReleaseLockedCredits(
-                ReleaseLockedCreditsRequest(
-                    session_type=session_type,
-                    booking_id=booking_id,
-                )
-            )
-            if response.success:
-                logger.info(f"Successfully released credits for booking {booking_id}")
-            return response.success
+        payment_stub = get_stub("payment", PaymentServiceStub)
+        response = payment_stub.ReleaseLockedCredits(
+            ReleaseLockedCreditsRequest(
+                session_type=session_type,
+                booking_id=booking_id,
+            ),
+            timeout=settings.GRPC_CALL_TIMEOUT,
+        )
+        if response.success:
+            logger.info(f"Successfully released credits for booking {booking_id}")
+        return response.success
     except grpc.RpcError as e:
         logger.error(
             f"Failed to release credits from escrow: {e.details()} (Code: {e.code()})"
         )
         return False
+
+
+def settle_escrows(settlements):
+    """
+    Release or refund many escrows with one call. Each settlement is a dict
+    with booking_id, action ('release' or 'refund') and session_type.
+    Returns the per-settlement results in order, or None if the call failed.
+    """
+    try:
+        logger.info(f"Initiating gRPC call to settle {len(settlements)} escrows")
+        payment_stub = get_stub("payment", PaymentServiceStub)
+        response = payment_stub.SettleEscrows(
+            SettleEscrowsRequest(
+                settlements=[
+                    EscrowSettlement(
+                        booking_id=settlement["booking_id"],
+                        action=settlement["action"],
+                        session_type=settlement.get("session_type", ""),
+                    )
+                    for settlement in settlements
+                ]
+            ),
+            timeout=settings.GRPC_CALL_TIMEOUT,
+        )
+        results = [
+            {
+                "booking_id": result.booking_id,
+                "success": result.success,
+                "error": result.error,
+            }
+            for result in response.results
+        ]
+        failed = [result for result in results if not result["success"]]
+        if failed:
+            logger.warning(f"{len(failed)} escrow settlements failed: {failed}")
+        return results
+    except grpc.RpcError as e:
+        logger.error(f"Failed to settle escrows: {e.details()} (Code: {e.code()})")
+        return None
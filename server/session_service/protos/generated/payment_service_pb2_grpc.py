@@ -49,6 +49,11 @@ class PaymentServiceStub(object):
                 request_serializer=payment__service__pb2.ReleaseLockedCreditsRequest.SerializeToString,
                 response_deserializer=payment__service__pb2.ReleaseLockedCreditsResponse.FromString,
                 _registered_method=True)
+        self.SettleEscrows = channel.unary_unary(
+                '/PaymentService/SettleEscrows',
+                request_serializer=payment__service__pb2.SettleEscrowsRequest.SerializeToString,
+                response_deserializer=payment__service__pb2.SettleEscrowsResponse.FromString,
+                _registered_method=True)
 
 
 class PaymentServiceServicer(object):
@@ -73,6 +78,12 @@ class PaymentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SettleEscrows(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_PaymentServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -91,6 +102,11 @@ def add_PaymentServiceServicer_to_server(servicer, server):
                     request_deserializer=payment__service__pb2.ReleaseLockedCreditsRequest.FromString,
                     response_serializer=payment__service__pb2.ReleaseLockedCreditsResponse.SerializeToString,
             ),
+            'SettleEscrows': grpc.unary_unary_rpc_method_handler(
+                    servicer.SettleEscrows,
+                    request_deserializer=payment__service__pb2.SettleEscrowsRequest.FromString,
+                    response_serializer=payment__service__pb2.SettleEscrowsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'PaymentService', rpc_method_handlers)
@@ -182,3 +198,30 @@ class PaymentService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SettleEscrows(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/PaymentService/SettleEscrows',
+            payment__service__pb2.SettleEscrowsRequest.SerializeToString,
+            payment__service__pb2.SettleEscrowsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
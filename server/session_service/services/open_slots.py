@@ -0,0 +1,151 @@
+import json
+import logging
+import threading
+import time
+import redis
+from django.conf import settings
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+# Get logger for the session app
+logger = logging.getLogger("bookings")
+
+KEY_PREFIX = "open_slots"
+SLOT_KEY_PREFIX = f"{KEY_PREFIX}:slot:"
+
+# Next slot ids from one sorted set, and their payloads, in one round trip.
+# A slot's payload expires when the slot starts, so a missing payload is a
+# slot that is no longer open.
+NEXT_SLOTS_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], ARGV[1], '+inf', 'LIMIT', 0, ARGV[2])
+local slots = {}
+for _, id in ipairs(ids) do
+    local payload = redis.call('GET', ARGV[3] .. id)
+    if payload then
+        table.insert(slots, payload)
+    end
+end
+return slots
+"""
+
+
+def tutor_key(tutor_id):
+    return f"{KEY_PREFIX}:tutor:{tutor_id}"
+
+
+def language_key(language):
+    return f"{KEY_PREFIX}:language:{language}"
+
+
+def is_open(slot):
+    return not slot.is_booked and slot.start_time > timezone.now()
+
+
+def slot_payload(slot):
+    return {
+        "id": slot.id,
+        "tutor_id": slot.tutor_id,
+        "session_type": slot.session_type,
+        "language_to_teach": slot.language_to_teach,
+        "start_time": slot.start_time.isoformat(),
+        "end_time": slot.end_time.isoformat(),
+        "credits_required": slot.credits_required,
+    }
+
+
+class OpenSlots:
+    """
+    Read model of the open (not booked, not yet started) tutor availability
+    slots in Redis. Every open slot is a member of a sorted set for its
+    tutor and one for its language, scored by its start time, and its
+    payload is stored next to them. The database stays the source of
+    truth, the rebuild_open_slots command recreates everything from it.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.next_slots_script = client.register_script(NEXT_SLOTS_SCRIPT)
+
+    def add(self, slots, pipeline=None):
+        pipe = self.client.pipeline(transaction=False) if pipeline is None else pipeline
+        now = time.time()
+        keys = set()
+        for slot in slots:
+            ttl = int(slot.start_time.timestamp() - now) + 1
+            if ttl <= 0:
+                continue
+            score = slot.start_time.timestamp()
+            pipe.set(
+                f"{SLOT_KEY_PREFIX}{slot.id}", json.dumps(slot_payload(slot)), ex=ttl
+            )
+            for key in (tutor_key(slot.tutor_id), language_key(slot.language_to_teach)):
+                pipe.zadd(key, {slot.id: score})
+                keys.add(key)
+        # Drop the members of slots that have started meanwhile
+        for key in keys:
+            pipe.zremrangebyscore(key, "-inf", f"({now}")
+        if pipeline is None:
+            pipe.execute()
+
+    def remove(self, slots, pipeline=None):
+        pipe = self.client.pipeline(transaction=False) if pipeline is None else pipeline
+        for slot in slots:
+            pipe.zrem(tutor_key(slot.tutor_id), slot.id)
+            pipe.zrem(language_key(slot.language_to_teach), slot.id)
+            pipe.delete(f"{SLOT_KEY_PREFIX}{slot.id}")
+        if pipeline is None:
+            pipe.execute()
+
+    def next_slots(self, after, limit, tutor_id=None, language=None):
+        """The first limit open slots starting at or after after"""
+        key = tutor_key(tutor_id) if tutor_id is not None else language_key(language)
+        payloads = self.next_slots_script(
+            keys=[key], args=[after.timestamp(), limit, SLOT_KEY_PREFIX]
+        )
+        return [json.loads(payload) for payload in payloads]
+
+
+_open_slots = None
+_open_slots_lock = threading.Lock()
+
+
+def get_open_slots():
+    """Return this process's shared read model client."""
+    global _open_slots
+    if _open_slots is None:
+        with _open_slots_lock:
+            if _open_slots is None:
+                _open_slots = OpenSlots(
+                    redis.Redis.from_url(
+                        settings.OPEN_SLOTS_REDIS_URL,
+                        socket_timeout=settings.OPEN_SLOTS_REDIS_TIMEOUT,
+                        socket_connect_timeout=settings.OPEN_SLOTS_REDIS_TIMEOUT,
+                    )
+                )
+    return _open_slots
+
+
+def sync_open_slots(slots):
+    """
+    Bring the read model in line with the given slots' current state. A
+    Redis failure is only logged, the next rebuild repairs the drift.
+    """
+    slots = list(slots)
+    try:
+        open_slots = get_open_slots()
+        pipe = open_slots.client.pipeline(transaction=False)
+        open_slots.add([slot for slot in slots if is_open(slot)], pipe)
+        open_slots.remove([slot for slot in slots if not is_open(slot)], pipe)
+        pipe.execute()
+    except RedisError as e:
+        logger.error(f"Failed to sync {len(slots)} slots to the open slot index: {str(e)}")
+
+
+def remove_open_slots(slots):
+    slots = list(slots)
+    try:
+        get_open_slots().remove(slots)
+    except RedisError as e:
+        logger.error(
+            f"Failed to remove {len(slots)} slots from the open slot index: {str(e)}"
+        )
@@ -3,7 +3,9 @@ import json
 import time
 import logging
 import os
+import threading
 from enum import Enum
+from pika.exceptions import AMQPError
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +16,27 @@ class NotificationType(Enum):
 
 
 class RabbitMQPublisher:
+    """
+    Publishes notifications over one long-lived connection.
+
+    The connection is opened on first use and reopened after it drops, and
+    the queue is declared once per connection. Single messages go through a
+    channel in publisher confirm mode, so a publish returns only after the
+    broker has taken the message. Batches go through a transactional
+    channel and are confirmed by a single commit.
+    """
+
     def __init__(self):
         self.max_retries = 3
         self.credentials = pika.PlainCredentials(
             os.getenv("RABBITMQ_USER"), os.getenv("RABBITMQ_PASS")
         )
         self.queue_name = "session_notifications"
+        self.connection = None
+        self.channel = None
+        self.batch_channel = None
+        # BlockingConnection is not thread safe
+        self._lock = threading.Lock()
 
     def _get_connection(self):
         return pika.BlockingConnection(
@@ -31,36 +48,128 @@ class RabbitMQPublisher:
             )
         )
 
-    def publish_notification(self, notification_data, notification_type):
-        retry_count = 0
-        while retry_count < self.max_retries:
+    def _connect(self):
+        self.connection = self._get_connection()
+        self.channel = self.connection.channel()
+        self.channel.queue_declare(queue=self.queue_name, durable=True)
+        self.channel.confirm_delivery()
+        self.batch_channel = self.connection.channel()
+        self.batch_channel.tx_select()
+        logger.info("Connected to RabbitMQ")
+
+    def _ensure_connection(self):
+        if self.connection is not None and self.connection.is_open:
+            try:
+                # Answers pending heartbeats and notices a dropped connection
+                # before anything is written to it
+                self.connection.process_data_events(time_limit=0)
+            except AMQPError:
+                self._reset()
+        if self.connection is None or not self.connection.is_open:
+            self._connect()
+
+    def _reset(self):
+        if self.connection is not None and self.connection.is_open:
             try:
-                connection = self._get_connection()
-                channel = connection.channel()
-
-                message = {
-                    "type": notification_type.value,
-                    "data": notification_data,
-                    "timestamp": time.time(),
-                }
-
-                channel.queue_declare(queue=self.queue_name, durable=True)
-
-                channel.basic_publish(
-                    exchange="",
-                    routing_key=self.queue_name,
-                    body=json.dumps(message),
-                    properties=pika.BasicProperties(
-                        delivery_mode=2, content_type="application/json"
-                    ),
-                )
-                connection.close()
-                return True
-            except Exception as e:
-                retry_count += 1
-                if retry_count == self.max_retries:
-                    logger.error(
-                        f"Failed to publish message after {self.max_retries} attempts: {e}"
-                    )
-                    return False
-                time.sleep(2**retry_count)
+                self.connection.close()
+            except AMQPError:
+                pass
+        self.connection = None
+        self.channel = None
+        self.batch_channel = None
+
+    def close(self):
+        with self._lock:
+            self._reset()
+
+    def _build_body(self, notification_data, notification_type, message_id=None):
+        message = {
+            "type": notification_type.value,
+            "data": notification_data,
+            "timestamp": time.time(),
+        }
+        if message_id is not None:
+            message["id"] = message_id
+        return json.dumps(message)
+
+    def _publish(self, channel, body, message_id=None):
+        channel.basic_publish(
+            exchange="",
+            routing_key=self.queue_name,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type="application/json",
+                message_id=message_id,
+            ),
+            mandatory=True,
+        )
+
+    def _with_retries(self, action, description):
+        retry_count = 0
+        with self._lock:
+            while retry_count < self.max_retries:
+                try:
+                    self._ensure_connection()
+                    action()
+                    return True
+                except Exception as e:
+                    self._reset()
+                    retry_count += 1
+                    if retry_count == self.max_retries:
+                        logger.error(
+                            f"Failed to publish {description} after {self.max_retries} attempts: {e}"
+                        )
+                        return False
+                    logger.warning(f"Publishing {description} failed, retrying: {e}")
+                    # The first retry usually only needs a fresh connection
+                    time.sleep(2 ** (retry_count - 1) - 1)
+        return False
+
+    def publish_notification(self, notification_data, notification_type):
+        body = self._build_body(notification_data, notification_type)
+        return self._with_retries(
+            lambda: self._publish(self.channel, body),
+            f"{notification_type.value} notification",
+        )
+
+    def publish_batch(self, notifications, message_ids=None):
+        """
+        Publish (notification_data, notification_type) pairs in one commit.
+        Either every message is queued or, on failure, none of them is.
+        message_ids lets consumers drop a message published twice.
+        """
+        message_ids = message_ids or [None] * len(notifications)
+        bodies = [
+            (self._build_body(notification_data, notification_type, message_id), message_id)
+            for (notification_data, notification_type), message_id in zip(
+                notifications, message_ids
+            )
+        ]
+        if not bodies:
+            return True
+
+        def publish():
+            for body, message_id in bodies:
+                self._publish(self.batch_channel, body, message_id)
+            self.batch_channel.tx_commit()
+
+        return self._with_retries(publish, f"batch of {len(bodies)} notifications")
+
+
+# One publisher per worker process. A connection must not be shared across
+# fork(), so a child process opens its own on first use.
+_publisher = None
+_publisher_pid = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher():
+    """Return this process's shared publisher."""
+    global _publisher, _publisher_pid
+    if _publisher is None or _publisher_pid != os.getpid():
+        with _publisher_lock:
+            if _publisher is None or _publisher_pid != os.getpid():
+                _publisher = RabbitMQPublisher()
+                _publisher_pid = os.getpid()
+    return _publisher
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'bookings',
 ]
@@ -135,8 +136,61 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 USER_SERVICE_URL = os.getenv('USER_SERVICE_URL')
 PAYMENT_SERVICE_URL = os.getenv('PAYMENT_SERVICE_URL')
 
+# gRPC Clients
+# Channels are shared per process, see protos/channels.py
+GRPC_CALL_TIMEOUT = float(os.getenv('GRPC_CALL_TIMEOUT', 5))
+GRPC_MAX_ATTEMPTS = int(os.getenv('GRPC_MAX_ATTEMPTS', 3))
+GRPC_KEEPALIVE_TIME_MS = int(os.getenv('GRPC_KEEPALIVE_TIME_MS', 30000))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.getenv('GRPC_KEEPALIVE_TIMEOUT_MS', 10000))
+GRPC_SERVICES = {
+    'user': {
+        'target': f"{os.getenv('USER_SERVICE_GRPC_HOST')}:50051",
+        'service_name': 'user_service.UserService',
+    },
+    'payment': {
+        'target': f"{os.getenv('PAYMENT_SERVICE_GRPC_HOST')}:50052",
+        'service_name': 'PaymentService',
+    },
+}
+
 DAILY_API_KEY = os.getenv('DAILY_API_KEY')
 
+# Open slot read model, see services/open_slots.py
+OPEN_SLOTS_REDIS_URL = os.getenv('OPEN_SLOTS_REDIS_URL', 'redis://redis:6379/4')
+OPEN_SLOTS_REDIS_TIMEOUT = float(os.getenv('OPEN_SLOTS_REDIS_TIMEOUT', 0.5))
+
+# User summaries cached by user_service, see services/user_summaries.py
+USER_SUMMARY_REDIS_URL = os.getenv('USER_SUMMARY_REDIS_URL', 'redis://redis:6379/5')
+USER_SUMMARY_REDIS_TIMEOUT = float(os.getenv('USER_SUMMARY_REDIS_TIMEOUT', 0.5))
+USER_SUMMARY_LOCAL_TTL = int(os.getenv('USER_SUMMARY_LOCAL_TTL', 30))
+USER_SUMMARY_LOCAL_SIZE = int(os.getenv('USER_SUMMARY_LOCAL_SIZE', 10000))
+
+# Most slots one bulk availability request may create
+TUTOR_AVAILABILITY_BULK_MAX_SLOTS = int(os.getenv('TUTOR_AVAILABILITY_BULK_MAX_SLOTS', 500))
+
+# Booking saga, see bookings/saga.py. Sagas still running or compensating
+# after BOOKING_SAGA_RECOVERY_AFTER seconds are resumed by celery beat every
+# BOOKING_SAGA_RESUME_INTERVAL seconds, or by `manage.py resume_booking_sagas`
+BOOKING_SAGA_WORKERS = int(os.getenv('BOOKING_SAGA_WORKERS', 16))
+BOOKING_SAGA_RECOVERY_AFTER = int(os.getenv('BOOKING_SAGA_RECOVERY_AFTER', 300))
+BOOKING_SAGA_RESUME_INTERVAL = float(os.getenv('BOOKING_SAGA_RESUME_INTERVAL', 60))
+BOOKING_SAGA_RESUME_BATCH_SIZE = int(os.getenv('BOOKING_SAGA_RESUME_BATCH_SIZE', 100))
+
+# Notification outbox, see bookings/outbox.py
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv('OUTBOX_RELAY_BATCH_SIZE', 100))
+OUTBOX_RELAY_POLL_INTERVAL = float(os.getenv('OUTBOX_RELAY_POLL_INTERVAL', 5))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 10))
+OUTBOX_RETENTION_DAYS = int(os.getenv('OUTBOX_RETENTION_DAYS', 7))
+
+# Process launcher, see `manage.py serve`
+SERVE_BIND = os.getenv('SERVE_BIND', '0.0.0.0:8002')
+SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 2 * (os.cpu_count() or 1) + 1))
+SERVE_THREADS = int(os.getenv('SERVE_THREADS', 4))
+SERVE_KEEPALIVE = int(os.getenv('SERVE_KEEPALIVE', 5))
+SERVE_TIMEOUT = int(os.getenv('SERVE_TIMEOUT', 30))
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30))
+SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', 10000))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://redis:6379/3')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://redis:6379/3')
@@ -146,6 +200,25 @@ CELERY_RESULT_SERIALIZER = 'json' # This is a constant, no need to move to .env
 CELERY_TIMEZONE = os.getenv('CELERY_TIMEZONE', 'UTC')
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = os.getenv('CELERY_BROKER_CONNECTION_RETRY', 'True') == 'True'
 
+# Session sweeper, see bookings/settlement.py. Settles sessions that ended
+# SESSION_SWEEP_GRACE_MINUTES ago and were never completed by a client.
+SESSION_SWEEP_INTERVAL = float(os.getenv('SESSION_SWEEP_INTERVAL', 60))
+SESSION_SWEEP_BATCH_SIZE = int(os.getenv('SESSION_SWEEP_BATCH_SIZE', 200))
+SESSION_SWEEP_GRACE_MINUTES = int(os.getenv('SESSION_SWEEP_GRACE_MINUTES', 10))
+CELERY_BEAT_SCHEDULE = {
+    'settle-ended-sessions': {
+        'task': 'bookings.tasks.settle_ended_sessions',
+        'schedule': SESSION_SWEEP_INTERVAL,
+        # A sweep that could not start in time is covered by the next one
+        'options': {'expires': SESSION_SWEEP_INTERVAL},
+    },
+    'resume-booking-sagas': {
+        'task': 'bookings.tasks.resume_booking_sagas',
+        'schedule': BOOKING_SAGA_RESUME_INTERVAL,
+        'options': {'expires': BOOKING_SAGA_RESUME_INTERVAL},
+    },
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -0,0 +1,161 @@
+"""
+Throughput of the UserService gRPC server under many concurrent callers.
+
+Every caller sends AdjustUserCredits for --user-id with amount 0 and a fixed
+idempotency key, so after the first call each request is an indexed ledger
+lookup and the user's balance is never changed.
+
+With --compare the server is started twice in subprocesses, once per
+GRPC_SERVER_MODE, using the current DJANGO_SETTINGS_MODULE and database.
+
+Usage:
+    python -m protos.loadtest --target localhost:50051 [--concurrency 200] [--duration 10]
+    python -m protos.loadtest --compare [--concurrency 200] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import grpc
+
+SERVICE_NAME = "user_service.UserService"
+
+
+async def run_load(target, user_id, concurrency, duration):
+    from .generated import user_service_pb2, user_service_pb2_grpc
+
+    request = user_service_pb2.AdjustUserCreditsRequest(
+        user_id=user_id,
+        amount=0,
+        idempotency_key=f"loadtest-{user_id}",
+        reason="loadtest",
+    )
+    latencies = []
+    errors = 0
+
+    async with grpc.aio.insecure_channel(target) as channel:
+        stub = user_service_pb2_grpc.UserServiceStub(channel)
+        try:
+            await stub.AdjustUserCredits(request, timeout=30)  # warm up
+        except grpc.aio.AioRpcError as e:
+            raise SystemExit(f"Warm-up call failed: {e.code().name} {e.details()}")
+        deadline = time.perf_counter() + duration
+
+        async def caller():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    await stub.AdjustUserCredits(request, timeout=30)
+                except grpc.aio.AioRpcError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(caller() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    if not latencies:
+        return {"calls": 0, "errors": errors, "rps": 0, "p50": 0, "p99": 0}
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_serving(target, timeout=30):
+    from grpc_health.v1 import health_pb2, health_pb2_grpc
+
+    deadline = time.monotonic() + timeout
+    with grpc.insecure_channel(target) as channel:
+        stub = health_pb2_grpc.HealthStub(channel)
+        while time.monotonic() < deadline:
+            try:
+                response = stub.Check(
+                    health_pb2.HealthCheckRequest(service=SERVICE_NAME),
+                    timeout=5,
+                    wait_for_ready=True,
+                )
+                if response.status == health_pb2.HealthCheckResponse.SERVING:
+                    return
+            except grpc.RpcError:
+                pass
+            time.sleep(0.2)
+    raise RuntimeError(f"gRPC server at {target} did not start")
+
+
+def start_server(mode):
+    port = free_port()
+    env = dict(os.environ, GRPC_SERVER_MODE=mode, GRPC_PORT=str(port))
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "server.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    target = f"127.0.0.1:{port}"
+    try:
+        wait_until_serving(target)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process, target
+
+
+def print_result(label, result):
+    print(
+        f"{label:<10}{result['calls']:>10}{result['errors']:>8}{result['rps']:>10.0f}"
+        f"{result['p50']:>10.2f}{result['p99']:>10.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} concurrent callers for {args.duration:g}s")
+    print(f"{'server':<10}{'calls':>10}{'errors':>8}{'calls/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+    if not args.compare:
+        result = asyncio.run(
+            run_load(args.target, args.user_id, args.concurrency, args.duration)
+        )
+        print_result(args.target, result)
+        return
+
+    for mode in ["sync", "aio"]:
+        process, target = start_server(mode)
+        try:
+            result = asyncio.run(
+                run_load(target, args.user_id, args.concurrency, args.duration)
+            )
+        finally:
+            # SIGTERM exercises the graceful drain of both servers
+            process.terminate()
+            process.wait(timeout=60)
+        print_result(mode, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import asyncio
+import bisect
+import inspect
+import signal
+import threading
+import time
+from concurrent import futures
+import grpc
+from django.conf import settings
+from django.db import close_old_connections
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
+import logging
+
+# Get logger for the user app
+logger = logging.getLogger("users")
+
+# Upper bounds of the latency buckets in milliseconds
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram of one RPC method."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.errors = 0
+
+    def observe(self, elapsed_ms, failed):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        self.errors += failed
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls."""
+        rank = fraction * self.total
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + [float("inf")], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self):
+        mean = self.sum_ms / self.total if self.total else 0
+        return (
+            f"calls={self.total} errors={self.errors} mean_ms={mean:.1f} "
+            f"p50_ms<={self.percentile(0.5)} p95_ms<={self.percentile(0.95)} "
+            f"p99_ms<={self.percentile(0.99)}"
+        )
+
+
+class MethodMetrics:
+    """Per-method latency histograms shared by the server's interceptors."""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method, elapsed_ms, failed):
+        with self._lock:
+            histogram = self.histograms.get(method)
+            if histogram is None:
+                histogram = self.histograms[method] = LatencyHistogram()
+            histogram.observe(elapsed_ms, failed)
+
+    def log_summary(self):
+        with self._lock:
+            for method, histogram in sorted(self.histograms.items()):
+                logger.info(f"gRPC {method} {histogram.summary()}")
+
+
+def _failed(context):
+    code = context.code()
+    return code is not None and code != grpc.StatusCode.OK
+
+
+class LatencyInterceptor(grpc.ServerInterceptor):
+    """Records the latency of every unary-response call on the sync server."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method
+
+        def timed(behavior):
+            def wrapper(request, context):
+                started = time.perf_counter()
+                failed = True
+                try:
+                    response = behavior(request, context)
+                    failed = _failed(context)
+                    return response
+                finally:
+                    self.metrics.observe(
+                        method, (time.perf_counter() - started) * 1000, failed
+                    )
+
+            return wrapper
+
+        if handler.unary_unary:
+            return handler._replace(unary_unary=timed(handler.unary_unary))
+        if handler.stream_unary:
+            return handler._replace(stream_unary=timed(handler.stream_unary))
+        return handler
+
+
+class AsyncLatencyInterceptor(grpc.aio.ServerInterceptor):
+    """Records the latency of every unary-response call on the aio server."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method
+
+        def timed(behavior):
+            if not inspect.iscoroutinefunction(behavior):
+                return behavior
+
+            async def wrapper(request, context):
+                started = time.perf_counter()
+                failed = True
+                try:
+                    response = await behavior(request, context)
+                    failed = _failed(context)
+                    return response
+                finally:
+                    self.metrics.observe(
+                        method, (time.perf_counter() - started) * 1000, failed
+                    )
+
+            return wrapper
+
+        if handler.unary_unary:
+            return handler._replace(unary_unary=timed(handler.unary_unary))
+        if handler.stream_unary:
+            return handler._replace(stream_unary=timed(handler.stream_unary))
+        return handler
+
+
+class DatabaseExecutor:
+    """
+    Runs blocking ORM work for the aio server on a fixed set of threads.
+
+    The pool size caps how many database connections the server opens,
+    independently of how many RPCs are in flight; calls beyond it wait
+    on the event loop instead of occupying a thread.
+    """
+
+    def __init__(self, max_workers):
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="grpc-db"
+        )
+
+    @staticmethod
+    def _call(func, args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._call, func, args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def serve_sync(register, service_names, port, options):
+    """Serve on a thread pool, one thread per in-flight RPC."""
+    metrics = MethodMetrics()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=settings.GRPC_SERVER_WORKERS),
+        interceptors=[LatencyInterceptor(metrics)],
+        options=options,
+        maximum_concurrent_rpcs=settings.GRPC_MAX_CONCURRENT_RPCS,
+    )
+    register(server)
+    health_servicer = health.HealthServicer()
+    health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+    for name in service_names:
+        health_servicer.set(name, health_pb2.HealthCheckResponse.SERVING)
+    server.add_insecure_port(f"[::]:{port}")
+
+    stopped = threading.Event()
+
+    def shutdown(signum, frame):
+        logger.info(f"Draining gRPC server for {settings.GRPC_SHUTDOWN_GRACE}s")
+        # Clients stop routing new calls here before the server stops
+        health_servicer.enter_graceful_shutdown()
+        server.stop(settings.GRPC_SHUTDOWN_GRACE).wait()
+        stopped.set()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    logger.info(
+        f"gRPC server (sync, {settings.GRPC_SERVER_WORKERS} workers) starting on port {port}"
+    )
+    server.start()
+    while not stopped.wait(settings.GRPC_METRICS_LOG_INTERVAL):
+        metrics.log_summary()
+    metrics.log_summary()
+
+
+async def _serve_aio(register, service_names, port, options):
+    metrics = MethodMetrics()
+    database = DatabaseExecutor(settings.GRPC_DB_POOL_SIZE)
+    server = grpc.aio.server(
+        interceptors=[AsyncLatencyInterceptor(metrics)],
+        options=options,
+        maximum_concurrent_rpcs=settings.GRPC_MAX_CONCURRENT_RPCS,
+    )
+    register(server, database)
+    health_servicer = health.aio.HealthServicer()
+    health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+    for name in service_names:
+        await health_servicer.set(name, health_pb2.HealthCheckResponse.SERVING)
+    server.add_insecure_port(f"[::]:{port}")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+
+    async def log_metrics():
+        while True:
+            await asyncio.sleep(settings.GRPC_METRICS_LOG_INTERVAL)
+            metrics.log_summary()
+
+    logger.info(
+        f"gRPC server (aio, {settings.GRPC_DB_POOL_SIZE} database threads) "
+        f"starting on port {port}"
+    )
+    await server.start()
+    reporter = asyncio.create_task(log_metrics())
+    await stopping.wait()
+
+    logger.info(f"Draining gRPC server for {settings.GRPC_SHUTDOWN_GRACE}s")
+    await health_servicer.enter_graceful_shutdown()
+    await server.stop(settings.GRPC_SHUTDOWN_GRACE)
+    reporter.cancel()
+    database.shutdown()
+    metrics.log_summary()
+
+
+def serve_aio(register, service_names, port, options):
+    """Serve on an asyncio event loop with ORM calls on a bounded thread pool."""
+    asyncio.run(_serve_aio(register, service_names, port, options))
@@ -1,6 +1,5 @@
 import django
 import grpc
-from concurrent import futures
 import logging
 
 # Get logger for the user app
@@ -9,61 +8,191 @@ logger = logging.getLogger("users")
 django.setup()
 
 from users.models import User
+from users.services import CreditService
 import protos.generated.user_service_pb2_grpc as user_service_pb2_grpc
 import protos.generated.user_service_pb2 as user_service_pb2
+from protos.runtime import serve_aio, serve_sync
 
-from django.db import connection
+from django.conf import settings
 
 
 class UserService(user_service_pb2_grpc.UserServiceServicer):
     def UpdateUserCredits(self, request, context):
-        with connection.cursor():
-            try:
-                logger.info(f"Updating credits for user {request.user_id}")
-                user = User.objects.get(id=request.user_id)
-                logger.debug(f"Current balance: {user.balance_credits}")
-
-                if request.refund_from_escrow:
-                    logger.info(
-                        f"Processing refund from escrow: {request.credits} credits"
-                    )
-                    user.balance_credits += request.credits
-                elif request.is_deduction:
-                    logger.info(
-                        f"Processing credit deduction: setting balance to {request.credits}"
-                    )
-                    user.balance_credits = request.credits
-                else:
-                    logger.info(f"Adding {request.credits} credits to balance")
-                    user.balance_credits += request.credits
-
-                user.save()
+        try:
+            logger.info(f"Updating credits for user {request.user_id}")
+
+            if request.refund_from_escrow:
+                logger.info(
+                    f"Processing refund from escrow: {request.credits} credits"
+                )
+                CreditService.adjust(
+                    request.user_id, request.credits, "escrow_refund"
+                )
+            elif request.is_deduction:
                 logger.info(
-                    f"Updated balance for user {request.user_id}: {user.balance_credits}"
+                    f"Processing credit deduction: setting balance to {request.credits}"
                 )
-                return user_service_pb2.UpdateUserCreditsResponse(success=True)
-
-            except User.DoesNotExist:
-                logger.warning(f"User not found: {request.user_id}")
-                context.set_details("User not found.")
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                return user_service_pb2.UpdateUserCreditsResponse(success=False)
-            except Exception as e:
-                logger.error(
-                    f"Error updating credits for user {request.user_id}: {str(e)}"
+                CreditService.set_balance(
+                    request.user_id, request.credits, "deduction"
                 )
-                context.set_details(f"An unexpected error occurred: {e}")
-                context.set_code(grpc.StatusCode.INTERNAL)
-                return user_service_pb2.UpdateUserCreditsResponse(success=False)
+            else:
+                logger.info(f"Adding {request.credits} credits to balance")
+                CreditService.adjust(request.user_id, request.credits, "credit")
+
+            return user_service_pb2.UpdateUserCreditsResponse(success=True)
+
+        except User.DoesNotExist:
+            logger.warning(f"User not found: {request.user_id}")
+            context.set_details("User not found.")
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            return user_service_pb2.UpdateUserCreditsResponse(success=False)
+        except ValueError as e:
+            logger.warning(
+                f"Rejected credit update for user {request.user_id}: {str(e)}"
+            )
+            return user_service_pb2.UpdateUserCreditsResponse(success=False)
+        except Exception as e:
+            logger.error(
+                f"Error updating credits for user {request.user_id}: {str(e)}"
+            )
+            context.set_details(f"An unexpected error occurred: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return user_service_pb2.UpdateUserCreditsResponse(success=False)
+
+    def AdjustUserCredits(self, request, context):
+        try:
+            logger.info(
+                f"Adjusting credits for user {request.user_id} by {request.amount:+d}"
+            )
+            entry, duplicate = CreditService.adjust(
+                request.user_id,
+                request.amount,
+                request.reason or "adjustment",
+                idempotency_key=request.idempotency_key,
+            )
+            return user_service_pb2.AdjustUserCreditsResponse(
+                success=True, balance=entry.balance_after, duplicate=duplicate
+            )
+
+        except User.DoesNotExist:
+            logger.warning(f"User not found: {request.user_id}")
+            context.set_details("User not found.")
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            return user_service_pb2.AdjustUserCreditsResponse(success=False)
+        except ValueError as e:
+            logger.warning(
+                f"Rejected credit adjustment for user {request.user_id}: {str(e)}"
+            )
+            return user_service_pb2.AdjustUserCreditsResponse(
+                success=False, error=str(e)
+            )
+        except Exception as e:
+            logger.error(
+                f"Error adjusting credits for user {request.user_id}: {str(e)}"
+            )
+            context.set_details(f"An unexpected error occurred: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return user_service_pb2.AdjustUserCreditsResponse(success=False)
+
+    def BatchUpdateUserCredits(self, request, context):
+        logger.info(f"Applying batch of {len(request.adjustments)} credit adjustments")
+        return self._apply_adjustments(request.adjustments, context)
+
+    def StreamUpdateUserCredits(self, request_iterator, context):
+        adjustments = list(request_iterator)
+        logger.info(f"Applying stream of {len(adjustments)} credit adjustments")
+        return self._apply_adjustments(adjustments, context)
+
+    def _apply_adjustments(self, adjustments, context):
+        try:
+            results = CreditService.apply_batch(
+                [
+                    {
+                        "user_id": adjustment.user_id,
+                        "credits": adjustment.credits,
+                        "is_deduction": adjustment.is_deduction,
+                        "idempotency_key": adjustment.idempotency_key,
+                        "reason": adjustment.reason,
+                    }
+                    for adjustment in adjustments
+                ]
+            )
+            return user_service_pb2.BatchUpdateUserCreditsResponse(
+                results=[
+                    user_service_pb2.CreditAdjustmentResult(**result)
+                    for result in results
+                ]
+            )
+        except Exception as e:
+            logger.error(f"Error applying credit adjustments: {str(e)}")
+            context.set_details(f"An unexpected error occurred: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            return user_service_pb2.BatchUpdateUserCreditsResponse()
+
+
+# Clients keep idle connections open with keepalive pings, accept them
+# instead of answering with GOAWAY
+SERVER_OPTIONS = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_recv_ping_interval_without_data_ms", 10000),
+    ("grpc.http2.max_ping_strikes", 0),
+]
+
+
+class AsyncUserService(user_service_pb2_grpc.UserServiceServicer):
+    """
+    Serves UserService on the aio server.
+
+    The handlers of UserService are plain ORM code, they run unchanged on
+    the database executor while the event loop keeps accepting calls.
+    """
+
+    def __init__(self, database):
+        self.service = UserService()
+        self.database = database
+
+    async def UpdateUserCredits(self, request, context):
+        return await self.database.run(self.service.UpdateUserCredits, request, context)
+
+    async def AdjustUserCredits(self, request, context):
+        return await self.database.run(self.service.AdjustUserCredits, request, context)
+
+    async def BatchUpdateUserCredits(self, request, context):
+        return await self.database.run(
+            self.service.BatchUpdateUserCredits, request, context
+        )
+
+    async def StreamUpdateUserCredits(self, request_iterator, context):
+        # The stream is read on the event loop, not from a database thread
+        adjustments = [adjustment async for adjustment in request_iterator]
+        return await self.database.run(
+            self.service.StreamUpdateUserCredits, iter(adjustments), context
+        )
+
+
+# Clients only route calls to servers reporting SERVING
+HEALTH_SERVICES = ["user_service.UserService"]
 
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    user_service_pb2_grpc.add_UserServiceServicer_to_server(UserService(), server)
-    server.add_insecure_port("[::]:50051")
-    logger.info("User service gRPC server starting on port 50051")
-    server.start()
-    server.wait_for_termination()
+    if settings.GRPC_SERVER_MODE == "sync":
+        serve_sync(
+            lambda server: user_service_pb2_grpc.add_UserServiceServicer_to_server(
+                UserService(), server
+            ),
+            HEALTH_SERVICES,
+            settings.GRPC_PORT,
+            SERVER_OPTIONS,
+        )
+    else:
+        serve_aio(
+            lambda server, database: user_service_pb2_grpc.add_UserServiceServicer_to_server(
+                AsyncUserService(database), server
+            ),
+            HEALTH_SERVICES,
+            settings.GRPC_PORT,
+            SERVER_OPTIONS,
+        )
 
 
 if __name__ == "__main__":
@@ -91,6 +91,9 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'), 
         'PORT': os.getenv('DB_PORT'),
+        # Kept open so the gRPC database threads reuse their connections
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
  
@@ -146,6 +149,20 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 
+# Session notification consumer, see users/consumer.py
+NOTIFICATION_PREFETCH_COUNT = int(os.getenv('NOTIFICATION_PREFETCH_COUNT', 50))
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', 10))
+NOTIFICATION_BATCH_WAIT = float(os.getenv('NOTIFICATION_BATCH_WAIT', 0.5))
+NOTIFICATION_WORKERS = int(os.getenv('NOTIFICATION_WORKERS', 4))
+# How long a sent notification id is remembered to drop duplicates
+NOTIFICATION_DEDUP_TTL = int(os.getenv('NOTIFICATION_DEDUP_TTL', 86400))
+
+# User summaries shared with the other services, see UserSummaryService
+USER_SUMMARY_REDIS_URL = os.getenv('USER_SUMMARY_REDIS_URL', 'redis://redis:6379/5')
+USER_SUMMARY_REDIS_TIMEOUT = float(os.getenv('USER_SUMMARY_REDIS_TIMEOUT', 0.5))
+USER_SUMMARY_TTL = int(os.getenv('USER_SUMMARY_TTL', 60))
+USER_SUMMARY_MAX_IDS = int(os.getenv('USER_SUMMARY_MAX_IDS', 100))
+
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
@@ -198,8 +215,34 @@ AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
 AWS_STORAGE_BUCKET_NAME = os.getenv('AWS_STORAGE_BUCKET_NAME')
 AWS_S3_REGION_NAME = os.getenv('AWS_S3_REGION_NAME')
+AWS_S3_ENDPOINT_URL = os.getenv('AWS_S3_ENDPOINT_URL')  # Set for a local S3 such as MinIO
 AWS_DEFAULT_ACL = None
 
+# Direct-to-S3 intro video uploads
+VIDEO_UPLOAD_PART_SIZE = int(os.getenv('VIDEO_UPLOAD_PART_SIZE', 8 * 1024 * 1024))
+VIDEO_UPLOAD_MAX_SIZE = int(os.getenv('VIDEO_UPLOAD_MAX_SIZE', 100 * 1024 * 1024))
+VIDEO_UPLOAD_URL_EXPIRY = int(os.getenv('VIDEO_UPLOAD_URL_EXPIRY', 3600))
+
+# gRPC Server
+# aio serves every call on one event loop and runs the ORM work on a pool of
+# GRPC_DB_POOL_SIZE threads; sync is the thread-per-call server
+GRPC_SERVER_MODE = os.getenv('GRPC_SERVER_MODE', 'aio')
+GRPC_PORT = int(os.getenv('GRPC_PORT', 50051))
+GRPC_MAX_CONCURRENT_RPCS = int(os.getenv('GRPC_MAX_CONCURRENT_RPCS', 1000))
+GRPC_SERVER_WORKERS = int(os.getenv('GRPC_SERVER_WORKERS', 10))
+GRPC_DB_POOL_SIZE = int(os.getenv('GRPC_DB_POOL_SIZE', 10))
+GRPC_SHUTDOWN_GRACE = float(os.getenv('GRPC_SHUTDOWN_GRACE', 15))
+GRPC_METRICS_LOG_INTERVAL = float(os.getenv('GRPC_METRICS_LOG_INTERVAL', 60))
+
+# Process launcher, see `manage.py serve`
+SERVE_BIND = os.getenv('SERVE_BIND', '0.0.0.0:8000')
+SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 2 * (os.cpu_count() or 1) + 1))
+SERVE_THREADS = int(os.getenv('SERVE_THREADS', 4))
+SERVE_KEEPALIVE = int(os.getenv('SERVE_KEEPALIVE', 5))
+SERVE_TIMEOUT = int(os.getenv('SERVE_TIMEOUT', 30))
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30))
+SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', 10000))
+
 # Storage and Media Configuration
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
@@ -1,6 +1,19 @@
 from django.contrib import admin
-from .models import User
+from .models import CreditLedger, User
 
 # Register your models here.
 
-admin.site.register(User)
\ No newline at end of file
+admin.site.register(User)
+
+
+@admin.register(CreditLedger)
+class CreditLedgerAdmin(admin.ModelAdmin):
+    list_display = ["user", "amount", "balance_after", "reason", "created_at"]
+    search_fields = ["idempotency_key"]
+
+    # The ledger is append-only
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -2,8 +2,10 @@ import os
 import django
 import pika
 import json
+import signal
 import time
-from datetime import datetime
+from concurrent import futures
+from functools import partial
 from typing import Dict, Any
 from enum import Enum
 import logging
@@ -20,17 +22,40 @@ class NotificationType(Enum):
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "user_service.settings")
 django.setup()
 
+from django.conf import settings
+from django.core.cache import cache
 from users.services import EmailService
 
 
 class SessionNotificationConsumer:
+    """
+    Consumes session notifications and emails them in batches.
+
+    Up to NOTIFICATION_PREFETCH_COUNT messages are in flight. They are
+    grouped into batches of NOTIFICATION_BATCH_SIZE (or whatever arrived
+    within NOTIFICATION_BATCH_WAIT seconds), and each batch is sent over a
+    single SMTP connection by one of NOTIFICATION_WORKERS threads. A message
+    is acked only after its emails were sent. A failed message is requeued
+    once and then moved to the failed_notifications queue. A message whose
+    id was already sent (the session outbox may publish one twice) is
+    acked without sending it again.
+    """
+
     def __init__(self):
-        self.email_service = EmailService()
         logger.info("Initializing SessionNotificationConsumer")
+        self.workers = futures.ThreadPoolExecutor(
+            max_workers=settings.NOTIFICATION_WORKERS,
+            thread_name_prefix="notification",
+        )
+        self.stopping = False
+        self.connection = None
+        self.channel = None
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
         self.connect()
 
     def connect(self):
-        while True:
+        while not self.stopping:
             try:
                 logger.info("Attempting to connect to RabbitMQ")
                 credentials = pika.PlainCredentials(
@@ -56,75 +81,164 @@ class SessionNotificationConsumer:
                 )
 
                 self.channel.queue_declare(queue="session_notifications", durable=True)
-                self.channel.basic_qos(prefetch_count=1)
-                self.email_service = EmailService()
+                self.channel.basic_qos(
+                    prefetch_count=settings.NOTIFICATION_PREFETCH_COUNT
+                )
                 logger.info("Successfully connected to RabbitMQ")
                 break
             except Exception as e:
                 logger.error(f"Failed to connect to RabbitMQ: {str(e)}")
                 time.sleep(5)
 
-    def process_booking_notification(self, data: Dict[str, Any]) -> None:
-        """Handle booking notifications"""
+    def build_emails(self, message: Dict[str, Any]) -> list:
+        """Emails to send for one notification message"""
+        if message["type"] == NotificationType.CANCELLATION.value:
+            return EmailService.cancellation_notification_emails(message["data"])
+        if message["type"] == NotificationType.BOOKING.value:
+            return EmailService.booking_notification_emails(
+                message["data"]["booking_data"], message["data"]["tutor_data"]
+            )
+        raise ValueError(f"Unknown notification type: {message['type']}")
+
+    def deliver(self, channel, batch):
+        """Send a batch of deliveries, runs on a worker thread"""
+        errors = [None] * len(batch)
+        groups = []
+        sendable = []
+        message_ids = {}
+        for index, (method, properties, body) in enumerate(batch):
+            try:
+                message = json.loads(body)
+                if self.already_sent(message.get("id")):
+                    logger.info(f"Skipping duplicate notification {message['id']}")
+                    continue
+                groups.append(self.build_emails(message))
+                sendable.append(index)
+                message_ids[index] = message.get("id")
+            except Exception as e:
+                logger.error(f"Invalid notification message: {str(e)}")
+                errors[index] = e
+
+        started = time.monotonic()
+        for index, error in zip(sendable, EmailService.send_email_groups(groups)):
+            errors[index] = error
+            if error is None:
+                self.mark_sent(message_ids[index])
         logger.info(
-            f"Processing booking notification for booking {data.get('booking_data', {}).get('id')}"
-        )
-        self.email_service.send_booking_notification_email(
-            data["booking_data"], data["tutor_data"]
+            f"Sent {len(groups)} notifications in {time.monotonic() - started:.2f}s, "
+            f"{sum(error is not None for error in errors)} failed"
         )
-        logger.debug("Booking notification email sent successfully")
 
-    def process_cancellation_notification(self, data: Dict[str, Any]) -> None:
-        """Handle cancellation notifications"""
-        logger.info(
-            f"Processing cancellation notification for session with student {data.get('student_name')}"
-        )
-        self.email_service.send_cancellation_notification_email(
-            cancelled_by=data["cancelled_by"],
-            student_name=data["student_name"],
-            student_email=data["student_email"],
-            tutor_name=data["tutor_name"],
-            tutor_email=data["tutor_email"],
-            session_type=data["session_type"],
-            start_time=datetime.fromisoformat(data["start_time"]),
-            language=data["language"],
-            credits_required=data["credits_required"],
-        )
-        logger.debug("Cancellation notification email sent successfully")
+        # pika connections are not thread safe, the acks go out on the
+        # connection's own thread
+        try:
+            self.connection.add_callback_threadsafe(
+                partial(self.settle, channel, batch, errors)
+            )
+        except Exception as e:
+            # The deliveries are redelivered once the broker notices
+            logger.error(f"Could not settle batch, connection closed: {str(e)}")
 
-    def callback(self, ch, method, properties, body):
+    def already_sent(self, message_id):
+        if message_id is None:
+            return False
         try:
-            message = json.loads(body)
-            logger.info(f"Received message of type: {message.get('type')}")
-
-            if message["type"] == NotificationType.CANCELLATION.value:
-                self.email_service.send_cancellation_notification_email(message["data"])
-            elif message["type"] == NotificationType.BOOKING.value:
-                self.email_service.send_booking_notification_email(
-                    message["data"]["booking_data"], message["data"]["tutor_data"]
+            return cache.get(f"notification_sent:{message_id}") is not None
+        except Exception as e:
+            # Better a rare duplicate email than a lost one
+            logger.warning(f"Could not check notification {message_id}: {str(e)}")
+            return False
+
+    def mark_sent(self, message_id):
+        if message_id is None:
+            return
+        try:
+            cache.set(
+                f"notification_sent:{message_id}",
+                1,
+                timeout=settings.NOTIFICATION_DEDUP_TTL,
+            )
+        except Exception as e:
+            logger.warning(f"Could not mark notification {message_id} sent: {str(e)}")
+
+    def settle(self, channel, batch, errors):
+        if not channel.is_open:
+            logger.warning("Channel closed before the batch was settled")
+            return
+
+        for (method, properties, body), error in zip(batch, errors):
+            if error is None:
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+            elif not method.redelivered:
+                # Retry once before giving up on the message
+                channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            else:
+                logger.error(
+                    f"Moving notification to failed_notifications: {str(error)}"
                 )
+                channel.basic_publish(
+                    exchange="dlx",
+                    routing_key="failed_notifications",
+                    body=body,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,
+                        content_type="application/json",
+                        headers={"x-error": str(error)},
+                    ),
+                )
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+
+    def consume_batches(self):
+        batch = []
+        batch_started = None
+        for method, properties, body in self.channel.consume(
+            queue="session_notifications",
+            inactivity_timeout=settings.NOTIFICATION_BATCH_WAIT,
+        ):
+            if method is not None:
+                batch.append((method, properties, body))
+                batch_started = batch_started or time.monotonic()
+
+            if batch and (
+                self.stopping
+                or len(batch) >= settings.NOTIFICATION_BATCH_SIZE
+                or time.monotonic() - batch_started >= settings.NOTIFICATION_BATCH_WAIT
+            ):
+                logger.debug(f"Dispatching batch of {len(batch)} notifications")
+                self.workers.submit(self.deliver, self.channel, batch)
+                batch = []
+                batch_started = None
+
+            if self.stopping:
+                break
+
+    def stop(self, signum, frame):
+        logger.info("Stopping notification consumer")
+        self.stopping = True
 
-            ch.basic_ack(delivery_tag=method.delivery_tag)
-            logger.debug("Message processed and acknowledged")
+    def shutdown(self):
+        # Let the in-flight batches finish, then send their acks
+        try:
+            if self.channel is not None and self.channel.is_open:
+                self.channel.cancel()
+            self.workers.shutdown(wait=True)
+            if self.connection is not None and self.connection.is_open:
+                self.connection.process_data_events(time_limit=0)
+                self.connection.close()
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
-            # Reject the message and requeue if it's not been redelivered
-            ch.basic_reject(
-                delivery_tag=method.delivery_tag, requeue=not method.redelivered
-            )
+            logger.warning(f"Error while stopping notification consumer: {str(e)}")
+        logger.info("Notification consumer stopped")
 
     def start_consuming(self):
-        while True:
+        while not self.stopping:
             try:
                 logger.info("Starting to consume session notifications...")
-                self.channel.basic_consume(
-                    queue="session_notifications", on_message_callback=self.callback
-                )
-                self.channel.start_consuming()
+                self.consume_batches()
             except Exception as e:
                 logger.error(f"Consumer connection lost: {str(e)}")
                 time.sleep(5)
                 self.connect()
+        self.shutdown()
 
 
 if __name__ == "__main__":
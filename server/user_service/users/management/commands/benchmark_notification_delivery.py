@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from concurrent import futures
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+from users.services import EmailService
+from users.utils import build_email_message
+
+
+class FakeSMTPServer:
+    """
+    Minimal SMTP server on a background thread that accepts every message.
+    Each reply is delayed by latency seconds to stand in for the network
+    round trip to a real mail server.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.received = 0
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.ready.wait()
+        return self.port
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle, "127.0.0.1", 0)
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+
+        async def reply(line):
+            await asyncio.sleep(self.latency)
+            writer.write(line)
+            await writer.drain()
+
+        await reply(b"220 fake-smtp ESMTP\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line[:4].upper()
+            if command == b"EHLO":
+                await reply(b"250-fake-smtp\r\n250 8BITMIME\r\n")
+            elif command == b"DATA":
+                await reply(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                while await reader.readline() not in (b".\r\n", b""):
+                    pass
+                self.received += 1
+                await reply(b"250 OK\r\n")
+            elif command == b"QUIT":
+                await reply(b"221 Bye\r\n")
+                break
+            else:
+                await reply(b"250 OK\r\n")
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures notification email throughput against a local fake SMTP "
+        "server: one connection per email (the Celery send_email_task path) "
+        "versus the consumer's batched delivery over shared connections"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notifications", type=int, default=200)
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=10,
+            help="Delay before every SMTP reply, simulating the network round trip",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.NOTIFICATION_BATCH_SIZE
+        )
+        parser.add_argument("--workers", type=int, default=settings.NOTIFICATION_WORKERS)
+
+    def handle(self, *args, **options):
+        groups = [
+            EmailService.booking_notification_emails(*self.fake_booking(number))
+            for number in range(options["notifications"])
+        ]
+        emails = sum(len(group) for group in groups)
+
+        self.stdout.write(
+            f"{len(groups)} booking notifications ({emails} emails), "
+            f"{options['latency_ms']:g}ms per SMTP reply"
+        )
+        self.stdout.write(f"{'':<32}{'seconds':>10}{'emails/s':>10}{'connections':>13}")
+
+        self.run(
+            "connection per email",
+            options,
+            lambda: [build_email_message(*email).send() for group in groups for email in group],
+        )
+        self.run(
+            f"batches of {options['batch_size']}, {options['workers']} workers",
+            options,
+            lambda: self.send_batched(groups, options["batch_size"], options["workers"]),
+        )
+
+    def run(self, label, options, send):
+        server = FakeSMTPServer(options["latency_ms"] / 1000)
+        port = server.start()
+        try:
+            with override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST="127.0.0.1",
+                EMAIL_PORT=port,
+                EMAIL_USE_TLS=False,
+                EMAIL_USE_SSL=False,
+                EMAIL_HOST_USER="",
+                EMAIL_HOST_PASSWORD="",
+                DEFAULT_FROM_EMAIL="noreply@speakin.local",
+            ):
+                started = time.perf_counter()
+                send()
+                elapsed = time.perf_counter() - started
+        finally:
+            server.stop()
+
+        self.stdout.write(
+            f"{label:<32}{elapsed:>10.2f}{server.received / elapsed:>10.0f}"
+            f"{server.connections:>13}"
+        )
+
+    def send_batched(self, groups, batch_size, workers):
+        batches = [groups[i : i + batch_size] for i in range(0, len(groups), batch_size)]
+        with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            for errors in pool.map(EmailService.send_email_groups, batches):
+                failed = [error for error in errors if error is not None]
+                if failed:
+                    raise failed[0]
+
+    def fake_booking(self, number):
+        start_time = timezone.now() + timedelta(days=1, hours=number % 24)
+        booking_data = {
+            "session_type": "standard",
+            "start_time": start_time.isoformat(),
+            "end_time": (start_time + timedelta(hours=1)).isoformat(),
+            "language": "English",
+            "student_name": f"Student {number}",
+            "student_email": f"student{number}@example.com",
+        }
+        tutor_data = {"name": f"Tutor {number}", "email": f"tutor{number}@example.com"}
+        return booking_data, tutor_data
@@ -0,0 +1,121 @@
+import http.client
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent import futures
+from django.core.management.base import BaseCommand, CommandError
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_listening(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server on port {port} did not start")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures HTTP requests/sec of the web app under `manage.py runserver` "
+        "and under `manage.py serve`, using the current settings and database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/platform-languages/")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--duration", type=float, default=10)
+        parser.add_argument(
+            "--serve-args",
+            default="",
+            help="Extra arguments for serve, for example '--workers 4 --threads 8'",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"GET {options['path']}, {options['concurrency']} keep-alive clients "
+            f"for {options['duration']:g}s"
+        )
+        self.stdout.write(
+            f"{'':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+        )
+
+        for label, command in [
+            ("runserver", ["runserver", "--noreload"]),
+            ("serve", ["serve", "--only", "web", *options["serve_args"].split()]),
+        ]:
+            port = free_port()
+            if label == "runserver":
+                command.append(f"127.0.0.1:{port}")
+            else:
+                command += ["--bind", f"127.0.0.1:{port}"]
+
+            server = subprocess.Popen(
+                [sys.executable, "manage.py", *command, "--skip-checks"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_until_listening(port)
+                result = self.run_load(port, options)
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+
+            self.stdout.write(
+                f"{label:<12}{result['requests']:>10}{result['errors']:>8}"
+                f"{result['rps']:>10.0f}{result['p50']:>10.2f}{result['p99']:>10.2f}"
+            )
+
+    def run_load(self, port, options):
+        deadline = time.monotonic() + options["duration"]
+
+        def client(_):
+            latencies = []
+            errors = 0
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", options["path"])
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 500:
+                        errors += 1
+                        continue
+                    if response.getheader("Connection", "").lower() == "close":
+                        connection.close()
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    connection.close()
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+            connection.close()
+            return latencies, errors
+
+        started = time.monotonic()
+        with futures.ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(pool.map(client, range(options["concurrency"])))
+        elapsed = time.monotonic() - started
+
+        latencies = sorted(latency for result in results for latency in result[0])
+        errors = sum(result[1] for result in results)
+        if not latencies:
+            return {"requests": 0, "errors": errors, "rps": 0, "p50": 0, "p99": 0}
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": len(latencies) / elapsed,
+            "p50": statistics.median(latencies),
+            "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        }
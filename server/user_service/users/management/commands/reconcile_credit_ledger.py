@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from users.models import CreditLedger, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares every user's balance with the sum of their credit ledger "
+        "entries and, with --apply, records the difference as an opening "
+        "balance entry (used once to backfill existing balances)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Record the differences in the ledger instead of only reporting them",
+        )
+
+    def handle(self, *args, **options):
+        ledger_totals = dict(
+            CreditLedger.objects.values("user_id")
+            .annotate(total=Sum("amount"))
+            .values_list("user_id", "total")
+        )
+
+        mismatched = 0
+        with transaction.atomic():
+            for user_id, balance in (
+                User.objects.select_for_update()
+                .order_by("id")
+                .values_list("id", "balance_credits")
+            ):
+                difference = balance - ledger_totals.get(user_id, 0)
+                if not difference:
+                    continue
+
+                mismatched += 1
+                self.stdout.write(
+                    f"User {user_id}: balance {balance}, ledger differs by {difference:+d}"
+                )
+                if options["apply"]:
+                    CreditLedger.objects.create(
+                        user_id=user_id,
+                        amount=difference,
+                        balance_after=balance,
+                        reason="opening_balance",
+                    )
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS("Credit ledger matches every balance"))
+        elif options["apply"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Recorded opening balances for {mismatched} users")
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{mismatched} users differ, run with --apply to record them"
+                )
+            )
@@ -0,0 +1,50 @@
+import os
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from user_service.supervisor import ManagedProcess, gunicorn_args, supervise
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the user service: the web app under gunicorn's pre-forking "
+        "workers, the gRPC server and the session notification consumer, "
+        "each supervised as its own process"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=settings.SERVE_BIND)
+        parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS)
+        parser.add_argument("--threads", type=int, default=settings.SERVE_THREADS)
+        parser.add_argument("--keepalive", type=int, default=settings.SERVE_KEEPALIVE)
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=["web", "grpc", "consumer"],
+            help="Run only the named process, may be repeated",
+        )
+
+    def handle(self, *args, **options):
+        # Every child drains on SIGTERM: gunicorn finishes in-flight requests,
+        # the gRPC server reports NOT_SERVING and waits for its calls and
+        # the consumer acks its last batches
+        processes = [
+            ManagedProcess(
+                "web",
+                gunicorn_args(
+                    "user_service.wsgi:application",
+                    options,
+                    "gthread",
+                    threads=options["threads"],
+                ),
+            ),
+            ManagedProcess(
+                "grpc", [sys.executable, os.path.join("protos", "server.py")]
+            ),
+            ManagedProcess(
+                "consumer", [sys.executable, os.path.join("users", "consumer.py")]
+            ),
+        ]
+        if options["only"]:
+            processes = [p for p in processes if p.name in options["only"]]
+        supervise(processes)
@@ -60,10 +60,53 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(balance_credits__gte=0),
+                name="user_balance_credits_non_negative",
+            )
+        ]
+
     def __str__(self):
         return self.email
 
 
+class CreditLedger(models.Model):
+    """
+    Append-only history of every change to a user's credits.
+
+    User.balance_credits is the materialized sum of a user's entries and is
+    updated in the same transaction as each insert. A repeated idempotency
+    key returns the original entry instead of applying the change again.
+    """
+
+    user = models.ForeignKey(
+        User, related_name="credit_ledger", on_delete=models.CASCADE
+    )
+    amount = models.IntegerField()
+    balance_after = models.IntegerField()
+    reason = models.CharField(max_length=50)
+    idempotency_key = models.CharField(
+        max_length=100, unique=True, blank=True, null=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "created_at"])]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Credit ledger entries cannot be modified.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Credit ledger entries cannot be deleted.")
+
+    def __str__(self):
+        return f"{self.user_id}: {self.amount:+d} ({self.reason})"
+
+
 class Language(models.Model):
     name = models.CharField(max_length=100, unique=True)
 
@@ -108,6 +108,9 @@ class UserSerializer(serializers.ModelSerializer):
             "password",
             "language_to_learn",
         ]
+        # Credits only change through CreditService, which records them in
+        # the ledger
+        read_only_fields = ["balance_credits"]
         extra_kwargs = {"password": {"write_only": True}}
 
     def create(self, validated_data):
@@ -144,6 +147,39 @@ class UserSerializer(serializers.ModelSerializer):
         return representation
 
 
+class UserSummarySerializer(serializers.ModelSerializer):
+    """What other services read about a user, see UserSummaryService"""
+
+    tutor_details = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            "id",
+            "name",
+            "email",
+            "user_type",
+            "country",
+            "profile_image",
+            "balance_credits",
+            "is_active",
+            "tutor_details",
+        ]
+
+    def get_tutor_details(self, obj):
+        if obj.user_type != "tutor":
+            return None
+        try:
+            details = obj.tutor_details
+        except TutorDetails.DoesNotExist:
+            return None
+        return {
+            "speakin_name": details.speakin_name,
+            "required_credits": details.required_credits,
+            "status": details.status,
+        }
+
+
 class ChangePasswordSerializer(serializers.Serializer):
     current_password = serializers.CharField(required=True)
     new_password = serializers.CharField(required=True, validators=[validate_password])
@@ -197,7 +233,7 @@ class TeachingLanguageChangeRequestSerializer(serializers.ModelSerializer):
             "tutor_language_to_teach",
             "profile_image",
         ]
-        read_only_fields = ["status"]
+        read_only_fields = ["status", "intro_video"]
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
@@ -207,6 +243,10 @@ class TeachingLanguageChangeRequestSerializer(serializers.ModelSerializer):
         return representation
 
     def to_internal_value(self, data):
+        # DRF hands over an immutable QueryDict when the request has no files
+        if not getattr(data, "_mutable", True):
+            data = data.copy()
+
         # Handle new_language field as a string (language name) and convert it to the corresponding language ID
         new_language_name = data.get("new_language")
         if new_language_name:
@@ -8,9 +8,37 @@ from .utils import (
     format_email_context,
     get_email_template_path,
     create_google_calendar_link,
+    build_email_message,
 )
+import json
+import math
+import threading
 import uuid
+import logging
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
 from django.utils.dateparse import parse_datetime
+from django.utils.text import get_valid_filename
+from redis.exceptions import RedisError
+from storages.utils import safe_join
+from .models import CreditLedger, TeachingLanguageChangeRequest, TutorDetails, User
+from .serializers import UserSummarySerializer
+
+# Get logger for the user app
+logger = logging.getLogger("users")
+
+# S3 allows at most 10,000 parts and at least 5MB for every part but the last
+S3_MAX_PARTS = 10000
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+VIDEO_UPLOAD_MODELS = {
+    "TutorDetails": TutorDetails,
+    "TeachingLanguageChangeRequest": TeachingLanguageChangeRequest,
+}
 
 
 class EmailService:
@@ -160,7 +188,8 @@ class EmailService:
         )
 
     @staticmethod
-    def send_booking_notification_email(booking_data, tutor_data):
+    def booking_notification_emails(booking_data, tutor_data):
+        """(subject, recipient, template, context) of the emails for a new booking"""
         start_time = parse_datetime(booking_data["start_time"])
         end_time = parse_datetime(booking_data["end_time"])
 
@@ -185,13 +214,6 @@ class EmailService:
             }
         )
 
-        send_email_task.delay(
-            "New Session Booking",
-            tutor_data["email"],
-            get_email_template_path("tutor_booking_notification"),
-            tutor_context,
-        )
-
         # Prepare calendar event data for student
         student_event_data = {
             "session_type": booking_data["session_type"],
@@ -201,7 +223,6 @@ class EmailService:
             "end_time": end_time,
         }
 
-        # Send email to student
         student_context = {
             "student_name": booking_data["student_name"],
             "tutor_name": tutor_data["name"],
@@ -212,16 +233,29 @@ class EmailService:
             "calendar_event": create_google_calendar_link(student_event_data),
         }
 
-        send_email_task.delay(
-            "Booking Confirmation",
-            booking_data["student_email"],
-            get_email_template_path("student_booking_notification"),
-            student_context,
-        )
+        return [
+            (
+                "New Session Booking",
+                tutor_data["email"],
+                get_email_template_path("tutor_booking_notification"),
+                tutor_context,
+            ),
+            (
+                "Booking Confirmation",
+                booking_data["student_email"],
+                get_email_template_path("student_booking_notification"),
+                student_context,
+            ),
+        ]
 
     @staticmethod
-    def send_cancellation_notification_email(data: dict) -> None:
-        """Handle cancellation notification emails"""
+    def send_booking_notification_email(booking_data, tutor_data):
+        for email in EmailService.booking_notification_emails(booking_data, tutor_data):
+            send_email_task.delay(*email)
+
+    @staticmethod
+    def cancellation_notification_emails(data: dict) -> list:
+        """(subject, recipient, template, context) of the emails for a cancellation"""
         start_time = parse_datetime(data["start_time"])
 
         if data["cancelled_by"] == "tutor":
@@ -237,30 +271,70 @@ class EmailService:
                 }
             )
 
-            send_email_task.delay(
-                "Session Cancelled by Tutor",
-                data["student_email"],
-                get_email_template_path("tutor_cancellation_notification"),
-                context,
-            )
-        else:
-            # Send to tutor
-            context = format_email_context(
-                {
-                    "tutor_name": data["tutor_name"],
-                    "student_name": data["student_name"],
-                    "session_type": data["session_type"],
-                    "start_time": start_time,
-                    "language": data["language"],
-                }
-            )
+            return [
+                (
+                    "Session Cancelled by Tutor",
+                    data["student_email"],
+                    get_email_template_path("tutor_cancellation_notification"),
+                    context,
+                )
+            ]
+
+        # Send to tutor
+        context = format_email_context(
+            {
+                "tutor_name": data["tutor_name"],
+                "student_name": data["student_name"],
+                "session_type": data["session_type"],
+                "start_time": start_time,
+                "language": data["language"],
+            }
+        )
 
-            send_email_task.delay(
+        return [
+            (
                 "Session Cancelled by Student",
                 data["tutor_email"],
                 get_email_template_path("student_cancellation_notification"),
                 context,
             )
+        ]
+
+    @staticmethod
+    def send_cancellation_notification_email(data: dict) -> None:
+        """Handle cancellation notification emails"""
+        for email in EmailService.cancellation_notification_emails(data):
+            send_email_task.delay(*email)
+
+    @staticmethod
+    def send_email_groups(groups):
+        """
+        Send groups of (subject, recipient, template, context) emails over one
+        SMTP connection. A group only counts as sent if all of its emails went
+        out. Returns one error, or None, per group.
+        """
+        errors = []
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for group in groups:
+                try:
+                    connection.send_messages(
+                        [build_email_message(*email) for email in group]
+                    )
+                    errors.append(None)
+                except Exception as e:
+                    logger.error(f"Failed to send notification email: {str(e)}")
+                    errors.append(e)
+                    # The rest of the batch goes out on a fresh connection
+                    connection.close()
+                    connection.open()
+        except Exception as e:
+            logger.error(f"SMTP connection failed: {str(e)}")
+            errors.extend([e] * (len(groups) - len(errors)))
+        finally:
+            connection.close()
+        return errors
 
     @staticmethod
     def send_account_suspension_email(user):
@@ -287,3 +361,429 @@ class EmailService:
             template,
             context,
         )
+
+
+class VideoUploadService:
+    """
+    Presigned S3 multipart uploads for tutor intro videos.
+
+    The client uploads the parts straight to S3, so the video never passes
+    through the gateway, this service or the Celery broker. Once every part is
+    uploaded the client completes the upload here and the object key is
+    attached to the instance the upload was started for.
+    """
+
+    @staticmethod
+    def _get_storage(model_name):
+        return VIDEO_UPLOAD_MODELS[model_name]._meta.get_field("intro_video").storage
+
+    @staticmethod
+    def _cache_key(upload_token):
+        return f"video_upload_{upload_token}"
+
+    @staticmethod
+    def start_upload(model_name, instance_id, file_name, content_type, size):
+        """Create the multipart upload and presign a URL for each part"""
+        if not content_type or not content_type.startswith("video/"):
+            raise ValueError("Please upload a valid video file.")
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid video size.")
+        if size <= 0 or size > settings.VIDEO_UPLOAD_MAX_SIZE:
+            raise ValueError(
+                f"Video size should be less than "
+                f"{settings.VIDEO_UPLOAD_MAX_SIZE // (1024 * 1024)}MB."
+            )
+
+        part_size = max(
+            settings.VIDEO_UPLOAD_PART_SIZE,
+            S3_MIN_PART_SIZE,
+            math.ceil(size / S3_MAX_PARTS),
+        )
+        part_count = math.ceil(size / part_size)
+
+        storage = VideoUploadService._get_storage(model_name)
+        client = storage.connection.meta.client
+        name = (
+            f"tutor_intro_videos/{instance_id}_{uuid.uuid4().hex[:8]}_"
+            f"{get_valid_filename(file_name or 'video')}"
+        )
+        key = safe_join(storage.location, name)
+
+        upload = client.create_multipart_upload(
+            Bucket=storage.bucket_name, Key=key, ContentType=content_type
+        )
+        upload_id = upload["UploadId"]
+        parts = [
+            {
+                "part_number": part_number,
+                "url": client.generate_presigned_url(
+                    "upload_part",
+                    Params={
+                        "Bucket": storage.bucket_name,
+                        "Key": key,
+                        "UploadId": upload_id,
+                        "PartNumber": part_number,
+                    },
+                    ExpiresIn=settings.VIDEO_UPLOAD_URL_EXPIRY,
+                ),
+            }
+            for part_number in range(1, part_count + 1)
+        ]
+
+        upload_token = str(uuid.uuid4())
+        cache.set(
+            VideoUploadService._cache_key(upload_token),
+            {
+                "model_name": model_name,
+                "instance_id": instance_id,
+                "name": name,
+                "key": key,
+                "upload_id": upload_id,
+                "part_count": part_count,
+                "size": size,
+            },
+            # Leave time to complete after the last part URL expires
+            timeout=settings.VIDEO_UPLOAD_URL_EXPIRY * 2,
+        )
+        logger.info(
+            f"Started video upload {upload_token} for {model_name} {instance_id} "
+            f"({part_count} parts of {part_size} bytes)"
+        )
+
+        return {
+            "upload_token": upload_token,
+            "part_size": part_size,
+            "parts": parts,
+        }
+
+    @staticmethod
+    def complete_upload(upload_token):
+        """
+        Assemble the uploaded parts and attach the video to its instance.
+        Returns False if the upload is unknown or has expired.
+        """
+        upload = cache.get(VideoUploadService._cache_key(upload_token))
+        if not upload:
+            return False
+
+        storage = VideoUploadService._get_storage(upload["model_name"])
+        client = storage.connection.meta.client
+
+        # The part list comes from S3 rather than the client
+        parts = []
+        paginator = client.get_paginator("list_parts")
+        for page in paginator.paginate(
+            Bucket=storage.bucket_name, Key=upload["key"], UploadId=upload["upload_id"]
+        ):
+            parts.extend(page.get("Parts", []))
+
+        uploaded_size = sum(part["Size"] for part in parts)
+        if len(parts) != upload["part_count"] or uploaded_size != upload["size"]:
+            raise ValueError("Video upload is incomplete. Please upload every part.")
+
+        client.complete_multipart_upload(
+            Bucket=storage.bucket_name,
+            Key=upload["key"],
+            UploadId=upload["upload_id"],
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": part["PartNumber"], "ETag": part["ETag"]}
+                    for part in parts
+                ]
+            },
+        )
+        cache.delete(VideoUploadService._cache_key(upload_token))
+
+        model = VIDEO_UPLOAD_MODELS[upload["model_name"]]
+        updated = model.objects.filter(id=upload["instance_id"]).update(
+            intro_video=upload["name"]
+        )
+        if not updated:
+            # The request was withdrawn while the video was uploading
+            storage.delete(upload["name"])
+            logger.warning(
+                f"{upload['model_name']} {upload['instance_id']} no longer exists, "
+                f"discarded video upload {upload_token}"
+            )
+            return False
+
+        logger.info(
+            f"Attached video upload {upload_token} to "
+            f"{upload['model_name']} {upload['instance_id']}"
+        )
+        return True
+
+    @staticmethod
+    def abort_upload(upload_token):
+        """Discard an unfinished upload and the parts stored so far"""
+        upload = cache.get(VideoUploadService._cache_key(upload_token))
+        if not upload:
+            return False
+
+        storage = VideoUploadService._get_storage(upload["model_name"])
+        storage.connection.meta.client.abort_multipart_upload(
+            Bucket=storage.bucket_name, Key=upload["key"], UploadId=upload["upload_id"]
+        )
+        cache.delete(VideoUploadService._cache_key(upload_token))
+        logger.info(f"Aborted video upload {upload_token}")
+        return True
+
+
+class CreditService:
+    """
+    Every change to a user's credits goes through the credit ledger.
+
+    Changes are relative: the balance is moved with an F() expression and a
+    debit only matches the row while the balance covers it, so concurrent
+    changes never overwrite each other or take a balance below zero.
+    """
+
+    @staticmethod
+    def adjust(user_id, amount, reason, idempotency_key=None):
+        """
+        Add amount (negative for a debit) to the user's balance and record it.
+        Returns (entry, duplicate). Raises User.DoesNotExist for an unknown
+        user and ValueError when a debit exceeds the balance.
+        """
+        idempotency_key = idempotency_key or None
+        if idempotency_key:
+            entry = CreditLedger.objects.filter(idempotency_key=idempotency_key).first()
+            if entry:
+                logger.info(f"Credit change {idempotency_key} was already applied")
+                return entry, True
+
+        try:
+            with transaction.atomic():
+                users = User.objects.filter(id=user_id)
+                if amount < 0:
+                    users = users.filter(balance_credits__gte=-amount)
+                if not users.update(balance_credits=F("balance_credits") + amount):
+                    if not User.objects.filter(id=user_id).exists():
+                        raise User.DoesNotExist(f"User {user_id} not found.")
+                    raise ValueError("Insufficient credits.")
+
+                balance = User.objects.values_list("balance_credits", flat=True).get(
+                    id=user_id
+                )
+                entry = CreditLedger.objects.create(
+                    user_id=user_id,
+                    amount=amount,
+                    balance_after=balance,
+                    reason=reason,
+                    idempotency_key=idempotency_key,
+                )
+                UserSummaryService.invalidate([user_id])
+        except IntegrityError:
+            # A concurrent call with the same key committed first
+            entry = (
+                idempotency_key
+                and CreditLedger.objects.filter(idempotency_key=idempotency_key).first()
+            )
+            if not entry:
+                raise
+            return entry, True
+
+        logger.info(
+            f"Credits for user {user_id} changed by {amount:+d} ({reason}), "
+            f"balance {entry.balance_after}"
+        )
+        return entry, False
+
+    @staticmethod
+    @transaction.atomic
+    def set_balance(user_id, balance, reason):
+        """Move the balance to an absolute value, recorded as the difference"""
+        current = (
+            User.objects.select_for_update()
+            .values_list("balance_credits", flat=True)
+            .get(id=user_id)
+        )
+        return CreditService.adjust(user_id, balance - current, reason)
+
+    @staticmethod
+    def apply_batch(adjustments):
+        """
+        Apply many adjustments in order within one transaction.
+
+        Each adjustment is a dict with user_id, credits, is_deduction and
+        optionally idempotency_key and reason. The users are locked with one
+        query, every adjustment is checked against the running balance, and
+        the net change per user is written with one UPDATE. A rejected
+        adjustment only fails its own result.
+        """
+        with transaction.atomic():
+            keys = [a["idempotency_key"] for a in adjustments if a.get("idempotency_key")]
+            applied_keys = set(
+                CreditLedger.objects.filter(idempotency_key__in=keys).values_list(
+                    "idempotency_key", flat=True
+                )
+            )
+            balances = dict(
+                User.objects.select_for_update()
+                .filter(id__in={a["user_id"] for a in adjustments})
+                .order_by("id")
+                .values_list("id", "balance_credits")
+            )
+            net_changes = {}
+            entries = []
+            results = []
+
+            for adjustment in adjustments:
+                user_id = adjustment["user_id"]
+                key = adjustment.get("idempotency_key") or None
+                change = (
+                    -adjustment["credits"]
+                    if adjustment.get("is_deduction")
+                    else adjustment["credits"]
+                )
+                result = {
+                    "user_id": user_id,
+                    "success": False,
+                    "error": "",
+                    "duplicate": False,
+                }
+
+                if key in applied_keys:
+                    result["success"] = result["duplicate"] = True
+                elif user_id not in balances:
+                    result["error"] = "User not found."
+                elif adjustment["credits"] < 0:
+                    result["error"] = "Credits must not be negative."
+                elif balances[user_id] + change < 0:
+                    result["error"] = "Insufficient credits."
+                else:
+                    balances[user_id] += change
+                    net_changes[user_id] = net_changes.get(user_id, 0) + change
+                    entries.append(
+                        CreditLedger(
+                            user_id=user_id,
+                            amount=change,
+                            balance_after=balances[user_id],
+                            reason=adjustment.get("reason") or "batch",
+                            idempotency_key=key,
+                        )
+                    )
+                    if key:
+                        applied_keys.add(key)
+                    result["success"] = True
+
+                result["balance"] = balances.get(user_id, 0)
+                results.append(result)
+
+            net_changes = {
+                user_id: change for user_id, change in net_changes.items() if change
+            }
+            if net_changes:
+                User.objects.filter(id__in=net_changes).update(
+                    balance_credits=F("balance_credits")
+                    + Case(
+                        *[
+                            When(id=user_id, then=Value(change))
+                            for user_id, change in net_changes.items()
+                        ],
+                        default=Value(0),
+                        output_field=IntegerField(),
+                    )
+                )
+            CreditLedger.objects.bulk_create(entries)
+            if net_changes:
+                UserSummaryService.invalidate(net_changes)
+
+        logger.info(
+            f"Applied {len(entries)} of {len(results)} credit adjustments "
+            f"to {len(net_changes)} users"
+        )
+        return results
+
+
+_summary_redis = None
+_summary_redis_lock = threading.Lock()
+
+
+def get_summary_redis():
+    global _summary_redis
+    if _summary_redis is None:
+        with _summary_redis_lock:
+            if _summary_redis is None:
+                _summary_redis = redis.Redis.from_url(
+                    settings.USER_SUMMARY_REDIS_URL,
+                    socket_timeout=settings.USER_SUMMARY_REDIS_TIMEOUT,
+                    socket_connect_timeout=settings.USER_SUMMARY_REDIS_TIMEOUT,
+                )
+    return _summary_redis
+
+
+class UserSummaryService:
+    """
+    Light user profiles for the other services, cached for
+    USER_SUMMARY_TTL seconds in the Redis they share.
+
+    Only this service writes the cache. Once a change to a user commits,
+    the user's entry is deleted and the id is published on CHANNEL, so the
+    other services drop their in-process copies too. A Redis failure only
+    costs cache hits; entries missed by an invalidation expire with the TTL.
+    """
+
+    KEY_PREFIX = "user_summary:"
+    CHANNEL = "user_summary_invalidations"
+
+    @staticmethod
+    def get_many(user_ids):
+        """Summaries by user id, unknown users are left out"""
+        user_ids = list(dict.fromkeys(user_ids))
+        keys = [f"{UserSummaryService.KEY_PREFIX}{user_id}" for user_id in user_ids]
+        client = get_summary_redis()
+        try:
+            cached = client.mget(keys)
+        except RedisError as e:
+            logger.error(f"User summary cache unavailable: {str(e)}")
+            cached = [None] * len(keys)
+
+        summaries = {
+            user_id: json.loads(value)
+            for user_id, value in zip(user_ids, cached)
+            if value is not None
+        }
+        missing = [user_id for user_id in user_ids if user_id not in summaries]
+        if missing:
+            fresh = {
+                user.id: UserSummarySerializer(user).data
+                for user in User.objects.filter(id__in=missing).select_related(
+                    "tutor_details"
+                )
+            }
+            try:
+                pipe = client.pipeline(transaction=False)
+                for user_id, summary in fresh.items():
+                    pipe.set(
+                        f"{UserSummaryService.KEY_PREFIX}{user_id}",
+                        json.dumps(summary),
+                        ex=settings.USER_SUMMARY_TTL,
+                    )
+                pipe.execute()
+            except RedisError as e:
+                logger.error(f"Failed to cache {len(fresh)} user summaries: {str(e)}")
+            summaries.update(fresh)
+        return summaries
+
+    @staticmethod
+    def invalidate(user_ids):
+        """Drop the users' cached summaries once the current transaction commits"""
+        user_ids = sorted(set(user_ids))
+
+        def publish():
+            try:
+                client = get_summary_redis()
+                client.delete(
+                    *[f"{UserSummaryService.KEY_PREFIX}{user_id}" for user_id in user_ids]
+                )
+                client.publish(UserSummaryService.CHANNEL, json.dumps(user_ids))
+            except RedisError as e:
+                logger.error(
+                    f"Failed to invalidate user summaries {user_ids}: {str(e)}"
+                )
+
+        if user_ids:
+            transaction.on_commit(publish)
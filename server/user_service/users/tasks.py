@@ -2,8 +2,6 @@ from celery import shared_task
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
-from .models import TutorDetails, TeachingLanguageChangeRequest
-from django.core.files.base import ContentFile
 
 
 @shared_task(
@@ -27,39 +25,3 @@ def send_email_task(self, subject, recipient, template_name, context):
     except Exception as exc:
         self.retry(exc=exc)
 
-
-@shared_task(
-    bind=True,
-    autoretry_for=(Exception,),
-    retry_kwargs={"max_retries": 3},
-    retry_backoff=True,
-)
-def process_video_upload(self, model_name, instance_id, file_data):
-    """
-    Process video upload directly to S3
-    Args:
-        model_name: Name of the model ('TutorDetails' or 'TeachingLanguageChangeRequest')
-        instance_id: ID of the instance
-        file_data: Dictionary containing file information
-    """
-    try:
-        # Validate model_name
-        if model_name not in ["TutorDetails", "TeachingLanguageChangeRequest"]:
-            raise ValueError(f"Invalid model name: {model_name}")
-
-        # Get the appropriate model class
-        if model_name == "TutorDetails":
-            instance = TutorDetails.objects.get(id=instance_id)
-        else:
-            instance = TeachingLanguageChangeRequest.objects.get(id=instance_id)
-
-        # Create a ContentFile from the file data
-        file_content = ContentFile(file_data["content"], name=file_data["name"])
-
-        # Save directly to S3 via Django's storage backend
-        file_name = f"tutor_intro_videos/{instance_id}_{file_data['name']}"
-        instance.intro_video.save(file_name, file_content, save=True)
-
-        return True
-    except Exception as exc:
-        self.retry(exc=exc)
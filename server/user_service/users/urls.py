@@ -19,6 +19,7 @@ urlpatterns = [
     path("set-new-password/", set_new_password),
     path("token/refresh/", TokenRefreshView.as_view()),
     path("users/", UserList.as_view()),
+    path("users/summaries/", UserSummaryList.as_view()),
     path("users/<int:pk>/", UserDetail.as_view()),
     path("tutor-details/<int:pk>/", TutorDetail.as_view()),
     path("users/<int:pk>/balance/", UserBalance.as_view()),
@@ -36,4 +37,5 @@ urlpatterns = [
         TeachingLanguageChangeRequestDetail.as_view(),
     ),
     path("users/<int:id>/block-unblock/", BlockUnblockUser.as_view()),
+    path("video-uploads/<uuid:upload_token>/", video_upload),
 ]
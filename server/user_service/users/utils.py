@@ -8,7 +8,9 @@ from dotenv import load_dotenv
 import random
 import string
 from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
+from django.template.loader import render_to_string
 from .models import User, Language, Proficiency
 import pycountry
 import logging
@@ -70,6 +72,18 @@ def get_email_template_path(template_name):
     return f"emails/{template_name}.html"
 
 
+def build_email_message(subject, recipient, template_name, context):
+    """Helper to render an HTML email like send_email_task sends it"""
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body="",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient],
+    )
+    message.attach_alternative(render_to_string(template_name, context), "text/html")
+    return message
+
+
 def get_id_token(code):
     token_endpoint = "https://oauth2.googleapis.com/token"
     logger.info("Initiating Google OAuth token exchange")
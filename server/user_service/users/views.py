@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import status, generics, serializers
 from rest_framework.response import Response
@@ -30,9 +31,7 @@ from django.db.models import Q
 from rest_framework.permissions import IsAdminUser
 from .permissions import IsAdminOrUserSelf
 from .utils import get_user_or_create, get_id_token
-from .services import EmailService
-from .tasks import process_video_upload
-from django.core.files.base import ContentFile
+from .services import EmailService, UserSummaryService, VideoUploadService
 import logging
 
 # Get logger for the user app
@@ -393,6 +392,33 @@ class UserList(generics.ListAPIView):
     serializer_class = UserSerializer
 
 
+class UserSummaryList(APIView):
+    """Summaries of the users in ?ids=1,2,3, for the other services"""
+
+    def get(self, request):
+        try:
+            user_ids = [
+                int(user_id)
+                for user_id in request.query_params.get("ids", "").split(",")
+                if user_id
+            ]
+        except ValueError:
+            return Response(
+                {"error": "ids must be comma separated integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 1 <= len(user_ids) <= settings.USER_SUMMARY_MAX_IDS:
+            return Response(
+                {"error": f"Pass between 1 and {settings.USER_SUMMARY_MAX_IDS} ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        summaries = UserSummaryService.get_many(user_ids)
+        return Response(
+            [summaries[user_id] for user_id in dict.fromkeys(user_ids) if user_id in summaries]
+        )
+
+
 class UserDetail(generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -500,6 +526,12 @@ class UserDetail(generics.RetrieveUpdateDestroyAPIView):
             except TutorDetails.DoesNotExist:
                 logger.warning("TutorDetails not found")
 
+        UserSummaryService.invalidate([user.id])
+
+    def perform_destroy(self, instance):
+        UserSummaryService.invalidate([instance.id])
+        instance.delete()
+
     def patch(self, request, *args, **kwargs):
 
         try:
@@ -528,6 +560,7 @@ class TutorRequest(generics.RetrieveUpdateDestroyAPIView):
         if serializer.is_valid():
             with transaction.atomic():
                 user = serializer.save()
+                UserSummaryService.invalidate([user.id])
 
                 if user.user_type == "tutor":
                     logger.info("User is a tutor")
@@ -545,6 +578,7 @@ class TutorRequest(generics.RetrieveUpdateDestroyAPIView):
                         logger.warning("TutorDetails not found")
 
     def perform_destroy(self, instance):
+        UserSummaryService.invalidate([instance.id])
         if instance.user_type == "tutor":
             try:
                 tutor_details = TutorDetails.objects.get(user=instance)
@@ -682,7 +716,6 @@ def tutor_request(request):
             )
 
         # Get files from request
-        video_file = request.FILES.get("video")
         image_file = request.FILES.get("image")
         profile_image = request.FILES.get("profile_image")
 
@@ -763,33 +796,23 @@ def tutor_request(request):
         except json.JSONDecodeError:
             raise ValueError("Invalid spokenLanguages format")
 
-        # Handle video upload
-        if video_file:
-            # Read the file content
-            video_content = video_file.read()
-
-            # Create a new ContentFile with the video content
-            video_file_content = ContentFile(video_content)
-            video_file_content.name = video_file.name
-
-            # Pass the serializable content to the task
-            process_video_upload.delay(
+        # The video itself is uploaded by the client straight to S3
+        video_upload = None
+        if data.get("videoName"):
+            video_upload = VideoUploadService.start_upload(
                 "TutorDetails",
                 tutor_details.id,
-                {
-                    "content": video_content,
-                    "name": video_file.name,
-                    "content_type": video_file.content_type,
-                },
+                data["videoName"],
+                data.get("videoContentType"),
+                data.get("videoSize"),
             )
 
-            logger.info("Video upload processed successfully")
-
         logger.info("Tutor request submitted successfully")
         return Response(
             {
-                "message": "Tutor request submitted successfully! Video upload is being processed.",
+                "message": "Tutor request submitted successfully! Please upload your introduction video.",
                 "user_id": user.id,
+                "video_upload": video_upload,
             },
             status=status.HTTP_201_CREATED,
         )
@@ -819,6 +842,7 @@ class BlockUnblockUser(APIView):
             if user.is_active != is_active:
                 user.is_active = is_active
                 user.save()
+                UserSummaryService.invalidate([user.id])
 
                 if is_active:
                     EmailService.send_account_reactivation_email(user)
@@ -916,6 +940,17 @@ class TeachingLanguageChangeRequestList(generics.ListCreateAPIView):
     queryset = TeachingLanguageChangeRequest.objects.all()
     serializer_class = TeachingLanguageChangeRequestSerializer
 
+    def create(self, request, *args, **kwargs):
+        self.video_upload = None
+        try:
+            response = super().create(request, *args, **kwargs)
+        except ValueError as e:
+            logger.error(f"ValueError: {str(e)}")
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        response.data["video_upload"] = self.video_upload
+        return response
+
+    @transaction.atomic
     def perform_create(self, serializer):
         logger.info("Teaching language change request received")
         existing_request = TeachingLanguageChangeRequest.objects.filter(
@@ -932,26 +967,18 @@ class TeachingLanguageChangeRequestList(generics.ListCreateAPIView):
                 }
             )
 
-        video_file = self.request.FILES.get("intro_video")
-        if video_file:
-            # Read the file content
-            video_content = video_file.read()
+        instance = serializer.save(user=self.request.user)
 
-            # Create request without video first
-            instance = serializer.save(user=self.request.user)
-
-            # Pass the serializable content to the task
-            process_video_upload.delay(
+        # The video itself is uploaded by the client straight to S3
+        video_name = self.request.data.get("intro_video_name")
+        if video_name:
+            self.video_upload = VideoUploadService.start_upload(
                 "TeachingLanguageChangeRequest",
                 instance.id,
-                {
-                    "content": video_content,
-                    "name": video_file.name,
-                    "content_type": video_file.content_type,
-                },
+                video_name,
+                self.request.data.get("intro_video_content_type"),
+                self.request.data.get("intro_video_size"),
             )
-        else:
-            instance = serializer.save(user=self.request.user)
         logger.info("Teaching language change request saved successfully")
         return instance
 
@@ -1069,3 +1096,33 @@ class TutorDetail(generics.RetrieveAPIView):
         logger.info("Tutor detail request received")
         user_id = self.kwargs.get("pk")
         return get_object_or_404(TutorDetails, user_id=user_id)
+
+
+@api_view(["POST", "DELETE"])
+def video_upload(request, upload_token):
+    """Complete (POST) or abort (DELETE) a direct-to-S3 intro video upload"""
+    try:
+        if request.method == "DELETE":
+            found = VideoUploadService.abort_upload(upload_token)
+        else:
+            found = VideoUploadService.complete_upload(upload_token)
+    except ValueError as e:
+        logger.warning(f"Video upload {upload_token} rejected: {str(e)}")
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Video upload {upload_token} failed: {str(e)}")
+        return Response(
+            {"error": "Failed to process the video upload.", "details": str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    if not found:
+        return Response(
+            {"error": "Video upload not found or expired."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    if request.method == "DELETE":
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(
+        {"message": "Video uploaded successfully."}, status=status.HTTP_200_OK
+    )